@@ -22,7 +22,7 @@ load_dotenv()
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.core.db import Base
-from app.models import author, book, borrower, loan, user
+from app.models import author, book, borrower, circulation, loan, table_version, user
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,46 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 4fc0ee97fffd
+Revises: 796d5443ca79
+Create Date: 2026-10-18 09:12:41.118203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4fc0ee97fffd"
+down_revision: Union[str, Sequence[str], None] = "796d5443ca79"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_authors_created_at_id", "Authors", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_books_created_at_id", "Books", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_borrowers_created_at_id", "Borrowers", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_loans_active_created_at_id",
+        "Loans",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("return_date IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_loans_active_created_at_id", table_name="Loans")
+    op.drop_index("ix_borrowers_created_at_id", table_name="Borrowers")
+    op.drop_index("ix_books_created_at_id", table_name="Books")
+    op.drop_index("ix_authors_created_at_id", table_name="Authors")
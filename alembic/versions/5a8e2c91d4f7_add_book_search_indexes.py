@@ -0,0 +1,73 @@
+"""add_book_search_indexes
+
+Revision ID: 5a8e2c91d4f7
+Revises: b3d71e0a5c28
+Create Date: 2026-10-18 12:08:36.271590
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5a8e2c91d4f7"
+down_revision: Union[str, Sequence[str], None] = "b3d71e0a5c28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # These expressions must match app.core.search.search_document exactly.
+    op.create_index(
+        "ix_books_title_search",
+        "Books",
+        [sa.text("to_tsvector('simple'::regconfig, coalesce(title, ''))")],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_authors_name_search",
+        "Authors",
+        [sa.text("to_tsvector('simple'::regconfig, coalesce(name, ''))")],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    op.create_index(
+        "ix_books_title_trgm",
+        "Books",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_books_isbn_trgm",
+        "Books",
+        ["isbn"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"isbn": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_authors_name_trgm",
+        "Authors",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_authors_name_trgm", table_name="Authors")
+    op.drop_index("ix_books_isbn_trgm", table_name="Books")
+    op.drop_index("ix_books_title_trgm", table_name="Books")
+    op.drop_index("ix_authors_name_search", table_name="Authors")
+    op.drop_index("ix_books_title_search", table_name="Books")
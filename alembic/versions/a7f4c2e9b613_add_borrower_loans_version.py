@@ -0,0 +1,33 @@
+"""add_borrower_loans_version
+
+Revision ID: a7f4c2e9b613
+Revises: e5c93a7f2d14
+Create Date: 2026-10-18 19:12:40.271953
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a7f4c2e9b613"
+down_revision: Union[str, Sequence[str], None] = "e5c93a7f2d14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default lets PostgreSQL add the column without rewriting
+    # the table.
+    op.add_column(
+        "Borrowers",
+        sa.Column("loans_version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("Borrowers", "loans_version")
@@ -0,0 +1,33 @@
+"""add_table_versions
+
+Revision ID: b3d71e0a5c28
+Revises: f9612514d774
+Create Date: 2026-10-18 11:26:53.804117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d71e0a5c28"
+down_revision: Union[str, Sequence[str], None] = "f9612514d774"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "TableVersions",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("TableVersions")
@@ -0,0 +1,39 @@
+"""add_borrower_loan_indexes
+
+Revision ID: c4e2a7d19b83
+Revises: 5a8e2c91d4f7
+Create Date: 2026-10-18 14:12:40.218305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e2a7d19b83"
+down_revision: Union[str, Sequence[str], None] = "5a8e2c91d4f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_loans_borrower_created_at_id",
+        "Loans",
+        ["borrower_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_loans_active_borrower_created_at_id",
+        "Loans",
+        ["borrower_id", "created_at", "id"],
+        postgresql_where=sa.text("return_date IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_loans_active_borrower_created_at_id", table_name="Loans")
+    op.drop_index("ix_loans_borrower_created_at_id", table_name="Loans")
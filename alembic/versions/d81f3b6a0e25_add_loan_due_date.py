@@ -0,0 +1,44 @@
+"""add_loan_due_date
+
+Revision ID: d81f3b6a0e25
+Revises: c4e2a7d19b83
+Create Date: 2026-10-18 15:03:11.604127
+
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d81f3b6a0e25"
+down_revision: Union[str, Sequence[str], None] = "c4e2a7d19b83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("Loans", sa.Column("due_date", sa.DateTime(), nullable=True))
+    # Existing loans get the due date the current policy would have given them.
+    op.execute(
+        sa.text(
+            'UPDATE "Loans" SET due_date = loan_date + make_interval(days => :days) '
+            "WHERE due_date IS NULL"
+        ).bindparams(days=int(os.getenv("LOAN_PERIOD_DAYS", "14")))
+    )
+    op.create_index(
+        "ix_loans_active_due_date_id",
+        "Loans",
+        ["due_date", "id"],
+        postgresql_where=sa.text("return_date IS NULL"),
+        postgresql_include=["book_id", "borrower_id", "loan_date"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_loans_active_due_date_id", table_name="Loans")
+    op.drop_column("Loans", "due_date")
@@ -0,0 +1,92 @@
+"""add_circulation_stats
+
+Revision ID: e5c93a7f2d14
+Revises: d81f3b6a0e25
+Create Date: 2026-10-18 17:42:25.318840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e5c93a7f2d14"
+down_revision: Union[str, Sequence[str], None] = "d81f3b6a0e25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "BookCirculationStats",
+        sa.Column("book_id", sa.UUID(), nullable=False),
+        sa.Column("checkouts", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["Books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id"),
+    )
+    op.create_index(
+        "ix_book_circulation_stats_checkouts",
+        "BookCirculationStats",
+        [sa.text("checkouts DESC"), "book_id"],
+    )
+    op.create_table(
+        "BorrowerCirculationStats",
+        sa.Column("borrower_id", sa.UUID(), nullable=False),
+        sa.Column("active_loans", sa.Integer(), nullable=False),
+        sa.Column("total_loans", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["borrower_id"], ["Borrowers.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("borrower_id"),
+    )
+    op.create_index(
+        "ix_borrower_circulation_stats_active_loans",
+        "BorrowerCirculationStats",
+        [sa.text("active_loans DESC"), "borrower_id"],
+    )
+    op.create_table(
+        "DailyCirculationStats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False),
+        sa.Column("checkouts", sa.BigInteger(), nullable=False),
+        sa.Column("returns", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "shard"),
+    )
+
+    # Backfill from the existing loans; the service keeps the counts current
+    # from here on. Past days go into shard 0.
+    op.execute(
+        'INSERT INTO "BookCirculationStats" (book_id, checkouts) '
+        'SELECT book_id, count(*) FROM "Loans" '
+        "WHERE book_id IS NOT NULL GROUP BY book_id"
+    )
+    op.execute(
+        'INSERT INTO "BorrowerCirculationStats" '
+        "(borrower_id, active_loans, total_loans) "
+        "SELECT borrower_id, count(*) FILTER (WHERE return_date IS NULL), count(*) "
+        'FROM "Loans" WHERE borrower_id IS NOT NULL GROUP BY borrower_id'
+    )
+    op.execute(
+        'INSERT INTO "DailyCirculationStats" (day, shard, checkouts, returns) '
+        "SELECT day, 0, sum(checkouts), sum(returns) FROM ("
+        'SELECT loan_date::date AS day, 1 AS checkouts, 0 AS returns FROM "Loans" '
+        "WHERE loan_date IS NOT NULL "
+        "UNION ALL "
+        'SELECT return_date::date, 0, 1 FROM "Loans" WHERE return_date IS NOT NULL'
+        ") AS events GROUP BY day"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("DailyCirculationStats")
+    op.drop_index(
+        "ix_borrower_circulation_stats_active_loans",
+        table_name="BorrowerCirculationStats",
+    )
+    op.drop_table("BorrowerCirculationStats")
+    op.drop_index(
+        "ix_book_circulation_stats_checkouts", table_name="BookCirculationStats"
+    )
+    op.drop_table("BookCirculationStats")
@@ -0,0 +1,72 @@
+"""add_active_loan_unique_index
+
+Revision ID: f9612514d774
+Revises: 4fc0ee97fffd
+Create Date: 2026-10-18 10:02:17.530944
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f9612514d774"
+down_revision: Union[str, Sequence[str], None] = "4fc0ee97fffd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_no_duplicate_active_loans() -> None:
+    """Fail if any book has more than one active loan."""
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                'SELECT book_id, count(*) FROM "Loans" '
+                "WHERE return_date IS NULL "
+                "GROUP BY book_id HAVING count(*) > 1 "
+                "ORDER BY book_id"
+            )
+        )
+        .all()
+    )
+    if duplicates:
+        listed = ", ".join(f"{book_id} ({count})" for book_id, count in duplicates[:20])
+        raise RuntimeError(
+            f"{len(duplicates)} book(s) have more than one active loan: {listed}. "
+            "Return the extra loans before creating uq_loans_active_book_id."
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A book checked out twice would make the index build fail halfway
+    # through, so refuse up front and say which books need sorting out.
+    # There is nothing to query when only rendering SQL.
+    if not op.get_context().as_sql:
+        _check_no_duplicate_active_loans()
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and a plain
+    # build would block checkouts and returns while it scans Loans.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_loans_active_book_id",
+            "Loans",
+            ["book_id"],
+            unique=True,
+            postgresql_where=sa.text("return_date IS NULL"),
+            sqlite_where=sa.text("return_date IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_loans_active_book_id",
+            table_name="Loans",
+            postgresql_concurrently=True,
+        )
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_db
-from app.core.security import create_access_token, verify_password
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.repositories.user_repository_impl import SQLUserRepository
 from app.schemas.auth import Token
 from app.schemas.user import UserCreate, User as UserSchema
@@ -12,21 +15,25 @@ from app.services.user_service import UserService
 router = APIRouter(tags=["authentication"])
 
 
-def get_user_service(db: Session = Depends(get_db)):
+async def get_user_service(db: DatabaseRunner = Depends(get_db_runner)):
     """
     Get an instance of the UserService with a database session.
     Args:
-        db (Session): The database session.
+        db (DatabaseRunner): The runner holding the database session.
     Returns:
         UserService: An instance of UserService.
     """
-    return UserService(SQLUserRepository(db))
+    return UserService(SQLUserRepository(db.session))
 
 
 @router.post(
     "/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED
 )
-async def register(request: UserCreate, svc: UserService = Depends(get_user_service)):
+async def register(
+    request: UserCreate,
+    svc: UserService = Depends(get_user_service),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Register a new user.
     Args:
@@ -35,19 +42,22 @@ async def register(request: UserCreate, svc: UserService = Depends(get_user_serv
     Returns:
         The created user.
     """
-    if svc.get_user_by_username(request.username):
+    if await run(svc.get_user_by_username, request.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
 
-    return svc.create_user(request.username, request.password)
+    await run.release()
+    password_hash = await get_password_hash_async(request.password)
+    return await run(svc.create_user, request.username, password_hash)
 
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     svc: UserService = Depends(get_user_service),
+    run: DatabaseRunner = Depends(get_db_runner),
 ):
     """
     Authenticate a user and provide an access token.
@@ -57,8 +67,11 @@ async def login(
     Returns:
         A token containing the access token and token type.
     """
-    user = svc.get_user_by_username(form_data.username)
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await run(svc.get_user_by_username, form_data.username)
+    await run.release()
+    if not user or not await verify_password_async(
+        form_data.password, user.password_hash
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -1,38 +1,72 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.dependencies import get_db
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.core.etag import check_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import Page, json_response
+from app.repositories.author_repository_cached import CachedAuthorRepository
 from app.repositories.author_repository_impl import SQLAuthorRepository
 from app.repositories.book_repository_impl import SQLBookRepository
-from app.schemas.author import AuthorCreate, AuthorUpdate
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.repositories.table_version_repository_impl import SQLTableVersionRepository
+from app.schemas.author import Author, AuthorCreate, AuthorUpdate
 from app.services.author_service import AuthorService
 
 router = APIRouter(prefix="/authors", tags=["authors"])
 
 
-def author_svc_helper(db: Session = Depends(get_db)) -> AuthorService:
+async def author_svc_helper(
+    db: DatabaseRunner = Depends(get_db_runner),
+) -> AuthorService:
     """
     Get an instance of the AuthorService with a database session.
     Args:
-        db (Session): The database session.
+        db (DatabaseRunner): The runner holding the database session.
     Returns:
         AuthorService: An instance of AuthorService.
     """
-    return AuthorService(SQLAuthorRepository(db), SQLBookRepository(db))
+    return AuthorService(
+        CachedAuthorRepository(SQLAuthorRepository(db.session), db.session),
+        SQLBookRepository(db.session),
+        SQLTableVersionRepository(db.session),
+        SQLStatsRepository(db.session),
+    )
 
 
 @router.get("/")
-def list_all_authors(svc: AuthorService = Depends(author_svc_helper)):
+async def list_all_authors(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    svc: AuthorService = Depends(author_svc_helper),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
-    List all authors.
+    List authors one page at a time. Answers If-None-Match with 304 when no
+    author has changed.
+    Args:
+        limit (int): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
+        svc (AuthorService): The author service instance.
     Returns:
-        A list of all authors.
+        A page of authors and the cursor of the next page.
     """
-    return svc.get_authors()
+    not_modified = check_etag(request, response, await run(svc.get_catalog_version))
+    if not_modified is not None:
+        return not_modified
+    page = await run(svc.get_authors, limit, cursor)
+    return json_response(page, Page[Author], headers=response.headers)
 
 
 @router.get("/{id}")
-def get_author_profile(id: str, svc: AuthorService = Depends(author_svc_helper)):
+async def get_author_profile(
+    id: str,
+    svc: AuthorService = Depends(author_svc_helper),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Get an author by their ID.
     Args:
@@ -41,11 +75,15 @@ def get_author_profile(id: str, svc: AuthorService = Depends(author_svc_helper))
     Returns:
         The Author object if found, otherwise None.
     """
-    return svc.get_author_by_id(id)
+    return await run(svc.get_author_by_id, id)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def add_author(req: AuthorCreate, svc: AuthorService = Depends(author_svc_helper)):
+async def add_author(
+    req: AuthorCreate,
+    svc: AuthorService = Depends(author_svc_helper),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Add a new author.
     Args:
@@ -54,12 +92,15 @@ def add_author(req: AuthorCreate, svc: AuthorService = Depends(author_svc_helper
     Returns:
         The created author.
     """
-    return svc.create_author(req)
+    return await run(svc.create_author, req)
 
 
 @router.put("/{id}")
-def edit_author(
-    id: str, req: AuthorUpdate, svc: AuthorService = Depends(author_svc_helper)
+async def edit_author(
+    id: str,
+    req: AuthorUpdate,
+    svc: AuthorService = Depends(author_svc_helper),
+    run: DatabaseRunner = Depends(get_db_runner),
 ):
     """
     Update an author's information.
@@ -70,15 +111,19 @@ def edit_author(
     Returns:
         The updated author.
     """
-    return svc.update_author(id, req)
+    return await run(svc.update_author, id, req)
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_author(id: str, svc: AuthorService = Depends(author_svc_helper)):
+async def remove_author(
+    id: str,
+    svc: AuthorService = Depends(author_svc_helper),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Remove an author.
     Args:
         id (str): The ID of the author to delete.
         svc (AuthorService): The author service instance.
     """
-    svc.delete_author(id)
+    await run(svc.delete_author, id)
@@ -0,0 +1,52 @@
+import os
+from typing import Dict
+
+from fastapi import APIRouter, Query
+
+from app.core.autocomplete import AUTOCOMPLETE_INDEXES
+from app.core.db import session_local
+from app.repositories.book_repository_impl import SQLBookRepository
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.services.autocomplete_service import AutocompleteService
+
+# Writes made through other worker processes only reach this worker's index
+# on the next full refresh. 0 disables the periodic refresh.
+AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "300"))
+
+router = APIRouter(prefix="/autocomplete", tags=["autocomplete"])
+
+KIND_PATTERN = "^(" + "|".join(AUTOCOMPLETE_INDEXES) + ")$"
+
+
+@router.get("")
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: str = Query("borrowers", pattern=KIND_PATTERN),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Suggest borrowers (by name or email) or books (by title) whose words start
+    with the typed text. Served from memory; no database query is made.
+    Args:
+        q (str): The text typed so far.
+        kind (str): "borrowers" or "books".
+        limit (int): The maximum number of suggestions.
+    Returns:
+        The matching records.
+    """
+    return {"items": AUTOCOMPLETE_INDEXES[kind].search(q, limit)}
+
+
+def rebuild_indexes() -> Dict[str, int]:
+    """
+    Reload the autocomplete indexes from the database on a dedicated session.
+    Returns:
+        Dict[str, int]: The number of records in each index.
+    """
+    db = session_local()
+    try:
+        return AutocompleteService(
+            SQLBorrowerRepository(db), SQLBookRepository(db)
+        ).rebuild()
+    finally:
+        db.close()
@@ -1,41 +1,139 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 
-from app.core.dependencies import get_db
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+
+from app.core.availability import availability_index
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.core.etag import check_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import Page, json_response
+from app.repositories.author_repository_cached import CachedAuthorRepository
 from app.repositories.author_repository_impl import SQLAuthorRepository
 from app.repositories.book_repository_impl import SQLBookRepository
-from app.repositories.loan_repository_impl import SQLLoanRepository
-from app.schemas.book import BookCreate, BookUpdate
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.repositories.table_version_repository_impl import SQLTableVersionRepository
+from app.schemas.book import Book, BookCreate, BookUpdate
 from app.services.book_service import BookService
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+MAX_AVAILABILITY_IDS = 1000
+
 
-def get_svc(db: Session = Depends(get_db)) -> BookService:
+async def get_svc(db: DatabaseRunner = Depends(get_db_runner)) -> BookService:
     """
     Get an instance of the BookService with a database session.
     Args:
-        db (Session): The database session.
+        db (DatabaseRunner): The runner holding the database session.
     Returns:
         BookService: An instance of BookService.
     """
     return BookService(
-        SQLBookRepository(db), SQLAuthorRepository(db), SQLLoanRepository(db)
+        SQLBookRepository(db.session),
+        CachedAuthorRepository(SQLAuthorRepository(db.session), db.session),
+        SQLTableVersionRepository(db.session),
+        SQLStatsRepository(db.session),
     )
 
 
 @router.get("/")
-def list_books(svc: BookService = Depends(get_svc)):
+async def list_books(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    svc: BookService = Depends(get_svc),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    List books one page at a time. Answers If-None-Match with 304 when the
+    catalog has not changed.
+    Args:
+        limit (int): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
+        svc (BookService): The book service instance.
+    Returns:
+        A page of books and the cursor of the next page.
+    """
+    not_modified = check_etag(request, response, await run(svc.get_catalog_version))
+    if not_modified is not None:
+        return not_modified
+    page = await run(svc.get_books, limit, cursor)
+    return json_response(page, Page[Book], headers=response.headers)
+
+
+@router.get("/search")
+async def search_books(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    svc: BookService = Depends(get_svc),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
-    List all books.
+    Search books by title, ISBN or author name, best matches first.
+    Args:
+        q (str): The search text.
+        limit (int): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
+        svc (BookService): The book service instance.
     Returns:
-        A list of all books.
+        A page of matching books and the cursor of the next page.
+    """
+    page = await run(svc.search_books, q, limit, cursor)
+    return json_response(page, Page[Book])
+
+
+@router.get("/availability")
+async def book_availability(ids: List[str] = Query([])):
     """
-    return svc.get_books()
+    Tell which books are available, from this worker's availability index
+    without querying the database. Loans made through other workers show up
+    after the next resync; book IDs are not checked for existence.
+    Args:
+        ids (List[str]): Book IDs, repeated or comma-separated.
+    Returns:
+        The availability of each book and when the index was last resynced.
+    """
+    try:
+        book_ids = [UUID(part) for value in ids for part in value.split(",") if part]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be UUIDs")
+    if not book_ids:
+        raise HTTPException(status_code=422, detail="ids is required")
+    if len(book_ids) > MAX_AVAILABILITY_IDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {MAX_AVAILABILITY_IDS} ids can be checked at once",
+        )
+
+    on_loan = availability_index.on_loan(book_ids)
+    synced_at = availability_index.synced_at
+    return {
+        "items": [
+            {"book_id": book_id, "available": book_id not in on_loan}
+            for book_id in book_ids
+        ],
+        "synced_at": datetime.utcfromtimestamp(synced_at) if synced_at else None,
+    }
 
 
 @router.get("/{id}")
-def get_book(id: str, svc: BookService = Depends(get_svc)):
+async def get_book(
+    id: str,
+    svc: BookService = Depends(get_svc),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Get a book by its ID.
     Args:
@@ -44,11 +142,15 @@ def get_book(id: str, svc: BookService = Depends(get_svc)):
     Returns:
         The Book object if found, otherwise None.
     """
-    return svc.get_book_by_id(id)
+    return await run(svc.get_book_by_id, id)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def add_new_book(data: BookCreate, svc: BookService = Depends(get_svc)):
+async def add_new_book(
+    data: BookCreate,
+    svc: BookService = Depends(get_svc),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Add a new book.
     Args:
@@ -57,19 +159,28 @@ def add_new_book(data: BookCreate, svc: BookService = Depends(get_svc)):
     Returns:
         The created book.
     """
-    return svc.create_book(data)
+    return await run(svc.create_book, data)
 
 
 @router.put("/{id}")
-def modify_book(id: str, data: BookUpdate, svc: BookService = Depends(get_svc)):
+async def modify_book(
+    id: str,
+    data: BookUpdate,
+    svc: BookService = Depends(get_svc),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Update a book's information.
     """
-    return svc.update_book(id, data)
+    return await run(svc.update_book, id, data)
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_book(id: str, svc: BookService = Depends(get_svc)):
+async def remove_book(
+    id: str,
+    svc: BookService = Depends(get_svc),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Remove a book.
     Args:
@@ -77,4 +188,4 @@ def remove_book(id: str, svc: BookService = Depends(get_svc)):
         svc (BookService): The book service instance.
 
     """
-    svc.delete_book(id)
+    await run(svc.delete_book, id)
@@ -1,53 +1,104 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.dependencies import get_db
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.core.etag import check_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import Page, json_response
 from app.repositories.borrower_repository_impl import SQLBorrowerRepository
-from app.repositories.loan_repository_impl import SQLLoanRepository
-from app.schemas.borrower import BorrowerCreate, BorrowerUpdate
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.schemas.borrower import (
+    Borrower,
+    BorrowerCreate,
+    BorrowerProfile,
+    BorrowerUpdate,
+)
+from app.schemas.loan import LoanStatus
 from app.services.borrower_service import BorrowerService
 
 router = APIRouter(prefix="/borrowers", tags=["borrowers"])
 
 
-def borrower_loader(db: Session = Depends(get_db)) -> BorrowerService:
+async def borrower_loader(
+    db: DatabaseRunner = Depends(get_db_runner),
+) -> BorrowerService:
     """
     Get an instance of the BorrowerService with a database session.
     Args:
-        db (Session): The database session.
+        db (DatabaseRunner): The runner holding the database session.
     Returns:
         BorrowerService: An instance of BorrowerService.
     """
-    return BorrowerService(SQLBorrowerRepository(db), SQLLoanRepository(db))
+    return BorrowerService(
+        SQLBorrowerRepository(db.session),
+        SQLStatsRepository(db.session),
+    )
 
 
 @router.get("/")
-def list_borrowers(svc: BorrowerService = Depends(borrower_loader)):
+async def list_borrowers(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    svc: BorrowerService = Depends(borrower_loader),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
-    List all borrowers.
+    List borrowers one page at a time.
     Args:
+        limit (int): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
         svc (BorrowerService): The borrower service instance.
     Returns:
-        A list of all borrowers.
+        A page of borrowers and the cursor of the next page.
     """
-    return svc.get_borrowers()
+    page = await run(svc.get_borrowers, limit, cursor)
+    return json_response(page, Page[Borrower])
 
 
 @router.get("/{id}")
-def get_profile(id: str, svc: BorrowerService = Depends(borrower_loader)):
+async def get_profile(
+    id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    loan_status: Optional[LoanStatus] = Query(None, alias="status"),
+    svc: BorrowerService = Depends(borrower_loader),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
-    Get the profile of a specific borrower along with their loans.
+    Get the profile of a specific borrower along with one page of their
+    loans, newest first, including each book's title and author name.
+    Answers If-None-Match with 304 when neither the borrower, their loans nor
+    the catalog changed.
     Args:
         id (str): The ID of the borrower.
+        limit (int): The number of loans per page.
+        cursor (Optional[str]): The cursor returned with the previous page.
+        loan_status (Optional[LoanStatus]): Only list active or returned loans.
         svc (BorrowerService): The borrower service instance.
     Returns:
-        The borrower's profile with their loans.
+        The borrower's profile, a page of their loans and the cursor of the
+        next page.
     """
-    return svc.get_borrower_profile_with_loans(id)
+    version = await run(svc.get_profile_version, id)
+    if version is not None:
+        not_modified = check_etag(request, response, version)
+        if not_modified is not None:
+            return not_modified
+    profile = await run(
+        svc.get_borrower_profile_with_loans, id, limit, cursor, loan_status
+    )
+    return json_response(profile, BorrowerProfile, headers=response.headers)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def add_new_user(data: BorrowerCreate, svc: BorrowerService = Depends(borrower_loader)):
+async def add_new_user(
+    data: BorrowerCreate,
+    svc: BorrowerService = Depends(borrower_loader),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Add a new borrower.
     Args:
@@ -56,12 +107,15 @@ def add_new_user(data: BorrowerCreate, svc: BorrowerService = Depends(borrower_l
     Returns:
         The created borrower.
     """
-    return svc.create_borrower(data)
+    return await run(svc.create_borrower, data)
 
 
 @router.put("/{id}")
-def update_user_info(
-    id: str, data: BorrowerUpdate, svc: BorrowerService = Depends(borrower_loader)
+async def update_user_info(
+    id: str,
+    data: BorrowerUpdate,
+    svc: BorrowerService = Depends(borrower_loader),
+    run: DatabaseRunner = Depends(get_db_runner),
 ):
     """
     Update a borrower's information.
@@ -72,11 +126,15 @@ def update_user_info(
     Returns:
         The updated borrower.
     """
-    return svc.update_borrower(id, data)
+    return await run(svc.update_borrower, id, data)
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_user(id: str, svc: BorrowerService = Depends(borrower_loader)):
+async def remove_user(
+    id: str,
+    svc: BorrowerService = Depends(borrower_loader),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Remove a borrower.
     Args:
@@ -85,4 +143,4 @@ def remove_user(id: str, svc: BorrowerService = Depends(borrower_loader)):
     Returns:
         None.
     """
-    svc.delete_borrower(id)
+    await run(svc.delete_borrower, id)
@@ -0,0 +1,78 @@
+import io
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+
+from app.core.bulk_io import SUPPORTED_FORMATS, read_rows
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.repositories.author_repository_impl import SQLAuthorRepository
+from app.repositories.book_repository_impl import SQLBookRepository
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.repositories.table_version_repository_impl import SQLTableVersionRepository
+from app.services.import_service import (
+    DEFAULT_CHUNK_SIZE,
+    IMPORT_ENTITIES,
+    BulkImportService,
+)
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+
+async def get_import_service(
+    db: DatabaseRunner = Depends(get_db_runner),
+) -> BulkImportService:
+    """
+    Get an instance of the BulkImportService with a database session.
+    Args:
+        db (DatabaseRunner): The runner holding the database session.
+    Returns:
+        BulkImportService: An instance of BulkImportService.
+    """
+    return BulkImportService(
+        SQLAuthorRepository(db.session),
+        SQLBookRepository(db.session),
+        SQLBorrowerRepository(db.session),
+        SQLTableVersionRepository(db.session),
+    )
+
+
+@router.post("/{entity}")
+async def import_file(
+    entity: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000),
+    svc: BulkImportService = Depends(get_import_service),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    Import authors, books or borrowers from an uploaded CSV or JSON Lines file.
+
+    The upload is read in chunks and each chunk is committed once written, so
+    memory use does not grow with the file size.
+    Args:
+        entity (str): One of "authors", "books" or "borrowers".
+        file (UploadFile): The file to import.
+        format (Optional[str]): "csv" or "jsonl"; guessed from the filename if
+            omitted.
+        chunk_size (int): The number of rows written per statement.
+        svc (BulkImportService): The import service instance.
+    Returns:
+        The import report with per-row errors.
+    """
+    fmt = format or ("csv" if (file.filename or "").endswith(".csv") else "jsonl")
+    if entity not in IMPORT_ENTITIES or fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Supported entities: {', '.join(IMPORT_ENTITIES)}; "
+            f"formats: {', '.join(SUPPORTED_FORMATS)}",
+        )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return await run(
+        svc.import_rows,
+        entity,
+        read_rows(stream, fmt),
+        chunk_size=chunk_size,
+        on_chunk=run.session.commit,
+    )
@@ -0,0 +1,77 @@
+from typing import Callable, Iterator, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.db import session_local
+from app.repositories.book_repository_impl import SQLBookRepository
+from app.repositories.loan_repository_impl import SQLLoanRepository
+from app.services.export_service import EXPORT_FORMATS, ExportService
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+FORMAT_PATTERN = "^(" + "|".join(EXPORT_FORMATS) + ")$"
+
+
+def _stream(produce: Callable[[ExportService], Iterator[bytes]]) -> Iterator[bytes]:
+    """
+    Run an export on its own session, which lives exactly as long as the stream.
+
+    The request-scoped session is not used because the body is produced after
+    the endpoint returns. StreamingResponse iterates this generator in the
+    threadpool, so the server-side cursor never blocks the event loop.
+    Args:
+        produce (Callable[[ExportService], Iterator[bytes]]): Builds the export
+            from a service bound to the stream's session.
+    Yields:
+        bytes: Encoded chunks of the document.
+    """
+    db = session_local()
+    try:
+        yield from produce(ExportService(SQLLoanRepository(db), SQLBookRepository(db)))
+    finally:
+        db.close()
+
+
+def _response(body: Iterator[bytes], name: str, fmt: str) -> StreamingResponse:
+    """
+    Wrap an export stream in a downloadable response.
+    """
+    extension = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
+
+
+@router.get("/loans")
+async def export_loans(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    active: bool = Query(False),
+    borrower_id: Optional[UUID] = Query(None),
+):
+    """
+    Stream loans as NDJSON or CSV.
+    Args:
+        format (str): "ndjson" or "csv".
+        active (bool): Only include loans that have not been returned.
+        borrower_id (Optional[UUID]): Only include loans of this borrower.
+    Returns:
+        A streaming response with one row per loan.
+    """
+    body = _stream(lambda svc: svc.export_loans(format, active, borrower_id))
+    return _response(body, "loans", format)
+
+
+@router.get("/books")
+async def export_books(format: str = Query("ndjson", pattern=FORMAT_PATTERN)):
+    """
+    Stream the catalog, with author names, as NDJSON or CSV.
+    Args:
+        format (str): "ndjson" or "csv".
+    Returns:
+        A streaming response with one row per book.
+    """
+    return _response(_stream(lambda svc: svc.export_books(format)), "books", format)
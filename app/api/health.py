@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+
+from app.core.db import DB_ASYNC, async_engine, engine
+from app.core.pool_stats import pool_stats
+from app.core.security import require_api_key, token_cache
+from app.repositories.author_repository_cached import author_cache
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("")
+async def health():
+    """
+    Liveness check.
+    Returns:
+        A static status message.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/pool", dependencies=[Depends(require_api_key)])
+async def pool_health():
+    """
+    Report connection pool occupancy and checkout wait times for this worker.
+    Returns:
+        The pool statistics of each engine, keyed by engine; "mode" names the
+        one that serves requests.
+    """
+    engines = {"sync": engine}
+    if DB_ASYNC:
+        engines["async"] = async_engine.sync_engine
+    return {
+        "mode": "async" if DB_ASYNC else "sync",
+        "pools": {
+            label: pool_stats[label].snapshot(bound.pool)
+            for label, bound in engines.items()
+        },
+    }
+
+
+@router.get("/caches", dependencies=[Depends(require_api_key)])
+async def cache_health():
+    """
+    Report the size and hit rate of this worker's in-process caches.
+    Returns:
+        The statistics of each cache.
+    """
+    return {"jwt": token_cache.stats(), "authors": author_cache.stats()}
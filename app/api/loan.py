@@ -1,30 +1,69 @@
+import os
+from datetime import timedelta
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
 
-from app.core.dependencies import get_db
+from app.core.db import session_local
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import Page, json_response
 from app.repositories.loan_repository_impl import SQLLoanRepository
-from app.schemas.loan import LoanCreate
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.schemas.loan import (
+    Loan,
+    LoanBatchCreate,
+    LoanBatchReturn,
+    LoanCreate,
+    OverdueLoan,
+)
 from app.services.loan_service import LoanService
 
+# How often each worker reloads its book availability index, picking up
+# checkouts and returns made through other workers. 0 disables the resync.
+AVAILABILITY_RESYNC_SECONDS = float(os.getenv("AVAILABILITY_RESYNC_SECONDS", "30"))
+# How long a borrower may keep a book; sets the due date of new loans.
+LOAN_PERIOD_DAYS = int(os.getenv("LOAN_PERIOD_DAYS", "14"))
+
 router = APIRouter(prefix="/loans", tags=["Loans"])
 
 
-def get_service_instance(db: Session = Depends(get_db)):
+async def get_service_instance(db: DatabaseRunner = Depends(get_db_runner)):
     """
     Get an instance of the LoanService with a database session.
     Args:
-        db (Session): The database session.
+        db (DatabaseRunner): The runner holding the database session.
     Returns:
         LoanService: An instance of LoanService.
     """
-    return LoanService(SQLLoanRepository(db))
+    return LoanService(
+        SQLLoanRepository(db.session),
+        SQLStatsRepository(db.session),
+        loan_period=timedelta(days=LOAN_PERIOD_DAYS),
+    )
+
+
+def resync_availability() -> int:
+    """
+    Reload the book availability index from the database on a dedicated session.
+    Returns:
+        int: The number of books on loan.
+    """
+    db = session_local()
+    try:
+        return LoanService(
+            SQLLoanRepository(db), SQLStatsRepository(db)
+        ).resync_availability()
+    finally:
+        db.close()
 
 
 @router.post("/")
-def create_new_loan(
-    payload: LoanCreate, svc: LoanService = Depends(get_service_instance)
+async def create_new_loan(
+    payload: LoanCreate,
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
 ):
     """
     Create a new loan.
@@ -34,23 +73,90 @@ def create_new_loan(
     Returns:
         The created loan.
     """
-    return svc.create_loan(payload)
+    return await run(svc.create_loan, payload)
+
+
+@router.post("/batch")
+async def create_loan_batch(
+    payload: LoanBatchCreate,
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    Check out several books in one request.
+    Args:
+        payload (LoanBatchCreate): The loans to create.
+        svc (LoanService): The loan service instance.
+    Returns:
+        The outcome of each item: created, conflict or invalid.
+    """
+    return await run(svc.create_loans, payload)
+
+
+@router.put("/return/batch")
+async def return_loan_batch(
+    payload: LoanBatchReturn,
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    Return several loans in one request.
+    Args:
+        payload (LoanBatchReturn): The IDs of the loans to return.
+        svc (LoanService): The loan service instance.
+    Returns:
+        The outcome of each item: returned, already_returned or not_found.
+    """
+    return await run(svc.return_loans, payload)
 
 
 @router.get("/active")
-def list_active(svc: LoanService = Depends(get_service_instance)):
+async def list_active(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    List active loans one page at a time.
+    Args:
+        limit (int): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
+        svc (LoanService): The loan service instance.
+    Returns:
+        A page of active loans and the cursor of the next page.
+    """
+    page = await run(svc.get_active_loans, limit, cursor)
+    return json_response(page, Page[Loan])
+
+
+@router.get("/overdue")
+async def list_overdue(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
-    List all active loans.
+    List active loans past their due date one page at a time, most overdue
+    first.
     Args:
+        limit (int): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
         svc (LoanService): The loan service instance.
     Returns:
-        A list of active loans.
+        A page of overdue loans and the cursor of the next page.
     """
-    return svc.get_active_loans()
+    page = await run(svc.get_overdue_loans, limit, cursor)
+    return json_response(page, Page[OverdueLoan])
 
 
 @router.put("/{id}/return")
-def handle_return(id: UUID, svc: LoanService = Depends(get_service_instance)):
+async def handle_return(
+    id: UUID,
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Return a loan by its ID.
     Args:
@@ -59,11 +165,15 @@ def handle_return(id: UUID, svc: LoanService = Depends(get_service_instance)):
     Returns:
         The updated loan after return.
     """
-    return svc.return_loan(str(id))
+    return await run(svc.return_loan, str(id))
 
 
 @router.get("/history/borrower/{id}")
-def user_loan_history(id: str, svc: LoanService = Depends(get_service_instance)):
+async def user_loan_history(
+    id: str,
+    svc: LoanService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
     """
     Get the loan history for a specific borrower.
     Args:
@@ -72,4 +182,5 @@ def user_loan_history(id: str, svc: LoanService = Depends(get_service_instance))
     Returns:
         A list of loans for the specified borrower.
     """
-    return svc.get_borrower_loan_history(id)
+    loans = await run(svc.get_borrower_loan_history, id)
+    return json_response(loans, List[Loan])
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Expose the metrics in the Prometheus text format. In multi-process mode
+    the figures cover every worker, whichever one serves the scrape.
+    Returns:
+        The text exposition.
+    """
+    body, content_type = render_metrics()
+    # Passed as a header: media_type would get a second charset appended.
+    return Response(content=body, headers={"Content-Type": content_type})
@@ -0,0 +1,112 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.dependencies import DatabaseRunner, get_db_runner
+from app.core.responses import json_response
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.schemas.stats import BookCirculation, BorrowerCirculation, DailyCirculation
+from app.services.stats_service import StatsService
+
+# The longest range /stats/daily answers, in days.
+MAX_DAILY_RANGE = 366
+# How many rows the top-k endpoints return at most.
+MAX_TOP = 100
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+async def get_service_instance(db: DatabaseRunner = Depends(get_db_runner)):
+    """
+    Get an instance of the StatsService with a database session.
+    Args:
+        db (DatabaseRunner): The runner holding the database session.
+    Returns:
+        StatsService: An instance of StatsService.
+    """
+    return StatsService(SQLStatsRepository(db.session))
+
+
+@router.get("/books/most-borrowed")
+async def get_most_borrowed_books(
+    limit: int = Query(10, ge=1, le=MAX_TOP),
+    svc: StatsService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    List the most borrowed books.
+    Args:
+        limit (int): The number of books to return.
+        svc (StatsService): The stats service instance.
+    Returns:
+        The books with their checkout counts, most borrowed first.
+    """
+    books = await run(svc.get_most_borrowed_books, limit)
+    return json_response(books, List[BookCirculation])
+
+
+@router.get("/borrowers/busiest")
+async def get_busiest_borrowers(
+    limit: int = Query(10, ge=1, le=MAX_TOP),
+    svc: StatsService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    List the borrowers with the most books out.
+    Args:
+        limit (int): The number of borrowers to return.
+        svc (StatsService): The stats service instance.
+    Returns:
+        The borrowers with their loan counts, busiest first.
+    """
+    borrowers = await run(svc.get_busiest_borrowers, limit)
+    return json_response(borrowers, List[BorrowerCirculation])
+
+
+@router.get("/borrowers/{borrower_id}", response_model=BorrowerCirculation)
+async def get_borrower_stats(
+    borrower_id: UUID,
+    svc: StatsService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    Get a borrower's active and total loan counts.
+    Args:
+        borrower_id (UUID): The ID of the borrower.
+        svc (StatsService): The stats service instance.
+    Returns:
+        The borrower's loan counts.
+    """
+    return await run(svc.get_borrower_stats, borrower_id)
+
+
+@router.get("/daily")
+async def get_daily_counts(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    svc: StatsService = Depends(get_service_instance),
+    run: DatabaseRunner = Depends(get_db_runner),
+):
+    """
+    List the checkouts and returns of each day in a range, the last 30 days
+    by default. Days without any are left out.
+    Args:
+        start (Optional[date]): The first day of the range.
+        end (Optional[date]): The last day of the range, inclusive.
+        svc (StatsService): The stats service instance.
+    Returns:
+        The counts of each day, in date order.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    if (end - start).days >= MAX_DAILY_RANGE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"The range may span at most {MAX_DAILY_RANGE} days",
+        )
+    days = await run(svc.get_daily_counts, start, end)
+    return json_response(days, List[DailyCirculation])
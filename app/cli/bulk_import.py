@@ -0,0 +1,64 @@
+"""
+Bulk-import authors, books or borrowers from a CSV or JSON Lines file.
+
+    python -m app.cli.bulk_import books catalog.jsonl --chunk-size 2000
+
+Each chunk is committed as soon as it is written, so an interrupted import
+keeps the rows already loaded. Prints the import report as JSON.
+"""
+
+import argparse
+import json
+import sys
+
+from app.core.bulk_io import SUPPORTED_FORMATS, read_rows
+from app.core.db import session_local
+from app.repositories.author_repository_impl import SQLAuthorRepository
+from app.repositories.book_repository_impl import SQLBookRepository
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.repositories.table_version_repository_impl import SQLTableVersionRepository
+from app.services.import_service import (
+    DEFAULT_CHUNK_SIZE,
+    IMPORT_ENTITIES,
+    BulkImportService,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("entity", choices=IMPORT_ENTITIES)
+    parser.add_argument("path", help="input file, or - for stdin")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+    stream = (
+        sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    )
+
+    db = session_local()
+    try:
+        svc = BulkImportService(
+            SQLAuthorRepository(db),
+            SQLBookRepository(db),
+            SQLBorrowerRepository(db),
+            SQLTableVersionRepository(db),
+        )
+        report = svc.import_rows(
+            args.entity,
+            read_rows(stream, fmt),
+            chunk_size=args.chunk_size,
+            on_chunk=db.commit,
+        )
+    finally:
+        db.close()
+        stream.close()
+
+    json.dump(report, sys.stdout, indent=2, default=str)
+    print()
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Recompute the circulation statistics from the loans.
+
+    python -m app.cli.rebuild_stats
+
+The loan service keeps the statistics up to date as loans are made and
+returned, so this is only needed after loans were changed behind its back,
+e.g. by hand in SQL. On PostgreSQL, checkouts and returns wait while it runs.
+"""
+
+import argparse
+import sys
+
+from app.core.db import session_local
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.services.stats_service import StatsService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args(argv)
+
+    db = session_local()
+    try:
+        StatsService(SQLStatsRepository(db)).rebuild()
+        db.commit()
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Case-fold text and collapse its whitespace.
+    Args:
+        text (str): The text to normalize.
+    Returns:
+        str: The normalized text.
+    """
+    return " ".join(text.casefold().split())
+
+
+def index_keys(values: Iterable[str]) -> List[str]:
+    """
+    Build the keys a record is found by: each value as a whole, so that
+    "john sm" matches "John Smith", and each of its words, so that "smi" does.
+    Args:
+        values (Iterable[str]): The indexed fields of the record.
+    Returns:
+        List[str]: The distinct keys.
+    """
+    keys = set()
+    for value in values:
+        if not value:
+            continue
+        whole = normalize(value)
+        keys.add(whole)
+        keys.update(_WORD.findall(whole))
+    return sorted(keys)
+
+
+class PrefixIndex:
+    """
+    Thread-safe prefix index over sorted (key, id) pairs. A prefix lookup is
+    a bisect followed by a short scan. SortedList keeps the pairs in bounded
+    sorted chunks, so single-record updates stay logarithmic instead of
+    shifting one large array.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = SortedList()
+        self._records: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+        self._journal: Optional[List[Tuple[str, Optional[Tuple]]]] = None
+
+    def begin_resync(self) -> None:
+        """
+        Start recording local changes, so the ones made while a rebuild reads
+        the database are not lost when its snapshot is installed.
+        """
+        with self._lock:
+            self._journal = []
+
+    def load(
+        self, records: Iterable[Tuple[Any, Dict[str, Any], Iterable[str]]]
+    ) -> None:
+        """
+        Replace the whole index with a database snapshot and replay the local
+        changes recorded since begin_resync. The new arrays are built before
+        the lock is taken, so lookups keep being served from the old ones
+        meanwhile.
+        Args:
+            records (Iterable[Tuple[Any, Dict[str, Any], Iterable[str]]]): The
+                ID, returned payload and indexed fields of each record.
+        """
+        pairs: List[Tuple[str, str]] = []
+        by_id: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+        for record_id, payload, values in records:
+            key_id = str(record_id)
+            keys = index_keys(values)
+            by_id[key_id] = (payload, keys)
+            pairs.extend((key, key_id) for key in keys)
+        entries = SortedList(pairs)
+
+        with self._lock:
+            for key_id, record in self._journal or ():
+                self._put(entries, by_id, key_id, record)
+            self._entries = entries
+            self._records = by_id
+            self._journal = None
+
+    def upsert(
+        self, record_id: Any, payload: Dict[str, Any], values: Iterable[str]
+    ) -> None:
+        """
+        Add a record, or replace it if it is already indexed.
+        Args:
+            record_id (Any): The ID of the record.
+            payload (Dict[str, Any]): What lookups return for the record.
+            values (Iterable[str]): The indexed fields of the record.
+        """
+        self._record(str(record_id), (payload, index_keys(values)))
+
+    def remove(self, record_id: Any) -> None:
+        """
+        Remove a record if it is indexed.
+        Args:
+            record_id (Any): The ID of the record.
+        """
+        self._record(str(record_id), None)
+
+    def search(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Find records with a key that starts with the given prefix.
+        Args:
+            prefix (str): The text typed so far.
+            limit (int): The maximum number of records to return.
+        Returns:
+            List[Dict[str, Any]]: The payloads of the matching records, ordered
+            by their matching key.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for key, key_id in self._entries.irange(minimum=(prefix,)):
+                if not key.startswith(prefix) or len(found) >= limit:
+                    break
+                if key_id not in found:
+                    found[key_id] = self._records[key_id][0]
+        return list(found.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def _record(self, key_id: str, record: Optional[Tuple]) -> None:
+        """
+        Apply a local change, and journal it while a rebuild is running.
+        """
+        with self._lock:
+            self._put(self._entries, self._records, key_id, record)
+            if self._journal is not None:
+                self._journal.append((key_id, record))
+
+    @staticmethod
+    def _put(
+        entries: SortedList,
+        records: Dict[str, Tuple[Dict[str, Any], List[str]]],
+        key_id: str,
+        record: Optional[Tuple],
+    ) -> None:
+        """
+        Replace a record's entries, or remove them when record is None. The
+        caller must hold the lock.
+        """
+        old = records.pop(key_id, None)
+        if old is not None:
+            for key in old[1]:
+                entries.discard((key, key_id))
+        if record is not None:
+            records[key_id] = record
+            entries.update((key, key_id) for key in record[1])
+
+
+# One index per kind of record, shared by every request in the worker process.
+borrower_index = PrefixIndex()
+book_index = PrefixIndex()
+AUTOCOMPLETE_INDEXES = {"borrowers": borrower_index, "books": book_index}
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+
+class AvailabilityIndex:
+    """
+    Thread-safe set of the IDs of books currently on loan, kept per worker
+    process. Local checkouts and returns update it once they commit; changes
+    made by other workers arrive with the next resync, so it answers read-only
+    availability questions and never replaces the database on write paths.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._on_loan: Set[UUID] = set()
+        self._journal: Optional[List[Tuple[bool, UUID]]] = None
+        self.synced_at: Optional[float] = None
+
+    def begin_resync(self) -> None:
+        """
+        Start recording local changes, so the ones made while a resync reads
+        the database are not lost when its snapshot is installed.
+        """
+        with self._lock:
+            self._journal = []
+
+    def load(self, book_ids: Iterable[UUID]) -> None:
+        """
+        Replace the set with a database snapshot and replay the local changes
+        recorded since begin_resync.
+        Args:
+            book_ids (Iterable[UUID]): The books on loan in the snapshot.
+        """
+        on_loan = set(book_ids)
+        with self._lock:
+            for lent, book_id in self._journal or ():
+                if lent:
+                    on_loan.add(book_id)
+                else:
+                    on_loan.discard(book_id)
+            self._on_loan = on_loan
+            self._journal = None
+            self.synced_at = time.time()
+
+    def mark_on_loan(self, book_ids: Iterable[UUID]) -> None:
+        """
+        Record that books were checked out.
+        Args:
+            book_ids (Iterable[UUID]): The books that are now on loan.
+        """
+        self._record(True, book_ids)
+
+    def mark_returned(self, book_ids: Iterable[UUID]) -> None:
+        """
+        Record that books were returned.
+        Args:
+            book_ids (Iterable[UUID]): The books that are no longer on loan.
+        """
+        self._record(False, book_ids)
+
+    def on_loan(self, book_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given books are on loan.
+        Args:
+            book_ids (Iterable[UUID]): The books to check.
+        Returns:
+            Set[UUID]: The books among them that are on loan.
+        """
+        with self._lock:
+            return self._on_loan.intersection(book_ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._on_loan)
+
+    def _record(self, lent: bool, book_ids: Iterable[UUID]) -> None:
+        with self._lock:
+            for book_id in book_ids:
+                if lent:
+                    self._on_loan.add(book_id)
+                else:
+                    self._on_loan.discard(book_id)
+                if self._journal is not None:
+                    self._journal.append((lent, book_id))
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,52 @@
+import csv
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Stream rows out of a CSV or JSON Lines document one at a time.
+
+    Empty CSV cells are read as missing values. A JSON line that cannot be
+    parsed is yielded as a ValueError in place of the row so the caller can
+    report it against its line number.
+    Args:
+        stream (TextIO): The text stream to read.
+        fmt (str): Either "csv" or "jsonl".
+    Yields:
+        Tuple[int, Dict]: The line number and the row.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if v not in ("", None)}
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as exc:
+                yield line_no, exc
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[List]:
+    """
+    Group an iterable into lists of at most size items.
+    Args:
+        rows (Iterable): The items to group.
+        size (int): The maximum chunk size.
+    Yields:
+        List: The next chunk.
+    """
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
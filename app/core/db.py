@@ -1,13 +1,106 @@
 import os
+from typing import Callable
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from app.core.pool_stats import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool,
+)
+from app.core.query_stats import instrument_engine
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false").lower()
+    in ("1", "true", "yes"),
+}
+
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
+session_local = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+async_engine = (
+    create_async_engine(
+        ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **POOL_OPTIONS
+    )
+    if DB_ASYNC
+    else None
+)
+async_session_local = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if DB_ASYNC
+    else None
+)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """
+    Turn on foreign key enforcement, which SQLite leaves off by default, so
+    deletes cascade as they do on PostgreSQL.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+for _label, _engine in (
+    ("sync", engine),
+    ("async", async_engine.sync_engine if async_engine else None),
+):
+    if _engine is None:
+        continue
+    instrument_engine(_engine)
+    instrument_pool(_engine, _label)
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _enable_sqlite_foreign_keys)
 
-engine = create_engine(DATABASE_URL)
-session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def run_after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """
+    Run a callback once the session's transaction commits, and drop it if the
+    transaction rolls back or the session closes first. In-process state such
+    as caches and indexes goes through here, so it never shows a write the
+    database may still undo. Callbacks run after the session has handed its
+    connection back to the pool, so they may open a short transaction of
+    their own.
+    Args:
+        session (Session): The session whose transaction made the change.
+        callback (Callable[[], None]): The function to run after the commit.
+    """
+    if not event.contains(session, "after_commit", _mark_committed):
+        event.listen(session, "after_commit", _mark_committed)
+        event.listen(session, "after_transaction_end", _run_commit_callbacks)
+    if not session.in_transaction():
+        session.begin()
+    session.info.setdefault("commit_callbacks", []).append(callback)
+
+
+def _mark_committed(session: Session) -> None:
+    # after_commit also fires when a savepoint is released.
+    if session.in_nested_transaction():
+        return
+    session.info["committed_callbacks"] = session.info.pop("commit_callbacks", [])
+
+
+def _run_commit_callbacks(session: Session, transaction) -> None:
+    if transaction.parent is not None:
+        return
+    session.info.pop("commit_callbacks", None)
+    for callback in session.info.pop("committed_callbacks", ()):
+        callback()
@@ -1,16 +1,73 @@
+from typing import Any, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.db import DB_ASYNC, async_session_local, session_local
+
+
+class DatabaseRunner:
+    """
+    Runs synchronous service calls against the request's database session
+    without blocking the event loop.
+
+    In sync mode the call is sent to the threadpool. In async mode the same
+    repositories run on the sync facade of an AsyncSession through run_sync,
+    so every statement is awaited on the async driver instead.
+    """
+
+    def __init__(self, session: Session, async_session: Optional[AsyncSession] = None):
+        self.session = session
+        self.async_session = async_session
 
-from app.core.db import session_local
+    async def __call__(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a function that uses self.session and return its result.
+        Args:
+            fn (Callable[..., Any]): The function to run, usually a service method.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+        Returns:
+            Any: The value returned by fn.
+        """
+        if self.async_session is None:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        return await self.async_session.run_sync(lambda _: fn(*args, **kwargs))
 
+    async def release(self) -> None:
+        """
+        Commit the current transaction and hand its connection back to the pool.
 
-def get_db() -> Session:
+        Call this before slow work that needs no database, such as password
+        hashing, so the request does not hold a pooled connection while waiting.
+        """
+        if self.async_session is None:
+            await run_in_threadpool(self.session.commit)
+        else:
+            await self.async_session.commit()
+
+
+def _get_sync_runner() -> DatabaseRunner:
     """
-    Get a database session.
+    Get a DatabaseRunner backed by a synchronous session.
     """
     db = session_local()
     try:
-        yield db
+        yield DatabaseRunner(db)
         db.commit()
 
     finally:
         db.close()
+
+
+async def _get_async_runner() -> DatabaseRunner:
+    """
+    Get a DatabaseRunner backed by an AsyncSession.
+    """
+    async with async_session_local() as db:
+        yield DatabaseRunner(db.sync_session, db)
+        await db.commit()
+
+
+get_db_runner = _get_async_runner if DB_ASYNC else _get_sync_runner
@@ -42,3 +42,11 @@ class EmailAlreadyExistsException(LibraryError):
     def __init__(self, msg: str = "Email already exists"):
         self.msg = msg
         super().__init__(self.msg)
+
+
+class InvalidCursorException(LibraryError):
+    """Exception raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, msg: str = "Invalid pagination cursor"):
+        self.msg = msg
+        super().__init__(self.msg)
@@ -0,0 +1,109 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# With several workers, point PROMETHEUS_MULTIPROC_DIR at an empty directory
+# shared by all of them, in the environment of the process that starts them
+# (not in .env: prometheus_client reads it when this module is imported, and
+# its mere presence switches the mode on). Each worker then writes its
+# samples to files there and a scrape of any worker reports all of them.
+# Empty the directory before every start.
+MULTIPROCESS = bool(
+    os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, by route template.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+AUTH_FAILURES = Counter(
+    "auth_failures",
+    "Requests rejected for missing or invalid credentials.",
+    ["scheme", "reason"],
+)
+DOMAIN_EXCEPTIONS = Counter(
+    "domain_exceptions",
+    "Domain exceptions turned into error responses, by type.",
+    ["exception"],
+)
+
+# Label for requests no route matched, so that scanners probing random paths
+# cannot create a series per path.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def render_metrics():
+    """
+    Render the metrics in the Prometheus text exposition format.
+    Returns:
+        Tuple[bytes, str]: The exposition and its content type.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this worker's in-progress gauges from the shared files on shutdown.
+    """
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times each HTTP request and counts the requests in
+    progress. Latency is labelled with the route template rather than the
+    path, so /books/{book_id} is one series however many books are fetched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - start
+            )
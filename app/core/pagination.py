@@ -0,0 +1,114 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import tuple_
+
+from app.core.exceptions import InvalidCursorException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+Cursor = Tuple[datetime, UUID]
+RankCursor = Tuple[float, UUID]
+
+
+def encode_cursor(sort_value: Union[datetime, float], row_id: UUID) -> str:
+    """
+    Encode a keyset position into an opaque cursor string.
+    Args:
+        sort_value (Union[datetime, float]): The sort key of the last row on the page.
+        row_id (UUID): The ID of the last row on the page.
+    Returns:
+        str: The URL-safe cursor.
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, str(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], parse_sort: Callable[[Any], Any] = datetime.fromisoformat
+) -> Optional[Cursor]:
+    """
+    Decode an opaque cursor string back into a keyset position.
+    Args:
+        cursor (Optional[str]): The cursor received from the client.
+        parse_sort (Callable[[Any], Any]): Converts the decoded sort key, e.g.
+            float for search ranks.
+    Returns:
+        Optional[Cursor]: The decoded position, or None if no cursor was given.
+    Raises:
+        InvalidCursorException: If the cursor cannot be decoded.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return parse_sort(sort_value), UUID(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorException()
+
+
+def keyset_condition(
+    sort_column, id_column, after: Optional[Cursor], descending: bool = False
+):
+    """
+    Build the condition that selects the rows after a keyset position.
+    Args:
+        sort_column: The column the page is ordered by.
+        id_column: The primary key column used as a tie-breaker.
+        after (Optional[Cursor]): The position of the last row of the previous page.
+        descending (bool): Whether the page is ordered newest first.
+    Returns:
+        The condition, or None if there is no position to continue from.
+    """
+    if after is None:
+        return None
+    position = tuple_(sort_column, id_column)
+    return position < tuple_(*after) if descending else position > tuple_(*after)
+
+
+def apply_keyset(query, sort_column, id_column, limit: int, after: Optional[Cursor]):
+    """
+    Restrict a query to the page that follows the given keyset position.
+
+    One extra row is fetched so the caller can tell whether a next page exists.
+    Args:
+        query: The SQLAlchemy query to paginate.
+        sort_column: The column the page is ordered by.
+        id_column: The primary key column used as a tie-breaker.
+        limit (int): The page size.
+        after (Optional[Cursor]): The position of the last row of the previous page.
+    Returns:
+        The paginated query.
+    """
+    condition = keyset_condition(sort_column, id_column, after)
+    if condition is not None:
+        query = query.filter(condition)
+    return query.order_by(sort_column, id_column).limit(limit + 1)
+
+
+def split_page(
+    rows: List[Any], limit: int, key: Callable[[Any], Cursor]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the look-ahead row from a page and build the cursor for the next one.
+    Args:
+        rows (List[Any]): The rows returned by a query built with apply_keyset.
+        limit (int): The page size.
+        key (Callable[[Any], Cursor]): Returns the keyset position of a row.
+    Returns:
+        Tuple[List[Any], Optional[str]]: The page rows and the next cursor, if any.
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
@@ -0,0 +1,25 @@
+import asyncio
+import logging
+from typing import Any, Callable
+
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(fn: Callable[[], Any], interval: float, name: str) -> None:
+    """
+    Call a blocking function in the threadpool every interval seconds until
+    cancelled. A failed call is logged and retried on the next tick.
+    Args:
+        fn (Callable[[], Any]): The function to call.
+        interval (float): The number of seconds between calls.
+        name (str): What the function does, for the log.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(fn)
+        except SQLAlchemyError:
+            logger.exception("Periodic task failed: %s", name)
@@ -0,0 +1,194 @@
+import threading
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+WAIT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# The same figures for /metrics, labelled by engine. Unlike the snapshot,
+# these are summed over every worker when prometheus_client runs in
+# multi-process mode.
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection.",
+    ["engine"],
+    buckets=WAIT_BUCKETS,
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Connection checkouts that gave up waiting for the pool.",
+    ["engine"],
+)
+
+
+class PoolStats:
+    """
+    Collects connection checkout counts and a histogram of checkout wait times
+    for one engine's pool.
+    """
+
+    def __init__(self, engine: str, buckets: Tuple[float, ...] = WAIT_BUCKETS):
+        """
+        Args:
+            engine (str): The engine label used for the Prometheus metrics.
+            buckets (Tuple[float, ...]): The upper bounds of the wait histogram.
+        """
+        self.engine = engine
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._bucket_counts = [0] * (len(buckets) + 1)
+        self._wait_sum = 0.0
+        self._checkouts = 0
+        self._timeouts = 0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """
+        Record how long a caller waited for a connection.
+        Args:
+            seconds (float): The time spent waiting for the pool.
+            timed_out (bool): Whether the wait ended in a pool timeout.
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+
+        with self._lock:
+            self._bucket_counts[index] += 1
+            self._wait_sum += seconds
+            if timed_out:
+                self._timeouts += 1
+            else:
+                self._checkouts += 1
+
+        POOL_WAIT.labels(engine=self.engine).observe(seconds)
+        if timed_out:
+            POOL_TIMEOUTS.labels(engine=self.engine).inc()
+
+    def snapshot(self, pool: Pool) -> Dict:
+        """
+        Report the current pool occupancy together with the wait histogram.
+        Args:
+            pool (Pool): The pool whose occupancy should be reported.
+        Returns:
+            Dict: The pool statistics, with cumulative histogram buckets.
+        """
+        with self._lock:
+            counts = list(self._bucket_counts)
+            wait_sum = self._wait_sum
+            checkouts = self._checkouts
+            timeouts = self._timeouts
+
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+
+        occupancy = {}
+        if isinstance(pool, QueuePool):
+            occupancy = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "timeout": pool.timeout(),
+            }
+
+        return {
+            **occupancy,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_seconds": {
+                "buckets": cumulative,
+                "sum": wait_sum,
+                "count": running,
+            },
+        }
+
+
+# One per engine. The sync and async engines use different pool classes, so
+# the class picks the entry, which also survives Pool.recreate().
+pool_stats: Dict[str, PoolStats] = {
+    "sync": PoolStats("sync"),
+    "async": PoolStats("async"),
+}
+
+
+class _WaitTimingMixin:
+    """
+    Times every connection checkout and feeds it to the pool class's PoolStats.
+    """
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.observe_wait(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """
+    QueuePool that records checkout wait times.
+    """
+
+    stats = pool_stats["sync"]
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout wait times.
+    """
+
+    stats = pool_stats["async"]
+
+
+def instrument_pool(engine: Engine, label: str) -> None:
+    """
+    Track the connections checked out of an engine's pool. For an
+    AsyncEngine, pass its sync_engine.
+    Args:
+        engine (Engine): The engine to instrument.
+        label (str): The engine label used for the Prometheus gauge.
+    """
+    checked_out = POOL_CHECKED_OUT.labels(engine=label)
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
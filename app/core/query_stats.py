@@ -0,0 +1,150 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Add X-DB-Query-Count and X-DB-Query-Time-Ms headers to every response and
+# log every request's counts at INFO instead of DEBUG.
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", "false").lower() in ("1", "true", "yes")
+# Warn when a request issues more statements than this; 0 disables the check.
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "10"))
+# Warn when one statement runs this many times in a request, which usually
+# means it is issued once per row of an earlier result; 0 disables the check.
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+
+class QueryStats:
+    """
+    The statements one request issued and the time spent executing them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        """
+        Record one executed statement.
+        Args:
+            statement (str): The SQL text, with placeholders for the parameters.
+            seconds (float): How long the statement took.
+        """
+        self.count += 1
+        self.duration += seconds
+        self.statements[statement] += 1
+
+    def most_repeated(self):
+        """
+        Return the statement that ran most often and how often it ran.
+        Returns:
+            Optional[Tuple[str, int]]: The statement and its count, or None if
+            nothing ran.
+        """
+        top = self.statements.most_common(1)
+        return top[0] if top else None
+
+
+# The stats of the request being handled. The middleware stores a fresh
+# object per request; threadpool calls and tasks started by the request see
+# the same object, because they run in a copy of the request's context.
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with the statement,
+    # so a statement that fails leaves nothing behind.
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - context._query_started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count the statements run on an engine and time them. For an AsyncEngine,
+    pass its sync_engine.
+    Args:
+        engine (Engine): The engine to instrument.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that collects the query stats of each HTTP request, logs
+    them, warns about requests over the query budget or with a statement
+    repeated per row, and in debug mode adds them to the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and QUERY_DEBUG:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-query-time-ms", f"{stats.duration * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            self._log(scope, stats)
+
+    def _log(self, scope, stats: QueryStats) -> None:
+        """
+        Log a request's query stats, as a warning if it broke a limit.
+        """
+        route = scope.get("route")
+        name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        logger.log(
+            logging.INFO if QUERY_DEBUG else logging.DEBUG,
+            "%s: %d queries in %.2f ms",
+            name,
+            stats.count,
+            stats.duration * 1000,
+        )
+
+        if QUERY_BUDGET and stats.count > QUERY_BUDGET:
+            logger.warning(
+                "%s issued %d queries, over the budget of %d",
+                name,
+                stats.count,
+                QUERY_BUDGET,
+            )
+
+        repeated = stats.most_repeated()
+        if (
+            QUERY_REPEAT_THRESHOLD
+            and repeated
+            and repeated[1] >= QUERY_REPEAT_THRESHOLD
+        ):
+            statement, times = repeated
+            logger.warning(
+                "%s ran the same statement %d times, possibly once per row: %s",
+                name,
+                times,
+                " ".join(statement.split())[:200],
+            )
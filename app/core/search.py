@@ -0,0 +1,43 @@
+from sqlalchemy import Float, func, literal_column
+
+# The "simple" configuration lowercases words without stemming them, which
+# suits titles and personal names in any language.
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def search_document(column):
+    """
+    Build the tsvector of a text column. The expression must stay identical to
+    the one in the column's GIN index, or Postgres will not use the index.
+    Args:
+        column: The text column to index.
+    Returns:
+        The to_tsvector expression.
+    """
+    return func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, literal_column("''")))
+
+
+def search_query(q: str):
+    """
+    Parse user input into a tsquery, accepting quotes, OR and -word.
+    Args:
+        q (str): The search text.
+    Returns:
+        The websearch_to_tsquery expression.
+    """
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def text_rank(document, query):
+    """
+    Rank a tsvector against a tsquery.
+    """
+    return func.ts_rank(document, query, type_=Float)
+
+
+def fuzzy_rank(column, q: str):
+    """
+    Rank how closely q matches any word sequence of a text column, using
+    pg_trgm; 0 when the column is NULL.
+    """
+    return func.coalesce(func.word_similarity(q, column, type_=Float), 0.0)
@@ -1,13 +1,34 @@
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import LRUTTLCache
+from app.core.metrics import AUTH_FAILURES
+
 pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_CONCURRENCY = int(
+    os.getenv("PASSWORD_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS))
+)
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+
+# bcrypt releases the GIL while hashing, so a small dedicated thread pool is
+# enough to keep it off the event loop and away from the request threadpool.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_slots: Optional[asyncio.Semaphore] = None
+_hash_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
 
 def verify_password(password, hashed_password):
     """
@@ -33,6 +54,72 @@ def get_password_hash(password):
     return pwd.hash(password)
 
 
+def _get_hash_slots() -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding concurrent hashing for the running event loop.
+    Returns:
+        asyncio.Semaphore: The semaphore for the current loop.
+    """
+    global _hash_slots, _hash_slots_loop
+
+    loop = asyncio.get_running_loop()
+    if _hash_slots is None or _hash_slots_loop is not loop:
+        _hash_slots = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+        _hash_slots_loop = loop
+    return _hash_slots
+
+
+async def _run_hash(fn, *args):
+    """
+    Run a hashing function on the hashing pool once a slot is free.
+    Args:
+        fn: The CPU-bound function to run.
+        *args: Arguments for fn.
+    Returns:
+        The value returned by fn.
+    Raises:
+        HTTPException: If no slot frees up within the queue timeout.
+    """
+    slots = _get_hash_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        slots.release()
+
+
+async def verify_password_async(password, hashed_password) -> bool:
+    """
+    Verify a plain password against its hash without blocking the event loop.
+    Args:
+        password (str): The plain password to verify.
+        hashed_password (str): The hashed password to compare against.
+    Returns:
+        bool: True if the password matches the hash, False otherwise.
+    """
+    return await _run_hash(verify_password, password, hashed_password)
+
+
+async def get_password_hash_async(password) -> str:
+    """
+    Hash a plain password without blocking the event loop.
+    Args:
+        password (str): The plain password to hash.
+    Returns:
+        str: The hashed password.
+    """
+    return await _run_hash(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """
     Create a JWT access token.
@@ -92,23 +179,57 @@ def require_api_key(x_api_key: str | None = Security(api_key_header)):
         HTTPException: If the API key is missing or invalid.
     """
     if not x_api_key or not validate_api_key(x_api_key):
+        AUTH_FAILURES.labels("api_key", "invalid" if x_api_key else "missing").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key",
         )
 
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+# auto_error is off so that a missing token is counted like any other
+# failure; get_current_user raises the same 401 the scheme would have.
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
+# Verified token payloads, keyed by the raw token. An entry never outlives the
+# token's own exp claim.
+token_cache = LRUTTLCache(
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("JWT_CACHE_TTL", "300")),
+)
+
+
+def _reject_token(reason: str, detail: str) -> HTTPException:
+    """
+    Count a rejected JWT and build the error to raise for it.
+    Args:
+        reason (str): Why the token was rejected, used as the metric label.
+        detail (str): The message returned to the client.
+    Returns:
+        HTTPException: The 401 error.
+    """
+    AUTH_FAILURES.labels("jwt", reason).inc()
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"} if reason == "missing" else None,
+    )
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_current_user(token: str | None = Depends(oauth2_scheme)):
     """
     Get the current user from the JWT token.
     Args:
-        token (str): The JWT token provided in the request.
+        token (str | None): The JWT token provided in the request.
     Returns:
         dict: The payload of the JWT token.
     """
+    if not token:
+        raise _reject_token("missing", "Not authenticated")
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+
     secret = os.getenv("JWT_SECRET")
     algorithm = os.getenv("JWT_ALGORITHM", "HS256")
 
@@ -122,29 +243,19 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         payload = jwt.decode(token, secret, algorithms=[algorithm])
         username: str = payload.get("sub")
         if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or malformed token",
-        )
+            raise _reject_token("missing_subject", "Could not validate credentials")
+    except JWTError as exc:
+        reason = "expired" if isinstance(exc, ExpiredSignatureError) else "invalid"
+        raise _reject_token(reason, "Invalid or malformed token")
 
     exp = payload.get("exp")
     if not exp:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token missing expiration",
-        )
+        raise _reject_token("missing_expiration", "Token missing expiration")
 
     if datetime.now(timezone.utc).timestamp() > exp:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired",
-        )
+        raise _reject_token("expired", "Token expired")
 
+    token_cache.set(token, dict(payload), ttl=exp - time.time())
     return payload
 
 
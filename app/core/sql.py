@@ -0,0 +1,35 @@
+from uuid import UUID
+
+from sqlalchemy import TypeDecorator, Uuid
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+class UUIDType(TypeDecorator):
+    """
+    A UUID column: native on PostgreSQL and CHAR(32) on SQLite. The routes
+    pass IDs through as strings, so those are parsed before they are bound,
+    which the PostgreSQL driver would otherwise do for us.
+    """
+
+    impl = Uuid
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return UUID(value)
+        return value
+
+
+def dialect_insert(session: Session, model):
+    """
+    Build an INSERT for the session's dialect, which supports ON CONFLICT.
+    Args:
+        session (Session): The session the statement will run on.
+        model: The mapped class or table to insert into.
+    Returns:
+        The dialect-specific Insert construct.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
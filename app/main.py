@@ -1,30 +1,104 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
 
 from fastapi import FastAPI, Depends
 from fastapi.responses import JSONResponse
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
-from app.api import author, book, borrower, loan, auth
+from app.api import (
+    author,
+    autocomplete,
+    book,
+    borrower,
+    bulk_import,
+    export,
+    loan,
+    auth,
+    health,
+    metrics,
+    stats,
+)
+from app.core.db import async_engine, engine
+from app.core.metrics import DOMAIN_EXCEPTIONS, MetricsMiddleware, mark_process_dead
+from app.core.periodic import run_periodically
+from app.core.query_stats import QueryStatsMiddleware
 from app.core.security import require_api_key_and_jwt
 from app.core.exceptions import (
     NotFoundException,
     BookAlreadyBorrowedException,
     ActiveLoanExistsException,
     BorrowerNotFoundException,
+    InvalidCursorException,
 )
 
-
 load_dotenv()
 # Base.metadata.create_all(engine)
 
-app = FastAPI(title="Library Management System", version="1.0.0")
+
+# The per-worker in-memory indexes: a name, the function that reloads them
+# from the database, and the refresh interval in seconds (0 disables it).
+IN_MEMORY_INDEXES = [
+    (
+        "autocomplete indexes",
+        autocomplete.rebuild_indexes,
+        autocomplete.AUTOCOMPLETE_REFRESH_SECONDS,
+    ),
+    (
+        "book availability index",
+        loan.resync_availability,
+        loan.AVAILABILITY_RESYNC_SECONDS,
+    ),
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the in-memory indexes before serving requests and keep them fresh
+    while the application runs. On shutdown, close the pooled connections;
+    aiosqlite's connection threads would otherwise keep the process alive.
+    """
+    refreshers = []
+    for name, load, interval in IN_MEMORY_INDEXES:
+        try:
+            await run_in_threadpool(load)
+        except SQLAlchemyError:
+            # Serve with an empty index rather than not at all; the periodic
+            # refresh fills it once the database is reachable.
+            logging.getLogger(__name__).exception("Building the %s failed", name)
+        if interval > 0:
+            refreshers.append(
+                asyncio.create_task(run_periodically(load, interval, name))
+            )
+    yield
+    for refresher in refreshers:
+        refresher.cancel()
+    if async_engine is not None:
+        await async_engine.dispose()
+    await run_in_threadpool(engine.dispose)
+    mark_process_dead()
+
+
+app = FastAPI(title="Library Management System", version="1.0.0", lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(author.router, dependencies=[Depends(require_api_key_and_jwt)])
 app.include_router(book.router, dependencies=[Depends(require_api_key_and_jwt)])
 app.include_router(borrower.router, dependencies=[Depends(require_api_key_and_jwt)])
 app.include_router(loan.router, dependencies=[Depends(require_api_key_and_jwt)])
+app.include_router(bulk_import.router, dependencies=[Depends(require_api_key_and_jwt)])
+app.include_router(export.router, dependencies=[Depends(require_api_key_and_jwt)])
+app.include_router(autocomplete.router, dependencies=[Depends(require_api_key_and_jwt)])
+app.include_router(stats.router, dependencies=[Depends(require_api_key_and_jwt)])
 
 
 @app.exception_handler(NotFoundException)
@@ -32,6 +106,7 @@ async def handle_not_found(request, exc: NotFoundException):
     """
     Handle cases when a requested resource is not found.
     """
+    DOMAIN_EXCEPTIONS.labels(type(exc).__name__).inc()
     return JSONResponse(status_code=404, content={"detail": str(exc)})
 
 
@@ -40,6 +115,7 @@ async def handle_already_borrowed(request, exc: BookAlreadyBorrowedException):
     """
     Handle cases when a book is already borrowed.
     """
+    DOMAIN_EXCEPTIONS.labels(type(exc).__name__).inc()
     return JSONResponse(status_code=409, content={"detail": str(exc)})
 
 
@@ -48,6 +124,7 @@ async def handle_active_loan(request, exc: ActiveLoanExistsException):
     """
     Handle cases when an active loan exists.
     """
+    DOMAIN_EXCEPTIONS.labels(type(exc).__name__).inc()
     return JSONResponse(status_code=409, content={"detail": str(exc)})
 
 
@@ -56,14 +133,25 @@ async def handle_borrower_not_found(request, exc: BorrowerNotFoundException):
     """
     Handle cases when a borrower is not found.
     """
+    DOMAIN_EXCEPTIONS.labels(type(exc).__name__).inc()
     return JSONResponse(status_code=404, content={"detail": str(exc)})
 
 
+@app.exception_handler(InvalidCursorException)
+async def handle_invalid_cursor(request, exc: InvalidCursorException):
+    """
+    Handle cases when a pagination cursor cannot be decoded.
+    """
+    DOMAIN_EXCEPTIONS.labels(type(exc).__name__).inc()
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 @app.exception_handler(IntegrityError)
 async def handle_integrity_error(request, exc: IntegrityError):
     """
     Handle cases when a data integrity violation occurs.
     """
+    DOMAIN_EXCEPTIONS.labels(type(exc).__name__).inc()
     return JSONResponse(
         status_code=409,
         content={"detail": "Data integrity violation"},
@@ -1,9 +1,11 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import UUID, Column, String, DateTime
+from sqlalchemy import Column, DateTime, Index, String
 
 from app.core.db import Base
+from app.core.search import search_document
+from app.core.sql import UUIDType
 
 
 class Author(Base):
@@ -11,6 +13,19 @@ class Author(Base):
 
     bio = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(UUIDType, primary_key=True, default=uuid4)
     name = Column(String)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_authors_created_at_id", created_at, id),
+        Index(
+            "ix_authors_name_search", search_document(name), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_authors_name_trgm",
+            name,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -1,18 +1,39 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import UUID, Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
 
 from app.core.db import Base
+from app.core.search import search_document
+from app.core.sql import UUIDType
 
 
 class Book(Base):
     __tablename__ = "Books"
 
-    author_id = Column(UUID(as_uuid=True), ForeignKey("Authors.id", ondelete="CASCADE"))
+    author_id = Column(UUIDType, ForeignKey("Authors.id", ondelete="CASCADE"))
     created_at = Column(DateTime, default=datetime.utcnow)
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(UUIDType, primary_key=True, default=uuid4)
     isbn = Column(String)
     published_date = Column(DateTime)
     title = Column(String)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_books_created_at_id", created_at, id),
+        Index(
+            "ix_books_title_search", search_document(title), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_books_title_trgm",
+            title,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_books_isbn_trgm",
+            isbn,
+            postgresql_using="gin",
+            postgresql_ops={"isbn": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -1,17 +1,22 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import UUID, Column, DateTime, String
+from sqlalchemy import BigInteger, Column, DateTime, Index, String
 
 from app.core.db import Base
+from app.core.sql import UUIDType
 
 
 class Borrower(Base):
     __tablename__ = "Borrowers"
+    __table_args__ = (Index("ix_borrowers_created_at_id", "created_at", "id"),)
 
     created_at = Column(DateTime, default=datetime.utcnow)
     email = Column(String, unique=True)
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(UUIDType, primary_key=True, default=uuid4)
+    # Bumped whenever one of the borrower's loans is created or returned, so
+    # the profile ETag can be read off this row instead of the loans.
+    loans_version = Column(BigInteger, nullable=False, default=0)
     name = Column(String)
     phone = Column(String)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
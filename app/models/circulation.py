@@ -0,0 +1,57 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+)
+
+from app.core.db import Base
+from app.core.sql import UUIDType
+
+# Every checkout of a day updates that day's counters, so they are spread
+# over this many rows per day, picked at random, for concurrent checkouts not
+# to queue on one row lock. Readers sum the shards.
+DAILY_STATS_SHARDS = 8
+
+
+class BookCirculationStats(Base):
+    __tablename__ = "BookCirculationStats"
+
+    book_id = Column(
+        UUIDType, ForeignKey("Books.id", ondelete="CASCADE"), primary_key=True
+    )
+    checkouts = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_book_circulation_stats_checkouts", checkouts.desc(), book_id),
+    )
+
+
+class BorrowerCirculationStats(Base):
+    __tablename__ = "BorrowerCirculationStats"
+
+    borrower_id = Column(
+        UUIDType, ForeignKey("Borrowers.id", ondelete="CASCADE"), primary_key=True
+    )
+    active_loans = Column(Integer, nullable=False, default=0)
+    total_loans = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            "ix_borrower_circulation_stats_active_loans",
+            active_loans.desc(),
+            borrower_id,
+        ),
+    )
+
+
+class DailyCirculationStats(Base):
+    __tablename__ = "DailyCirculationStats"
+
+    day = Column(Date, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    checkouts = Column(BigInteger, nullable=False, default=0)
+    returns = Column(BigInteger, nullable=False, default=0)
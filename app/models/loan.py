@@ -1,19 +1,59 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import UUID, Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, ForeignKey, Index
 
 from app.core.db import Base
+from app.core.sql import UUIDType
 
 
 class Loan(Base):
     __tablename__ = "Loans"
-    book_id = Column(UUID(as_uuid=True), ForeignKey("Books.id", ondelete="CASCADE"))
-    borrower_id = Column(
-        UUID(as_uuid=True), ForeignKey("Borrowers.id", ondelete="CASCADE")
-    )
+    book_id = Column(UUIDType, ForeignKey("Books.id", ondelete="CASCADE"))
+    borrower_id = Column(UUIDType, ForeignKey("Borrowers.id", ondelete="CASCADE"))
     created_at = Column(DateTime, default=datetime.utcnow)
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    due_date = Column(DateTime, nullable=True)
+    id = Column(UUIDType, primary_key=True, default=uuid4)
     loan_date = Column(DateTime, default=datetime.utcnow)
     return_date = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "ix_loans_active_created_at_id",
+            created_at,
+            id,
+            postgresql_where=return_date.is_(None),
+        ),
+        Index(
+            "ix_loans_borrower_created_at_id",
+            borrower_id,
+            created_at,
+            id,
+        ),
+        Index(
+            "ix_loans_active_borrower_created_at_id",
+            borrower_id,
+            created_at,
+            id,
+            postgresql_where=return_date.is_(None),
+            sqlite_where=return_date.is_(None),
+        ),
+        # Covers every column the overdue listing reads, so PostgreSQL can
+        # answer it with an index-only scan.
+        Index(
+            "ix_loans_active_due_date_id",
+            due_date,
+            id,
+            postgresql_where=return_date.is_(None),
+            postgresql_include=["book_id", "borrower_id", "loan_date"],
+            sqlite_where=return_date.is_(None),
+        ),
+        Index(
+            "uq_loans_active_book_id",
+            book_id,
+            unique=True,
+            postgresql_where=return_date.is_(None),
+            sqlite_where=return_date.is_(None),
+        ),
+    )
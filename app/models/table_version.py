@@ -0,0 +1,10 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.core.db import Base
+
+
+class TableVersion(Base):
+    __tablename__ = "TableVersions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
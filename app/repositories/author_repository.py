@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from app.core.pagination import Cursor
 
 from app.models.author import Author
 
@@ -11,10 +14,9 @@ class AuthorRepositoryInterface(ABC):
     """
 
     @abstractmethod
-    def get_authors(self) -> List["Author"]:
+    def get_authors(self, limit: int, after: Optional[Cursor] = None) -> List["Author"]:
         """
-        Retrieve all authors.
-
+        Retrieve a page of authors ordered by creation time.
         """
         pass
 
@@ -33,16 +35,29 @@ class AuthorRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def update_author(self, author: "Author") -> "Author":
+    def create_authors(self, rows: List[Dict]) -> None:
         """
-        Update an existing author in the repository.
+        Insert several authors in one round trip.
         """
         pass
 
     @abstractmethod
-    def delete_author(self, author_id: str) -> None:
+    def get_existing_author_ids(self, author_ids: Iterable[UUID]) -> Set[UUID]:
         """
-        Delete an author by their ID.
+        Return which of the given author IDs exist.
         """
         pass
+
+    @abstractmethod
+    def update_author(self, author_id: UUID, values: Dict) -> Optional["Author"]:
+        """
+        Update an author's columns and return the updated row.
+        """
+        pass
+
+    @abstractmethod
+    def delete_author(self, author_id: str) -> Optional[UUID]:
+        """
+        Delete an author by their ID, returning the ID if it existed.
+        """
         pass
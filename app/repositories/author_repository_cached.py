@@ -0,0 +1,120 @@
+import os
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUTTLCache
+from app.core.db import run_after_commit
+from app.core.pagination import Cursor
+from app.models.author import Author
+from app.repositories.author_repository import AuthorRepositoryInterface
+
+# Detached author snapshots, keyed by the author ID as a string. The cache is
+# per worker process, so a write made by another worker becomes visible here
+# after at most AUTHOR_CACHE_TTL seconds.
+author_cache = LRUTTLCache(
+    maxsize=int(os.getenv("AUTHOR_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTHOR_CACHE_TTL", "60")),
+)
+
+
+class CachedAuthorRepository(AuthorRepositoryInterface):
+    """
+    Read-through cache around another author repository. Lookups by ID are
+    served from author_cache; updates and deletes invalidate the entry, once
+    straight away and again when the session commits.
+    """
+
+    def __init__(
+        self,
+        inner: AuthorRepositoryInterface,
+        session: Session,
+        cache: LRUTTLCache = author_cache,
+    ):
+        self.inner = inner
+        self.session = session
+        self.cache = cache
+
+    def get_authors(self, limit: int, after: Optional[Cursor] = None) -> List[Author]:
+        """
+        Retrieve a page of authors ordered by creation time. Pages are not cached.
+        """
+        return self.inner.get_authors(limit, after)
+
+    def get_author_by_id(self, aid: str) -> Optional[Author]:
+        """
+        Retrieve an author by their ID, from the cache when possible.
+        Args:
+            aid (str): The ID of the author.
+        Returns:
+            Optional[Author]: A read-only, session-less Author object if found,
+            otherwise None.
+        """
+        key = str(aid)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        author = self.inner.get_author_by_id(aid)
+        if author is None:
+            return None
+
+        snapshot = self._snapshot(author)
+        self.cache.set(key, snapshot)
+        return snapshot
+
+    def create_author(self, new_author: Author) -> Author:
+        """
+        Create a new author in the repository.
+        """
+        return self.inner.create_author(new_author)
+
+    def create_authors(self, rows: List[Dict]) -> None:
+        """
+        Insert several authors in one round trip.
+        """
+        self.inner.create_authors(rows)
+
+    def get_existing_author_ids(self, author_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given author IDs exist.
+        """
+        return self.inner.get_existing_author_ids(author_ids)
+
+    def update_author(self, author_id: UUID, values: Dict) -> Optional[Author]:
+        """
+        Update an author and drop its cache entry.
+        """
+        updated = self.inner.update_author(author_id, values)
+        self._invalidate(str(author_id))
+        return updated
+
+    def delete_author(self, author_id: str) -> Optional[UUID]:
+        """
+        Delete an author and drop its cache entry.
+        """
+        deleted = self.inner.delete_author(author_id)
+        self._invalidate(str(author_id))
+        return deleted
+
+    def _invalidate(self, key: str) -> None:
+        """
+        Drop a cache entry now and again after the session commits. Until the
+        commit, a concurrent read still sees the old row in the database and
+        may put it back in the cache.
+        """
+        self.cache.delete(key)
+        run_after_commit(self.session, lambda: self.cache.delete(key))
+
+    def _snapshot(self, author: Author) -> Author:
+        """
+        Copy an author into a transient object that is safe to share between
+        sessions and threads, as long as nobody mutates it.
+        """
+        return Author(
+            **{
+                column.key: getattr(author, column.key)
+                for column in Author.__table__.columns
+            }
+        )
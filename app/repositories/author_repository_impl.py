@@ -1,7 +1,10 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
 
+from sqlalchemy import delete, insert, update
 from sqlalchemy.orm import Session
 
+from app.core.pagination import Cursor, apply_keyset
 from app.models.author import Author
 from app.repositories.author_repository import AuthorRepositoryInterface
 
@@ -10,14 +13,17 @@ class SQLAuthorRepository(AuthorRepositoryInterface):
     def __init__(self, sess: Session):
         self.session = sess
 
-    def get_authors(self) -> List[Author]:
+    def get_authors(self, limit: int, after: Optional[Cursor] = None) -> List[Author]:
         """
-        Retrieve all authors.
-
-         Returns:
-            List[Author]: A list of all Author objects.
+        Retrieve a page of authors ordered by creation time.
+        Args:
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last author already seen.
+        Returns:
+            List[Author]: Up to limit + 1 Author objects.
         """
-        return self.session.query(Author).all()
+        query = self.session.query(Author)
+        return apply_keyset(query, Author.created_at, Author.id, limit, after).all()
 
     def get_author_by_id(self, aid: str) -> Optional[Author]:
         """
@@ -41,31 +47,57 @@ class SQLAuthorRepository(AuthorRepositoryInterface):
         """
         self.session.add(new_author)
         self.session.flush()
-        self.session.refresh(new_author)
         return new_author
 
-    def update_author(self, author_data: Author) -> Author:
+    def create_authors(self, rows: List[Dict]) -> None:
+        """
+        Insert several authors in one round trip.
+        Args:
+            rows (List[Dict]): The column values of each author.
         """
-        Update an existing author in the repository.
+        if rows:
+            self.session.execute(insert(Author), rows)
 
+    def get_existing_author_ids(self, author_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given author IDs exist.
         Args:
-            author_data (Author): The Author object to update.
+            author_ids (Iterable[UUID]): The IDs to look up.
+        Returns:
+            Set[UUID]: The IDs that belong to existing authors.
+        """
+        rows = self.session.query(Author.id).filter(Author.id.in_(list(author_ids)))
+        return {row.id for row in rows}
+
+    def update_author(self, author_id: UUID, values: Dict) -> Optional[Author]:
+        """
+        Update an author's columns in one UPDATE ... RETURNING statement.
+
+        Args:
+            author_id (UUID): The ID of the author to update.
+            values (Dict): The columns to change.
 
         Returns:
-            Author: The newly created Author object with updated fields (e.g., ID).
+            Optional[Author]: The updated Author object, or None if it does not exist.
 
         """
-        self.session.flush()
-        self.session.refresh(author_data)
-        return author_data
+        stmt = (
+            update(Author)
+            .where(Author.id == author_id)
+            .values(**values)
+            .returning(Author)
+        )
+        return self.session.scalars(stmt).first()
 
-    def delete_author(self, author_id: str) -> None:
+    def delete_author(self, author_id: str) -> Optional[UUID]:
         """
-        Delete an author by their ID.
+        Delete an author in one DELETE ... RETURNING statement, without loading
+        them. The database cascades the delete to their books and loans.
         Args:
             author_id (str): The ID of the author to delete.
+        Returns:
+            Optional[UUID]: The ID of the deleted author, or None if it does not
+            exist.
         """
-        rec = self.get_author_by_id(author_id)
-        if rec:
-            self.session.delete(rec)
-            self.session.flush()
+        stmt = delete(Author).where(Author.id == author_id).returning(Author.id)
+        return self.session.scalars(stmt).first()
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
 
+from app.core.pagination import Cursor, RankCursor
 from app.models.book import Book
 
 
@@ -11,9 +13,35 @@ class BookRepositoryInterface(ABC):
     """
 
     @abstractmethod
-    def get_books(self) -> List[Book]:
+    def get_books(self, limit: int, after: Optional[Cursor] = None) -> List[Book]:
         """
-        Retrieve all books.
+        Retrieve a page of books ordered by creation time.
+        """
+        pass
+
+    @abstractmethod
+    def get_books_with_author_names(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Tuple[Book, Optional[str]]]:
+        """
+        Retrieve a page of books together with the name of their author.
+        """
+        pass
+
+    @abstractmethod
+    def search_books_with_author_names(
+        self, q: str, limit: int, after: Optional[RankCursor] = None
+    ) -> List[Tuple[Book, Optional[str], float]]:
+        """
+        Retrieve a page of books matching a search, best matches first, with
+        the name of their author.
+        """
+        pass
+
+    @abstractmethod
+    def iter_books_with_author_names(self, batch_size: int = 1000) -> Iterator:
+        """
+        Stream every book with its author name without loading them all into memory.
         """
         pass
 
@@ -24,6 +52,15 @@ class BookRepositoryInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_book_with_author_name(
+        self, book_id: str
+    ) -> Optional[Tuple[Book, Optional[str]]]:
+        """
+        Retrieve a book by its ID together with the name of its author.
+        """
+        pass
+
     @abstractmethod
     def create_book(self, book: Book) -> Book:
         """
@@ -32,16 +69,26 @@ class BookRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def update_book(self, book: Book) -> Book:
+    def create_books(self, rows: List[Dict]) -> None:
         """
-        Update an existing book in the repository.
+        Insert several books in one round trip.
         """
         pass
 
     @abstractmethod
-    def delete_book(self, book_id: str) -> None:
+    def update_book(
+        self, book_id: UUID, values: Dict
+    ) -> Optional[Tuple[Book, Optional[str]]]:
         """
-        Delete a book by its ID.
+        Update a book's columns and return the updated row with its author name.
+        """
+        pass
+
+    @abstractmethod
+    def delete_book(self, book_id: str) -> Optional[UUID]:
+        """
+        Delete a book by its ID unless it is on loan, returning the ID if it
+        was deleted.
         """
         pass
 
@@ -51,3 +98,10 @@ class BookRepositoryInterface(ABC):
         Retrieve all books by a specific author.
         """
         pass
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback once the current transaction commits.
+        """
+        pass
@@ -1,7 +1,30 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Float,
+    and_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    union,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
 
+from app.core.db import run_after_commit
+from app.core.pagination import Cursor, RankCursor, apply_keyset
+from app.core.search import (
+    fuzzy_rank,
+    search_document,
+    search_query,
+    text_rank,
+)
+from app.models.author import Author
 from app.models.book import Book
 from app.models.loan import Loan
 from app.repositories.book_repository import BookRepositoryInterface
@@ -11,13 +34,122 @@ class SQLBookRepository(BookRepositoryInterface):
     def __init__(self, session: Session):
         self.session = session
 
-    def get_books(self) -> List[Book]:
+    def get_books(self, limit: int, after: Optional[Cursor] = None) -> List[Book]:
         """
-        Retrieve all books.
+        Retrieve a page of books ordered by creation time.
+        Args:
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last book already seen.
+        Returns:
+            List[Book]: Up to limit + 1 Book objects.
+        """
+        query = self.session.query(Book)
+        return apply_keyset(query, Book.created_at, Book.id, limit, after).all()
+
+    def get_books_with_author_names(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Tuple[Book, Optional[str]]]:
+        """
+        Retrieve a page of books together with the name of their author in a
+        single joined query.
+        Args:
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last book already seen.
+        Returns:
+            List[Tuple[Book, Optional[str]]]: Up to limit + 1 pairs of Book objects
+            and author names.
+        """
+        query = self.session.query(Book, Author.name).outerjoin(
+            Author, Author.id == Book.author_id
+        )
+        rows = apply_keyset(query, Book.created_at, Book.id, limit, after).all()
+        return [(book, author_name) for book, author_name in rows]
+
+    def search_books_with_author_names(
+        self, q: str, limit: int, after: Optional[RankCursor] = None
+    ) -> List[Tuple[Book, Optional[str], float]]:
+        """
+        Retrieve a page of books matching a search on title, ISBN or author name,
+        best matches first, in a single query.
+
+        Candidates are collected by two index-backed lookups, one per table,
+        because an OR across a join cannot use either table's indexes. Only the
+        candidates are then ranked.
+        Args:
+            q (str): The search text.
+            limit (int): The page size.
+            after (Optional[RankCursor]): The rank and ID of the last book already seen.
+        Returns:
+            List[Tuple[Book, Optional[str], float]]: Up to limit + 1 tuples of
+            Book objects, author names and ranks.
+        """
+        tsquery = search_query(q)
+        title_doc = search_document(Book.title)
+        name_doc = search_document(Author.name)
+
+        book_hits = select(Book.id).where(
+            or_(
+                title_doc.op("@@")(tsquery),
+                Book.title.op("%>")(q),
+                Book.isbn.icontains(q, autoescape=True),
+            )
+        )
+        author_hits = (
+            select(Book.id)
+            .join(Author, Author.id == Book.author_id)
+            .where(or_(name_doc.op("@@")(tsquery), Author.name.op("%>")(q)))
+        )
+        hits = union(book_hits, author_hits).subquery()
+
+        # Title matches outrank author matches; an exact ISBN scores 1 on its own.
+        rank = (
+            text_rank(title_doc, tsquery)
+            + 0.5 * text_rank(name_doc, tsquery)
+            + func.greatest(
+                fuzzy_rank(Book.title, q),
+                fuzzy_rank(Book.isbn, q),
+                0.5 * fuzzy_rank(Author.name, q),
+            )
+        )
+        ranked = (
+            select(
+                Book, Author.name.label("author_name"), cast(rank, Float).label("rank")
+            )
+            .join(hits, hits.c.id == Book.id)
+            .outerjoin(Author, Author.id == Book.author_id)
+            .subquery()
+        )
+
+        book = aliased(Book, ranked)
+        query = self.session.query(book, ranked.c.author_name, ranked.c.rank)
+        if after is not None:
+            after_rank, after_id = after
+            query = query.filter(
+                or_(
+                    ranked.c.rank < after_rank,
+                    and_(ranked.c.rank == after_rank, ranked.c.id > after_id),
+                )
+            )
+        rows = query.order_by(ranked.c.rank.desc(), ranked.c.id).limit(limit + 1).all()
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    def iter_books_with_author_names(self, batch_size: int = 1000) -> Iterator:
+        """
+        Stream every book with its author name through a server-side cursor.
+        Args:
+            batch_size (int): The number of rows fetched per round trip.
         Returns:
-            List[Book]: A list of all Book objects.
+            Iterator: Rows with the book columns and author_name, not ORM objects.
         """
-        return self.session.query(Book).all()
+        query = self.session.query(
+            Book.id,
+            Book.title,
+            Book.isbn,
+            Book.published_date,
+            Book.author_id,
+            Author.name.label("author_name"),
+        ).outerjoin(Author, Author.id == Book.author_id)
+        return iter(query.yield_per(batch_size))
 
     def get_book_by_id(self, book_id: str) -> Optional[Book]:
         """
@@ -30,6 +162,27 @@ class SQLBookRepository(BookRepositoryInterface):
         res = self.session.query(Book).filter(Book.id == book_id).first()
         return res
 
+    def get_book_with_author_name(
+        self, book_id: str
+    ) -> Optional[Tuple[Book, Optional[str]]]:
+        """
+        Retrieve a book by its ID together with the name of its author.
+        Args:
+            book_id (str): The ID of the book.
+        Returns:
+            Optional[Tuple[Book, Optional[str]]]: The Book object and author name
+            if found, otherwise None.
+        """
+        row = (
+            self.session.query(Book, Author.name)
+            .outerjoin(Author, Author.id == Book.author_id)
+            .filter(Book.id == book_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return row[0], row[1]
+
     def create_book(self, book: Book) -> Book:
         """
         Create a new book in the repository.
@@ -40,47 +193,58 @@ class SQLBookRepository(BookRepositoryInterface):
         """
         self.session.add(book)
         self.session.flush()
-        self.session.refresh(book)
         return book
 
-    def update_book(self, book: Book) -> Book:
+    def create_books(self, rows: List[Dict]) -> None:
         """
-        Update an existing book in the repository.
+        Insert several books in one round trip.
         Args:
-            book (Book): The Book object to update.
-        Returns:
-            Book: The updated Book object.
+            rows (List[Dict]): The column values of each book.
         """
-        self.session.flush()
-        self.session.refresh(book)
-        return book
+        if rows:
+            self.session.execute(insert(Book), rows)
 
-    def delete_book(self, book_id: str) -> None:
+    def update_book(
+        self, book_id: UUID, values: Dict
+    ) -> Optional[Tuple[Book, Optional[str]]]:
         """
-        Delete a book by its ID.
+        Update a book's columns in one UPDATE ... RETURNING statement, which
+        also returns the name of its (possibly new) author.
         Args:
-            book_id (str): The ID of the book to delete.
-
+            book_id (UUID): The ID of the book to update.
+            values (Dict): The columns to change.
+        Returns:
+            Optional[Tuple[Book, Optional[str]]]: The updated Book object and
+            author name, or None if the book does not exist.
         """
-        target = self.get_book_by_id(book_id)
-        if target:
-            self.session.delete(target)
-            self.session.flush()
+        author_name = (
+            select(Author.name).where(Author.id == Book.author_id).scalar_subquery()
+        )
+        stmt = (
+            update(Book)
+            .where(Book.id == book_id)
+            .values(**values)
+            .returning(Book, author_name)
+        )
+        row = self.session.execute(stmt).first()
+        if row is None:
+            return None
+        return row[0], row[1]
 
-    def has_active_loan(self, book_id: str) -> bool:
+    def delete_book(self, book_id: str) -> Optional[UUID]:
         """
-        Check if a book has an active loan.
+        Delete a book in one DELETE ... RETURNING statement, unless it has an
+        active loan, which the partial unique index on active loans answers.
+        The database cascades the delete to the book's past loans.
         Args:
-            book_id (str): The ID of the book to check.
+            book_id (str): The ID of the book to delete.
         Returns:
-            bool: True if the book has an active loan, False otherwise.
+            Optional[UUID]: The ID of the deleted book, or None if it does not
+            exist or is on loan.
         """
-        check = (
-            self.session.query(Loan)
-            .filter(Loan.book_id == book_id, Loan.return_date.is_(None))
-            .first()
-        )
-        return check is not None
+        on_loan = exists().where(Loan.book_id == Book.id, Loan.return_date.is_(None))
+        stmt = delete(Book).where(Book.id == book_id, ~on_loan).returning(Book.id)
+        return self.session.scalars(stmt).first()
 
     def get_books_by_author_id(self, author_id: str) -> List[Book]:
         """
@@ -91,3 +255,12 @@ class SQLBookRepository(BookRepositoryInterface):
             List[Book]: A list of Book objects by the specified author.
         """
         return self.session.query(Book).filter(Book.author_id == author_id).all()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback once the session's transaction commits; it is dropped
+        if the transaction rolls back.
+        Args:
+            callback (Callable[[], None]): The function to run.
+        """
+        run_after_commit(self.session, callback)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
 
+from app.core.pagination import Cursor
 from app.models.borrower import Borrower
 
 
@@ -11,9 +13,18 @@ class BorrowerRepositoryInterface(ABC):
     """
 
     @abstractmethod
-    def get_borrowers(self) -> List[Borrower]:
+    def get_borrowers(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Borrower]:
         """
-        Retrieve all borrowers.
+        Retrieve a page of borrowers ordered by creation time.
+        """
+        pass
+
+    @abstractmethod
+    def iter_borrowers(self, batch_size: int = 1000) -> Iterator:
+        """
+        Stream the id, name and email of every borrower.
         """
         pass
 
@@ -32,15 +43,51 @@ class BorrowerRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def update_borrower(self, borrower: Borrower) -> Borrower:
+    def create_borrowers(self, rows: List[Dict]) -> Set[str]:
+        """
+        Insert several borrowers in one round trip, skipping known emails.
+        """
+        pass
+
+    @abstractmethod
+    def update_borrower(self, borrower_id: UUID, values: Dict) -> Optional[Borrower]:
+        """
+        Update a borrower's columns and return the updated row.
+        """
+        pass
+
+    @abstractmethod
+    def delete_borrower(self, borrower_id: str) -> Optional[UUID]:
+        """
+        Delete a borrower by their ID unless they have active loans, returning
+        the ID if it was deleted.
+        """
+        pass
+
+    @abstractmethod
+    def get_profile_version(self, borrower_id: str) -> Optional[Tuple]:
+        """
+        Retrieve the values that change whenever a borrower's profile does.
+        """
+        pass
+
+    @abstractmethod
+    def get_profile_with_loans(
+        self,
+        borrower_id: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[Optional[Borrower], List[Tuple]]:
         """
-        Update an existing borrower in the repository.
+        Retrieve a borrower and a page of their loans, newest first, with the
+        title and author name of each loan's book.
         """
         pass
 
     @abstractmethod
-    def delete_borrower(self, borrower_id: str) -> None:
+    def after_commit(self, callback: Callable[[], None]) -> None:
         """
-        Delete a borrower by their ID.
+        Run a callback once the current transaction commits.
         """
         pass
@@ -1,8 +1,17 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
 
+from sqlalchemy import and_, delete, exists, func, select, update
 from sqlalchemy.orm import Session
 
+from app.core.db import run_after_commit
+from app.core.pagination import Cursor, apply_keyset, keyset_condition
+from app.core.sql import dialect_insert
+from app.models.author import Author
+from app.models.book import Book
 from app.models.borrower import Borrower
+from app.models.loan import Loan
+from app.models.table_version import TableVersion
 from app.repositories.borrower_repository import BorrowerRepositoryInterface
 
 
@@ -10,13 +19,30 @@ class SQLBorrowerRepository(BorrowerRepositoryInterface):
     def __init__(self, session: Session):
         self.session = session
 
-    def get_borrowers(self) -> List[Borrower]:
+    def get_borrowers(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Borrower]:
         """
-        Retrieve all borrowers.
+        Retrieve a page of borrowers ordered by creation time.
+        Args:
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last borrower already seen.
         Returns:
-            List[Borrower]: A list of all Borrower objects.
+            List[Borrower]: Up to limit + 1 Borrower objects.
         """
-        return self.session.query(Borrower).all()
+        query = self.session.query(Borrower)
+        return apply_keyset(query, Borrower.created_at, Borrower.id, limit, after).all()
+
+    def iter_borrowers(self, batch_size: int = 1000) -> Iterator:
+        """
+        Stream the id, name and email of every borrower through a server-side cursor.
+        Args:
+            batch_size (int): The number of rows fetched per round trip.
+        Returns:
+            Iterator: Rows with id, name and email, not ORM objects.
+        """
+        query = self.session.query(Borrower.id, Borrower.name, Borrower.email)
+        return iter(query.yield_per(batch_size))
 
     def get_borrower_by_id(self, bid: str) -> Optional[Borrower]:
         """
@@ -38,32 +64,66 @@ class SQLBorrowerRepository(BorrowerRepositoryInterface):
         """
         self.session.add(b)
         self.session.flush()
-        self.session.refresh(b)
         return b
 
-    def update_borrower(self, borrower: Borrower) -> Borrower:
+    def create_borrowers(self, rows: List[Dict]) -> Set[str]:
         """
-        Update an existing borrower in the repository.
+        Insert several borrowers in one statement, skipping rows whose email
+        is already taken.
         Args:
-            borrower (Borrower): The Borrower object to update.
+            rows (List[Dict]): The column values of each borrower.
         Returns:
-            Borrower: The updated Borrower object.
+            Set[str]: The emails of the borrowers that were inserted.
         """
-        self.session.flush()
-        self.session.refresh(borrower)
-        return borrower
+        if not rows:
+            return set()
 
-    def delete_borrower(self, borrower_id: str) -> None:
+        stmt = (
+            dialect_insert(self.session, Borrower)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Borrower.email])
+            .returning(Borrower.email)
+        )
+        return set(self.session.scalars(stmt))
+
+    def update_borrower(self, borrower_id: UUID, values: Dict) -> Optional[Borrower]:
         """
-        Delete a borrower by their ID.
+        Update a borrower's columns in one UPDATE ... RETURNING statement.
         Args:
-            borrower_id (str): The ID of the borrower to delete.
+            borrower_id (UUID): The ID of the borrower to update.
+            values (Dict): The columns to change.
+        Returns:
+            Optional[Borrower]: The updated Borrower object, or None if it does
+            not exist.
+        """
+        stmt = (
+            update(Borrower)
+            .where(Borrower.id == borrower_id)
+            .values(**values)
+            .returning(Borrower)
+        )
+        return self.session.scalars(stmt).first()
 
+    def delete_borrower(self, borrower_id: str) -> Optional[UUID]:
+        """
+        Delete a borrower in one DELETE ... RETURNING statement, unless they
+        have active loans, which the partial index on their active loans
+        answers. The database cascades the delete to their past loans.
+        Args:
+            borrower_id (str): The ID of the borrower to delete.
+        Returns:
+            Optional[UUID]: The ID of the deleted borrower, or None if they do
+            not exist or have active loans.
         """
-        target = self.get_borrower_by_id(borrower_id)
-        if target:
-            self.session.delete(target)
-            self.session.flush()
+        has_active = exists().where(
+            Loan.borrower_id == Borrower.id, Loan.return_date.is_(None)
+        )
+        stmt = (
+            delete(Borrower)
+            .where(Borrower.id == borrower_id, ~has_active)
+            .returning(Borrower.id)
+        )
+        return self.session.scalars(stmt).first()
 
     def get_borrower_by_email(self, email_addr: str) -> Optional[Borrower]:
         """
@@ -74,3 +134,95 @@ class SQLBorrowerRepository(BorrowerRepositoryInterface):
             Optional[Borrower]: The Borrower object if found, otherwise None.
         """
         return self.session.query(Borrower).filter(Borrower.email == email_addr).first()
+
+    def get_profile_version(self, borrower_id: str) -> Optional[Tuple]:
+        """
+        Retrieve the values that change whenever a borrower's profile does,
+        with primary key lookups only: the borrower's updated_at and
+        loans_version, and the versions of the Books and Authors tables the
+        loans' titles and author names come from. Deleting a book or author
+        cascades to loans and bumps those table versions too.
+        Args:
+            borrower_id (str): The ID of the borrower.
+        Returns:
+            Optional[Tuple]: The version values, or None if the borrower does
+            not exist.
+        """
+
+        def table_version(model):
+            return func.coalesce(
+                select(TableVersion.version)
+                .where(TableVersion.name == model.__tablename__)
+                .scalar_subquery(),
+                0,
+            )
+
+        row = (
+            self.session.query(
+                Borrower.updated_at,
+                Borrower.loans_version,
+                table_version(Book),
+                table_version(Author),
+            )
+            .filter(Borrower.id == borrower_id)
+            .first()
+        )
+        return tuple(row) if row is not None else None
+
+    def get_profile_with_loans(
+        self,
+        borrower_id: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[Optional[Borrower], List[Tuple]]:
+        """
+        Retrieve a borrower and a page of their loans, newest first, with the
+        title and author name of each loan's book, in a single query.
+
+        The loan filters sit in the join condition rather than the WHERE
+        clause, so a borrower with no matching loans still comes back as one
+        row with empty loan columns.
+        Args:
+            borrower_id (str): The ID of the borrower.
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last loan already seen.
+            status (Optional[str]): "active" or "returned" to return only those
+                loans; None returns both.
+        Returns:
+            Tuple[Optional[Borrower], List[Tuple]]: The borrower, or None if it
+            does not exist, and up to limit + 1 tuples of Loan objects, book
+            titles and author names.
+        """
+        on_loan = [Loan.borrower_id == Borrower.id]
+        if status == "active":
+            on_loan.append(Loan.return_date.is_(None))
+        elif status == "returned":
+            on_loan.append(Loan.return_date.is_not(None))
+        position = keyset_condition(Loan.created_at, Loan.id, after, descending=True)
+        if position is not None:
+            on_loan.append(position)
+
+        rows = (
+            self.session.query(Borrower, Loan, Book.title, Author.name)
+            .outerjoin(Loan, and_(*on_loan))
+            .outerjoin(Book, Book.id == Loan.book_id)
+            .outerjoin(Author, Author.id == Book.author_id)
+            .filter(Borrower.id == borrower_id)
+            .order_by(Loan.created_at.desc(), Loan.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        if not rows:
+            return None, []
+        loans = [(loan, title, name) for _, loan, title, name in rows if loan]
+        return rows[0][0], loans
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback once the session's transaction commits; it is dropped
+        if the transaction rolls back.
+        Args:
+            callback (Callable[[], None]): The function to run.
+        """
+        run_after_commit(self.session, callback)
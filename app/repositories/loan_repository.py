@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+from uuid import UUID
 
+from app.core.pagination import Cursor
 from app.models.loan import Loan
 
 
@@ -11,16 +14,28 @@ class LoanRepositoryInterface(ABC):
     """
 
     @abstractmethod
-    def get_active_loans(self) -> List[Loan]:
+    def get_active_loans(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Loan]:
         """
-        Retrieve all active loans.
+        Retrieve a page of active loans ordered by creation time.
         """
         pass
 
     @abstractmethod
-    def return_loan(self, loan_id: str) -> Loan:
+    def get_overdue_loans(
+        self, now: datetime, limit: int, after: Optional[Cursor] = None
+    ) -> List:
         """
-        set return a loan by its ID.
+        Retrieve a page of active loans due before the given time, ordered by
+        due date.
+        """
+        pass
+
+    @abstractmethod
+    def return_loan(self, loan_id: str) -> Optional[Loan]:
+        """
+        Set the return date of an active loan by its ID.
         """
         pass
 
@@ -53,16 +68,77 @@ class LoanRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def update_loan(self, loan: Loan) -> Loan:
+    def checkout(self, loan: Loan) -> Optional[Loan]:
+        """
+        Insert a loan unless its book already has an active loan.
+        """
+        pass
+
+    @abstractmethod
+    def checkout_many(self, loans: List[Loan]) -> List[Loan]:
+        """
+        Insert several loans in one statement, skipping books already on loan.
+        """
+        pass
+
+    @abstractmethod
+    def return_loans(self, loan_ids: Iterable[UUID]) -> List[Loan]:
+        """
+        Set the return date of several active loans in one statement.
+        """
+        pass
+
+    @abstractmethod
+    def get_loans_by_ids(self, loan_ids: Iterable[UUID]) -> List[Loan]:
+        """
+        Retrieve several loans by their IDs.
+        """
+        pass
+
+    @abstractmethod
+    def iter_loans(
+        self,
+        active_only: bool = False,
+        borrower_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+    ) -> Iterator:
         """
-        Update an existing loan in the repository.
+        Stream loan rows without loading them all into memory.
         """
         pass
 
     @abstractmethod
-    def book_has_active_loan(self, book_id: str) -> bool:
+    def get_existing_book_ids(self, book_ids: Iterable[UUID]) -> Set[UUID]:
         """
-        Check if a book has an active loan.
+        Return which of the given book IDs exist.
+        """
+        pass
+
+    @abstractmethod
+    def get_existing_borrower_ids(self, borrower_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given borrower IDs exist.
+        """
+        pass
+
+    @abstractmethod
+    def bump_loans_versions(self, borrower_ids: Iterable[UUID]) -> None:
+        """
+        Increment the loans_version of borrowers whose loans changed.
+        """
+        pass
+
+    @abstractmethod
+    def update_loan(self, loan_id: UUID, values: Dict) -> Optional[Loan]:
+        """
+        Update a loan's columns and return the updated row.
+        """
+        pass
+
+    @abstractmethod
+    def iter_active_book_ids(self, batch_size: int = 10000) -> Iterator[UUID]:
+        """
+        Stream the IDs of every book that is currently on loan.
         """
         pass
 
@@ -72,3 +148,10 @@ class LoanRepositoryInterface(ABC):
         Retrieve all loans for a specific borrower.
         """
         pass
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback once the current transaction commits.
+        """
+        pass
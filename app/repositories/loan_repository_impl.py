@@ -1,8 +1,15 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+from uuid import UUID
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.core.db import run_after_commit
+from app.core.pagination import Cursor, apply_keyset
+from app.core.sql import dialect_insert
+from app.models.book import Book
+from app.models.borrower import Borrower
 from app.models.loan import Loan
 from app.repositories.loan_repository import LoanRepositoryInterface
 
@@ -12,13 +19,41 @@ class SQLLoanRepository(LoanRepositoryInterface):
     def __init__(self, db_session: Session):
         self.session = db_session
 
-    def get_active_loans(self) -> List[Loan]:
+    def get_active_loans(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Loan]:
         """
-        Retrieve all active loans (loans that have not been returned).
+        Retrieve a page of active loans (loans that have not been returned)
+        ordered by creation time.
+        Args:
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last loan already seen.
+        Returns:
+            List[Loan]: Up to limit + 1 active Loan objects.
+        """
+        query = self.session.query(Loan).filter(Loan.return_date.is_(None))
+        return apply_keyset(query, Loan.created_at, Loan.id, limit, after).all()
+
+    def get_overdue_loans(
+        self, now: datetime, limit: int, after: Optional[Cursor] = None
+    ) -> List:
+        """
+        Retrieve a page of active loans that were due before the given time,
+        most overdue first. Only columns held in the partial index on active
+        loans' due dates are read, so the table itself is not visited.
+        Args:
+            now (datetime): The current time.
+            limit (int): The page size.
+            after (Optional[Cursor]): The due date and ID of the last loan
+                already seen.
         Returns:
-            List[Loan]: A list of active Loan objects.
+            List: Up to limit + 1 rows with the id, book_id, borrower_id,
+            loan_date and due_date of each loan, not ORM objects.
         """
-        return self.session.query(Loan).filter(Loan.return_date.is_(None)).all()
+        query = self.session.query(
+            Loan.id, Loan.book_id, Loan.borrower_id, Loan.loan_date, Loan.due_date
+        ).filter(Loan.return_date.is_(None), Loan.due_date < now)
+        return apply_keyset(query, Loan.due_date, Loan.id, limit, after).all()
 
     def get_loans_by_borrower_id(self, borrower_id: str) -> List[Loan]:
         """
@@ -74,47 +109,216 @@ class SQLLoanRepository(LoanRepositoryInterface):
         """
         self.session.add(loan_obj)
         self.session.flush()
-        self.session.refresh(loan_obj)
         return loan_obj
 
-    def update_loan(self, loan: Loan) -> Loan:
+    def checkout(self, loan: Loan) -> Optional[Loan]:
         """
-        Update an existing loan in the repository.
+        Insert a loan unless its book already has an active loan, in a single
+        statement. The partial unique index on active loans makes this safe
+        against concurrent checkouts of the same book.
         Args:
-            loan (Loan): The Loan object to update.
+            loan (Loan): The transient Loan object to insert.
         Returns:
-            Loan: The updated Loan object.
+            Optional[Loan]: The created Loan, or None if the book is already
+            on loan.
         """
-        self.session.flush()
-        self.session.refresh(loan)
-        return loan
+        stmt = (
+            dialect_insert(self.session, Loan)
+            .values(
+                book_id=loan.book_id,
+                borrower_id=loan.borrower_id,
+                loan_date=loan.loan_date,
+                due_date=loan.due_date,
+                return_date=loan.return_date,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[Loan.book_id],
+                index_where=Loan.return_date.is_(None),
+            )
+            .returning(Loan)
+        )
+        return self.session.scalars(stmt).first()
 
-    def return_loan(self, loan_id: str) -> Loan:
+    def checkout_many(self, loans: List[Loan]) -> List[Loan]:
         """
-        set return a loan by its ID.
+        Insert several loans in one statement, skipping any whose book already
+        has an active loan.
         Args:
-            loan_id (str): The ID of the loan to return.
+            loans (List[Loan]): The transient Loan objects to insert.
         Returns:
-            Loan: The updated Loan object with the return date set.
+            List[Loan]: The loans that were created, in no particular order.
         """
-        target_loan = self.get_loan_by_id(loan_id)
-        if target_loan:
-            target_loan.return_date = datetime.utcnow()
-            self.session.flush()
-            self.session.refresh(target_loan)
-        return target_loan
+        if not loans:
+            return []
+
+        stmt = (
+            dialect_insert(self.session, Loan)
+            .values(
+                [
+                    {
+                        "book_id": loan.book_id,
+                        "borrower_id": loan.borrower_id,
+                        "loan_date": loan.loan_date,
+                        "due_date": loan.due_date,
+                        "return_date": loan.return_date,
+                    }
+                    for loan in loans
+                ]
+            )
+            .on_conflict_do_nothing(
+                index_elements=[Loan.book_id],
+                index_where=Loan.return_date.is_(None),
+            )
+            .returning(Loan)
+        )
+        return list(self.session.scalars(stmt))
 
-    def book_has_active_loan(self, book_id: str) -> bool:
+    def return_loans(self, loan_ids: Iterable[UUID]) -> List[Loan]:
         """
-        Check if a book has an active loan.
+        Set the return date of several active loans in one statement.
         Args:
-            book_id (str): The ID of the book to check.
+            loan_ids (Iterable[UUID]): The IDs of the loans to return.
         Returns:
-            bool: True if the book has an active loan, False otherwise.
+            List[Loan]: The loans that were returned by this call.
         """
-        active = (
-            self.session.query(Loan)
-            .filter(Loan.book_id == book_id, Loan.return_date.is_(None))
-            .first()
+        stmt = (
+            update(Loan)
+            .where(Loan.id.in_(list(loan_ids)), Loan.return_date.is_(None))
+            .values(return_date=datetime.utcnow())
+            .returning(Loan)
+        )
+        return list(self.session.scalars(stmt))
+
+    def get_loans_by_ids(self, loan_ids: Iterable[UUID]) -> List[Loan]:
+        """
+        Retrieve several loans by their IDs.
+        Args:
+            loan_ids (Iterable[UUID]): The IDs of the loans.
+        Returns:
+            List[Loan]: The loans that exist.
+        """
+        return self.session.query(Loan).filter(Loan.id.in_(list(loan_ids))).all()
+
+    def iter_loans(
+        self,
+        active_only: bool = False,
+        borrower_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+    ) -> Iterator:
+        """
+        Stream loan rows through a server-side cursor, batch_size rows at a time.
+        Args:
+            active_only (bool): Only include loans that have not been returned.
+            borrower_id (Optional[UUID]): Only include loans of this borrower.
+            batch_size (int): The number of rows fetched per round trip.
+        Returns:
+            Iterator: Rows with the loan columns, not ORM objects.
+        """
+        query = self.session.query(
+            Loan.id,
+            Loan.book_id,
+            Loan.borrower_id,
+            Loan.loan_date,
+            Loan.due_date,
+            Loan.return_date,
+        )
+        if active_only:
+            query = query.filter(Loan.return_date.is_(None))
+        if borrower_id is not None:
+            query = query.filter(Loan.borrower_id == borrower_id)
+        return iter(query.yield_per(batch_size))
+
+    def get_existing_book_ids(self, book_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given book IDs exist.
+        Args:
+            book_ids (Iterable[UUID]): The IDs to look up.
+        Returns:
+            Set[UUID]: The IDs that belong to existing books.
+        """
+        rows = self.session.query(Book.id).filter(Book.id.in_(list(book_ids)))
+        return {row.id for row in rows}
+
+    def get_existing_borrower_ids(self, borrower_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given borrower IDs exist.
+        Args:
+            borrower_ids (Iterable[UUID]): The IDs to look up.
+        Returns:
+            Set[UUID]: The IDs that belong to existing borrowers.
+        """
+        rows = self.session.query(Borrower.id).filter(
+            Borrower.id.in_(list(borrower_ids))
+        )
+        return {row.id for row in rows}
+
+    def bump_loans_versions(self, borrower_ids: Iterable[UUID]) -> None:
+        """
+        Increment the loans_version of several borrowers in one UPDATE, in ID
+        order so that concurrent calls lock the rows in the same order. The
+        borrowers' updated_at is left alone: their own columns did not change.
+        Args:
+            borrower_ids (Iterable[UUID]): The borrowers whose loans changed.
+        """
+        ids = sorted({bid for bid in borrower_ids if bid is not None})
+        if not ids:
+            return
+        stmt = (
+            update(Borrower)
+            .where(Borrower.id.in_(ids))
+            .values(
+                loans_version=Borrower.loans_version + 1,
+                updated_at=Borrower.updated_at,
+            )
+        )
+        self.session.execute(stmt, execution_options={"synchronize_session": False})
+
+    def update_loan(self, loan_id: UUID, values: Dict) -> Optional[Loan]:
+        """
+        Update a loan's columns in one UPDATE ... RETURNING statement.
+        Args:
+            loan_id (UUID): The ID of the loan to update.
+            values (Dict): The columns to change.
+        Returns:
+            Optional[Loan]: The updated Loan object, or None if it does not exist.
+        """
+        stmt = update(Loan).where(Loan.id == loan_id).values(**values).returning(Loan)
+        return self.session.scalars(stmt).first()
+
+    def return_loan(self, loan_id: str) -> Optional[Loan]:
+        """
+        Set the return date of an active loan in one UPDATE ... RETURNING statement.
+        Args:
+            loan_id (str): The ID of the loan to return.
+        Returns:
+            Optional[Loan]: The updated Loan object with the return date set, or
+            None if the loan does not exist or was already returned.
+        """
+        stmt = (
+            update(Loan)
+            .where(Loan.id == loan_id, Loan.return_date.is_(None))
+            .values(return_date=datetime.utcnow())
+            .returning(Loan)
         )
-        return active is not None
+        return self.session.scalars(stmt).first()
+
+    def iter_active_book_ids(self, batch_size: int = 10000) -> Iterator[UUID]:
+        """
+        Stream the IDs of every book that is currently on loan. This reads only
+        the partial unique index on active loans.
+        Args:
+            batch_size (int): The number of rows fetched per round trip.
+        Returns:
+            Iterator[UUID]: The book IDs.
+        """
+        query = self.session.query(Loan.book_id).filter(Loan.return_date.is_(None))
+        return (row.book_id for row in query.yield_per(batch_size))
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback once the session's transaction commits; it is dropped
+        if the transaction rolls back.
+        Args:
+            callback (Callable[[], None]): The function to run.
+        """
+        run_after_commit(self.session, callback)
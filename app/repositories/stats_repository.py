@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from app.models.loan import Loan
+
+
+class StatsRepositoryInterface(ABC):
+    """
+    Abstract base class for circulation statistics repository. It
+    defines the interface for the rollup tables kept beside the loans.
+    """
+
+    @abstractmethod
+    def record_checkouts(self, loans: Iterable[Loan]) -> None:
+        """
+        Count newly created loans in the rollups.
+        """
+        pass
+
+    @abstractmethod
+    def record_returns(self, loans: Iterable[Loan]) -> None:
+        """
+        Count newly returned loans in the rollups.
+        """
+        pass
+
+    @abstractmethod
+    def forget_loans_of(
+        self,
+        book_id: Optional[str] = None,
+        borrower_id: Optional[str] = None,
+        author_id: Optional[str] = None,
+    ) -> None:
+        """
+        Uncount the loans that deleting a book, borrower or author will
+        cascade away. Call it right before the delete.
+        """
+        pass
+
+    @abstractmethod
+    def get_most_borrowed_books(self, limit: int) -> List[Tuple]:
+        """
+        Retrieve the most borrowed books with their title and author name.
+        """
+        pass
+
+    @abstractmethod
+    def get_borrower_stats(self, borrower_id: str) -> Optional[Tuple]:
+        """
+        Retrieve a borrower's name and active and total loan counts.
+        """
+        pass
+
+    @abstractmethod
+    def get_busiest_borrowers(self, limit: int) -> List[Tuple]:
+        """
+        Retrieve the borrowers with the most active loans.
+        """
+        pass
+
+    @abstractmethod
+    def get_daily_counts(self, start: date, end: date) -> List[Tuple]:
+        """
+        Retrieve the checkouts and returns of each day in a range.
+        """
+        pass
+
+    @abstractmethod
+    def rebuild(self) -> None:
+        """
+        Recompute every rollup from the loans.
+        """
+        pass
@@ -0,0 +1,423 @@
+import random
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
+
+from app.core.sql import dialect_insert
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrower import Borrower
+from app.models.circulation import (
+    DAILY_STATS_SHARDS,
+    BookCirculationStats,
+    BorrowerCirculationStats,
+    DailyCirculationStats,
+)
+from app.models.loan import Loan
+from app.repositories.stats_repository import StatsRepositoryInterface
+
+
+class SQLStatsRepository(StatsRepositoryInterface):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record_checkouts(self, loans: Iterable[Loan]) -> None:
+        """
+        Count newly created loans in the rollups, with one upsert per table.
+        This runs in the caller's transaction, so the counts commit or roll
+        back together with the loans.
+        Args:
+            loans (Iterable[Loan]): The loans that were created. Loans created
+                with a return date count as returned on that day.
+        """
+        books: Counter = Counter()
+        borrowers: Dict = {}
+        days: Dict[date, List[int]] = {}
+        for loan in loans:
+            books[loan.book_id] += 1
+            counts = borrowers.setdefault(loan.borrower_id, [0, 0])
+            counts[1] += 1
+            days.setdefault(loan.loan_date.date(), [0, 0])[0] += 1
+            if loan.return_date is None:
+                counts[0] += 1
+            else:
+                days.setdefault(loan.return_date.date(), [0, 0])[1] += 1
+        if not books:
+            return
+
+        self._add(
+            BookCirculationStats,
+            [{"book_id": k, "checkouts": n} for k, n in books.items()],
+        )
+        self._add(
+            BorrowerCirculationStats,
+            [
+                {"borrower_id": k, "active_loans": active, "total_loans": total}
+                for k, (active, total) in borrowers.items()
+            ],
+        )
+        self._add_days(days)
+
+    def record_returns(self, loans: Iterable[Loan]) -> None:
+        """
+        Count newly returned loans in the rollups, in the caller's transaction.
+        Args:
+            loans (Iterable[Loan]): The loans that were returned.
+        """
+        borrowers: Counter = Counter()
+        days: Dict[date, List[int]] = {}
+        for loan in loans:
+            borrowers[loan.borrower_id] += 1
+            days.setdefault(loan.return_date.date(), [0, 0])[1] += 1
+        if not borrowers:
+            return
+
+        self._add(
+            BorrowerCirculationStats,
+            [
+                {"borrower_id": k, "active_loans": -n, "total_loans": 0}
+                for k, n in borrowers.items()
+            ],
+        )
+        self._add_days(days)
+
+    def forget_loans_of(
+        self,
+        book_id: Optional[str] = None,
+        borrower_id: Optional[str] = None,
+        author_id: Optional[str] = None,
+    ) -> None:
+        """
+        Uncount the loans that deleting a book, borrower or author will
+        cascade away, so that the rollups keep describing the loans that
+        exist, as rebuild() computes them. The loans are grouped and
+        subtracted by the database, with one statement per rollup, so nothing
+        proportional to their number is read. Rows of the deleted entity
+        itself go with the cascade and are left alone.
+
+        Call it right before the delete, in the same transaction. A book or
+        borrower with an active loan is not deleted, and then nothing is
+        subtracted either; any other refusal raises and rolls this back.
+        Args:
+            book_id (Optional[str]): The ID of the book about to be deleted.
+            borrower_id (Optional[str]): The ID of the borrower about to be
+                deleted.
+            author_id (Optional[str]): The ID of the author about to be deleted.
+        """
+        active = aliased(Loan)
+        loans = select(Loan.book_id, Loan.borrower_id, Loan.loan_date, Loan.return_date)
+        if book_id is not None:
+            on_loan = exists().where(
+                active.book_id == book_id, active.return_date.is_(None)
+            )
+            loans = loans.where(Loan.book_id == book_id, ~on_loan)
+        elif borrower_id is not None:
+            has_active = exists().where(
+                active.borrower_id == borrower_id, active.return_date.is_(None)
+            )
+            loans = loans.where(Loan.borrower_id == borrower_id, ~has_active)
+        else:
+            loans = loans.join(Book, Book.id == Loan.book_id).where(
+                Book.author_id == author_id
+            )
+        loans = loans.subquery()
+
+        if borrower_id is not None:
+            self._subtract(
+                BookCirculationStats, loans.c.book_id, {"checkouts": func.count()}
+            )
+        else:
+            self._subtract(
+                BorrowerCirculationStats,
+                loans.c.borrower_id,
+                {
+                    "active_loans": func.count(
+                        case((loans.c.return_date.is_(None), 1))
+                    ),
+                    "total_loans": func.count(),
+                },
+            )
+
+        # Like _add_days, the whole batch goes into one shard picked at random;
+        # only the sum over a day's shards is meaningful.
+        events = union_all(
+            select(
+                func.date(loans.c.loan_date).label("day"),
+                literal(1).label("checkouts"),
+                literal(0).label("returns"),
+            ).where(loans.c.loan_date.is_not(None)),
+            select(func.date(loans.c.return_date), literal(0), literal(1)).where(
+                loans.c.return_date.is_not(None)
+            ),
+        ).subquery()
+        days = (
+            select(
+                events.c.day,
+                literal(random.randrange(DAILY_STATS_SHARDS)),
+                -func.sum(events.c.checkouts),
+                -func.sum(events.c.returns),
+            )
+            .where(events.c.day.is_not(None))
+            .group_by(events.c.day)
+        )
+        daily = DailyCirculationStats
+        stmt = dialect_insert(self.session, daily).from_select(
+            ["day", "shard", "checkouts", "returns"], days
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "shard"],
+            set_={
+                "checkouts": daily.checkouts + stmt.excluded.checkouts,
+                "returns": daily.returns + stmt.excluded.returns,
+            },
+        )
+        self.session.execute(stmt)
+
+    def get_most_borrowed_books(self, limit: int) -> List[Tuple]:
+        """
+        Retrieve the most borrowed books, read off the index on the checkout
+        counts.
+        Args:
+            limit (int): The number of books to return.
+        Returns:
+            List[Tuple]: Rows with the book_id, title, author_name and checkouts
+            of each book, most borrowed first.
+        """
+        return (
+            self.session.query(
+                BookCirculationStats.book_id,
+                Book.title,
+                Author.name.label("author_name"),
+                BookCirculationStats.checkouts,
+            )
+            .join(Book, Book.id == BookCirculationStats.book_id)
+            .outerjoin(Author, Author.id == Book.author_id)
+            .order_by(
+                BookCirculationStats.checkouts.desc(), BookCirculationStats.book_id
+            )
+            .limit(limit)
+            .all()
+        )
+
+    def get_borrower_stats(self, borrower_id: str) -> Optional[Tuple]:
+        """
+        Retrieve a borrower's name and loan counts, by primary key on both
+        tables.
+        Args:
+            borrower_id (str): The ID of the borrower.
+        Returns:
+            Optional[Tuple]: A row with the borrower_id, name, active_loans and
+            total_loans, the counts zero for a borrower who never borrowed, or
+            None if the borrower does not exist.
+        """
+        return (
+            self.session.query(
+                Borrower.id.label("borrower_id"),
+                Borrower.name,
+                func.coalesce(BorrowerCirculationStats.active_loans, 0).label(
+                    "active_loans"
+                ),
+                func.coalesce(BorrowerCirculationStats.total_loans, 0).label(
+                    "total_loans"
+                ),
+            )
+            .outerjoin(
+                BorrowerCirculationStats,
+                BorrowerCirculationStats.borrower_id == Borrower.id,
+            )
+            .filter(Borrower.id == borrower_id)
+            .first()
+        )
+
+    def get_busiest_borrowers(self, limit: int) -> List[Tuple]:
+        """
+        Retrieve the borrowers with the most active loans, read off the index
+        on the active counts.
+        Args:
+            limit (int): The number of borrowers to return.
+        Returns:
+            List[Tuple]: Rows with the borrower_id, name, active_loans and
+            total_loans of each borrower, busiest first.
+        """
+        return (
+            self.session.query(
+                BorrowerCirculationStats.borrower_id,
+                Borrower.name,
+                BorrowerCirculationStats.active_loans,
+                BorrowerCirculationStats.total_loans,
+            )
+            .join(Borrower, Borrower.id == BorrowerCirculationStats.borrower_id)
+            .filter(BorrowerCirculationStats.active_loans > 0)
+            .order_by(
+                BorrowerCirculationStats.active_loans.desc(),
+                BorrowerCirculationStats.borrower_id,
+            )
+            .limit(limit)
+            .all()
+        )
+
+    def get_daily_counts(self, start: date, end: date) -> List[Tuple]:
+        """
+        Retrieve the checkouts and returns of each day in a range, summing the
+        shards of each day.
+        Args:
+            start (date): The first day of the range.
+            end (date): The last day of the range, inclusive.
+        Returns:
+            List[Tuple]: Rows with the day, checkouts and returns of each day
+            that had any, in date order.
+        """
+        return (
+            self.session.query(
+                DailyCirculationStats.day,
+                func.sum(DailyCirculationStats.checkouts).label("checkouts"),
+                func.sum(DailyCirculationStats.returns).label("returns"),
+            )
+            .filter(DailyCirculationStats.day.between(start, end))
+            .group_by(DailyCirculationStats.day)
+            .order_by(DailyCirculationStats.day)
+            .all()
+        )
+
+    def rebuild(self) -> None:
+        """
+        Recompute every rollup from the loans, with one INSERT ... SELECT per
+        table. On PostgreSQL, writes to Loans wait until the caller commits,
+        so no checkout or return made meanwhile is lost or counted twice.
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            self.session.execute(text('LOCK TABLE "Loans" IN SHARE MODE'))
+        for model in (
+            BookCirculationStats,
+            BorrowerCirculationStats,
+            DailyCirculationStats,
+        ):
+            self.session.execute(delete(model))
+
+        books = (
+            select(Loan.book_id, func.count())
+            .where(Loan.book_id.is_not(None))
+            .group_by(Loan.book_id)
+        )
+        self.session.execute(
+            insert(BookCirculationStats).from_select(["book_id", "checkouts"], books)
+        )
+
+        borrowers = (
+            select(
+                Loan.borrower_id,
+                func.count(case((Loan.return_date.is_(None), 1))),
+                func.count(),
+            )
+            .where(Loan.borrower_id.is_not(None))
+            .group_by(Loan.borrower_id)
+        )
+        self.session.execute(
+            insert(BorrowerCirculationStats).from_select(
+                ["borrower_id", "active_loans", "total_loans"], borrowers
+            )
+        )
+
+        # func.date rather than a cast, which SQLite would turn into a number.
+        events = union_all(
+            select(
+                func.date(Loan.loan_date).label("day"),
+                literal(1).label("checkouts"),
+                literal(0).label("returns"),
+            ).where(Loan.loan_date.is_not(None)),
+            select(func.date(Loan.return_date), literal(0), literal(1)).where(
+                Loan.return_date.is_not(None)
+            ),
+        ).subquery()
+        days = select(
+            events.c.day,
+            literal(0),
+            func.sum(events.c.checkouts),
+            func.sum(events.c.returns),
+        ).group_by(events.c.day)
+        self.session.execute(
+            insert(DailyCirculationStats).from_select(
+                ["day", "shard", "checkouts", "returns"], days
+            )
+        )
+
+    def _add(self, model, rows: List[Dict]) -> None:
+        """
+        Add counts to rollup rows, creating the rows that do not exist yet.
+        Rows are written in key order, so that concurrent batches lock them
+        in the same order and cannot deadlock.
+        Args:
+            model: The rollup model.
+            rows (List[Dict]): The key columns and the amounts to add, with the
+                same keys in every row.
+        """
+        keys = [column.name for column in model.__table__.primary_key]
+        rows.sort(key=lambda row: tuple(row[k] for k in keys))
+        stmt = dialect_insert(self.session, model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                name: getattr(model, name) + getattr(stmt.excluded, name)
+                for name in rows[0]
+                if name not in keys
+            },
+        )
+        self.session.execute(stmt)
+
+    def _subtract(self, model, key, amounts: Dict) -> None:
+        """
+        Subtract counts aggregated from a subquery of loans from the existing
+        rollup rows, with one UPDATE ... FROM. Unlike _add, missing rows are
+        not created: a loan is always counted before it can be deleted.
+        Args:
+            model: The rollup model, keyed by a single column.
+            key: The loan column the rollup is keyed on.
+            amounts (Dict): The aggregate to subtract from each count column,
+                by column name.
+        """
+        table = model.__table__
+        [key_column] = table.primary_key.columns
+        counts = (
+            select(
+                key.label("key"),
+                *(amount.label(name) for name, amount in amounts.items()),
+            )
+            .where(key.is_not(None))
+            .group_by(key)
+            .subquery()
+        )
+        self.session.execute(
+            update(table)
+            .where(key_column == counts.c.key)
+            .values({name: table.c[name] - counts.c[name] for name in amounts})
+        )
+
+    def _add_days(self, days: Dict[date, List[int]]) -> None:
+        """
+        Add checkout and return counts to the daily rollup, in one shard
+        picked at random for the whole batch.
+        Args:
+            days (Dict[date, List[int]]): The checkouts and returns per day.
+        """
+        shard = random.randrange(DAILY_STATS_SHARDS)
+        self._add(
+            DailyCirculationStats,
+            [
+                {"day": day, "shard": shard, "checkouts": out, "returns": back}
+                for day, (out, back) in days.items()
+            ],
+        )
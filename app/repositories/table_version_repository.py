@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable
+
+
+class TableVersionRepositoryInterface(ABC):
+    """
+    Abstract base class for table version repository. It
+    defines the interface for the per-table change counters.
+    """
+
+    @abstractmethod
+    def get_versions(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Retrieve the current version of each named table.
+        """
+        pass
+
+    @abstractmethod
+    def bump(self, *names: str) -> None:
+        """
+        Increment the version of each named table.
+        """
+        pass
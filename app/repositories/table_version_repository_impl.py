@@ -0,0 +1,62 @@
+import logging
+from typing import Dict, Iterable
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.db import run_after_commit
+from app.core.sql import dialect_insert
+from app.models.table_version import TableVersion
+from app.repositories.table_version_repository import TableVersionRepositoryInterface
+
+logger = logging.getLogger(__name__)
+
+
+class SQLTableVersionRepository(TableVersionRepositoryInterface):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_versions(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Retrieve the current version of each named table.
+        Args:
+            names (Iterable[str]): The table names.
+        Returns:
+            Dict[str, int]: The version of each table; 0 if it was never bumped.
+        """
+        names = list(names)
+        rows = self.session.query(TableVersion.name, TableVersion.version).filter(
+            TableVersion.name.in_(names)
+        )
+        versions = dict.fromkeys(names, 0)
+        versions.update({row.name: row.version for row in rows})
+        return versions
+
+    def bump(self, *names: str) -> None:
+        """
+        Increment the version of each named table once the caller's
+        transaction commits. The upsert runs in a short transaction of its
+        own, so concurrent writers to a table only wait on its version row
+        for that statement rather than for their whole request. A read in
+        between sees the new rows under the old version; the next read after
+        the bump gets a fresh ETag.
+        Args:
+            names (str): The table names.
+        """
+        stmt = dialect_insert(self.session, TableVersion).values(
+            [{"name": name, "version": 1} for name in sorted(names)]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TableVersion.name],
+            set_={"version": TableVersion.version + 1},
+        )
+        bind = self.session.get_bind()
+
+        def apply() -> None:
+            try:
+                with bind.begin() as connection:
+                    connection.execute(stmt)
+            except SQLAlchemyError:
+                logger.exception("Bumping the versions of %s failed", names)
+
+        run_after_commit(self.session, apply)
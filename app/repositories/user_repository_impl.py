@@ -30,5 +30,4 @@ class SQLUserRepository(UserRepositoryInterface):
         """
         self.db.add(user)
         self.db.flush()
-        self.db.refresh(user)
         return user
@@ -1,9 +1,10 @@
 import re
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
+from app.schemas.loan import LoanDetail
 
 PHONE_REGEX = re.compile(r"^\+[1-9]\d{1,14}$")
 
@@ -62,3 +63,13 @@ class Borrower(BorrowerBase):
 
         from_attributes = True
         populate_by_name = True
+
+
+class BorrowerProfile(BaseModel):
+    """
+    Model representing a borrower with one page of their loans.
+    """
+
+    borrower: Borrower = Field()
+    loans: List[LoanDetail] = Field()
+    next_cursor: Optional[str] = Field(None)
@@ -1,9 +1,12 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+MAX_BATCH_SIZE = 200
+
 
 class LoanBase(BaseModel):
     """
@@ -32,6 +35,22 @@ class LoanUpdate(LoanBase):
     return_date: Optional[str] = Field(None)
 
 
+class LoanBatchCreate(BaseModel):
+    """
+    Model for checking out several books in one request.
+    """
+
+    items: List[LoanCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class LoanBatchReturn(BaseModel):
+    """
+    Model for returning several loans in one request.
+    """
+
+    loan_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 class Loan(LoanBase):
     """
     Model representing a loan with an ID.
@@ -39,6 +58,7 @@ class Loan(LoanBase):
 
     id: UUID = Field()
     loan_date: Optional[datetime] = Field(None)
+    due_date: Optional[datetime] = Field(None)
     return_date: Optional[datetime] = Field(None)
 
     class Config:
@@ -48,3 +68,45 @@ class Loan(LoanBase):
 
         from_attributes = True
         populate_by_name = True
+
+
+class LoanDetail(Loan):
+    """
+    Model representing a loan together with the book it is for.
+    """
+
+    book_title: Optional[str] = Field(None)
+    author_name: Optional[str] = Field(None)
+
+
+class OverdueLoan(LoanBase):
+    """
+    Model representing an active loan past its due date.
+    """
+
+    id: UUID = Field()
+    loan_date: Optional[datetime] = Field(None)
+    due_date: datetime = Field()
+    days_overdue: int = Field()
+
+
+class LoanStatus(str, Enum):
+    """
+    Whether a loan is still out or has been returned.
+    """
+
+    ACTIVE = "active"
+    RETURNED = "returned"
+
+
+class LoanBatchItemResult(BaseModel):
+    """
+    Model representing the outcome of one item of a batch checkout or return.
+    """
+
+    index: int = Field()
+    status: str = Field()
+    book_id: Optional[UUID] = Field(None)
+    loan_id: Optional[UUID] = Field(None)
+    detail: Optional[str] = Field(None)
+    loan: Optional[Loan] = Field(None)
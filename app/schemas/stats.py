@@ -0,0 +1,37 @@
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class BookCirculation(BaseModel):
+    """
+    Model representing how often a book has been borrowed.
+    """
+
+    book_id: UUID = Field()
+    title: str = Field()
+    author_name: Optional[str] = Field(None)
+    checkouts: int = Field()
+
+
+class BorrowerCirculation(BaseModel):
+    """
+    Model representing how many loans a borrower has out and has ever had.
+    """
+
+    borrower_id: UUID = Field()
+    name: Optional[str] = Field(None)
+    active_loans: int = Field()
+    total_loans: int = Field()
+
+
+class DailyCirculation(BaseModel):
+    """
+    Model representing the checkouts and returns of one day.
+    """
+
+    day: date = Field()
+    checkouts: int = Field()
+    returns: int = Field()
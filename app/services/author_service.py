@@ -1,20 +1,32 @@
+from typing import Optional
+
 from app.core.exceptions import NotFoundException
+from app.core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, split_page
 from app.models.author import Author as AuthorModel
+from app.models.book import Book as BookModel
 from app.repositories.author_repository import AuthorRepositoryInterface
 from app.repositories.book_repository import BookRepositoryInterface
+from app.repositories.stats_repository import StatsRepositoryInterface
+from app.repositories.table_version_repository import TableVersionRepositoryInterface
 from app.schemas.author import AuthorCreate, AuthorUpdate, Author as AuthorSchema
 from app.schemas.book import Book as BookSchema
 
 
 class AuthorService:
     def __init__(
-        self, author_repo: AuthorRepositoryInterface, book_repo: BookRepositoryInterface
+        self,
+        author_repo: AuthorRepositoryInterface,
+        book_repo: BookRepositoryInterface,
+        version_repo: TableVersionRepositoryInterface,
+        stats_repo: StatsRepositoryInterface,
     ):
         """
         Initialize the AuthorService with the given repositories.
         """
         self.author_repo = author_repo
         self.book_repo = book_repo
+        self.version_repo = version_repo
+        self.stats_repo = stats_repo
 
     def create_author(self, data: AuthorCreate):
         """
@@ -22,6 +34,7 @@ class AuthorService:
         """
         obj = AuthorModel(name=data.name, bio=data.bio)
         res = self.author_repo.create_author(obj)
+        self.version_repo.bump(AuthorModel.__tablename__)
         return AuthorSchema.model_validate(res)
 
     def get_author_by_id(self, auth_id: str):
@@ -45,44 +58,59 @@ class AuthorService:
             "books": blist,
         }
 
-    def get_authors(self):
+    def get_catalog_version(self):
+        """
+        Retrieve the table versions the author listing is derived from.
+        """
+        return self.version_repo.get_versions([AuthorModel.__tablename__])
+
+    def get_authors(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
         """
-        Retrieve all authors.
+        Retrieve a page of authors.
         """
-        records = self.author_repo.get_authors()
+        records = self.author_repo.get_authors(limit, decode_cursor(cursor))
 
-        if not records:
+        if not records and cursor is None:
             raise NotFoundException("No authors found")
 
+        records, next_cursor = split_page(
+            records, limit, lambda r: (r.created_at, r.id)
+        )
         result = []
         for r in records:
             result.append(AuthorSchema.model_validate(r))
-        return result
+        return {"items": result, "next_cursor": next_cursor}
 
     def update_author(self, aid: str, data: AuthorUpdate):
         """
         Update an existing author.
         """
-        author = self.author_repo.get_author_by_id(aid)
-
-        if author is None:
-            raise NotFoundException("Author not found")
-
+        values = {}
         if data.name is not None:
-            author.name = data.name
+            values["name"] = data.name
 
         if data.bio is not None:
-            author.bio = data.bio
+            values["bio"] = data.bio
+
+        if values:
+            updated = self.author_repo.update_author(aid, values)
+        else:
+            updated = self.author_repo.get_author_by_id(aid)
 
-        updated = self.author_repo.update_author(author)
+        if updated is None:
+            raise NotFoundException("Author not found")
+        if values:
+            self.version_repo.bump(AuthorModel.__tablename__)
         return AuthorSchema.model_validate(updated)
 
     def delete_author(self, aid: str):
         """
         Delete an author by their ID.
         """
-        author = self.author_repo.get_author_by_id(aid)
-        if not author:
+        # The database cascades the delete to the author's books and their
+        # loans, so those are uncounted first. A refused delete raises, which
+        # rolls that back.
+        self.stats_repo.forget_loans_of(author_id=aid)
+        if self.author_repo.delete_author(aid) is None:
             raise NotFoundException("Author not found")
-
-        self.author_repo.delete_author(aid)
+        self.version_repo.bump(AuthorModel.__tablename__, BookModel.__tablename__)
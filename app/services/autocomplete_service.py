@@ -0,0 +1,57 @@
+from typing import Any, Dict, Iterable, Tuple
+
+from app.core.autocomplete import PrefixIndex, book_index, borrower_index
+from app.repositories.book_repository import BookRepositoryInterface
+from app.repositories.borrower_repository import BorrowerRepositoryInterface
+
+Record = Tuple[Any, Dict[str, Any], Iterable[str]]
+
+
+def borrower_record(borrower) -> Record:
+    """
+    Describe a borrower, or a row with its id, name and email, for the index.
+    """
+    payload = {"id": str(borrower.id), "name": borrower.name, "email": borrower.email}
+    return borrower.id, payload, (borrower.name, borrower.email)
+
+
+def book_record(book) -> Record:
+    """
+    Describe a book, or a row with its id and title, for the index.
+    """
+    return book.id, {"id": str(book.id), "title": book.title}, (book.title,)
+
+
+class AutocompleteService:
+    def __init__(
+        self,
+        borrower_repo: BorrowerRepositoryInterface,
+        book_repo: BookRepositoryInterface,
+        borrowers: PrefixIndex = borrower_index,
+        books: PrefixIndex = book_index,
+    ):
+        """
+        Initialize the AutocompleteService with the given repositories and indexes.
+        """
+        self.borrower_repo = borrower_repo
+        self.book_repo = book_repo
+        self.borrowers = borrowers
+        self.books = books
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Reload both indexes from the database, streaming the rows. Records
+        created, changed or deleted meanwhile are replayed onto the new
+        snapshot, as with the availability index.
+        Returns:
+            Dict[str, int]: The number of records in each index.
+        """
+        self.borrowers.begin_resync()
+        self.books.begin_resync()
+        self.borrowers.load(
+            borrower_record(row) for row in self.borrower_repo.iter_borrowers()
+        )
+        self.books.load(
+            book_record(row) for row in self.book_repo.iter_books_with_author_names()
+        )
+        return {"borrowers": len(self.borrowers), "books": len(self.books)}
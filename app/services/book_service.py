@@ -1,9 +1,18 @@
+from functools import partial
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.core.autocomplete import PrefixIndex, book_index
 from app.core.exceptions import ActiveLoanExistsException, NotFoundException
+from app.core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, split_page
+from app.models.author import Author as AuthorModel
 from app.models.book import Book as BookModel
 from app.repositories.author_repository import AuthorRepositoryInterface
 from app.repositories.book_repository import BookRepositoryInterface
-from app.repositories.loan_repository import LoanRepositoryInterface
+from app.repositories.stats_repository import StatsRepositoryInterface
+from app.repositories.table_version_repository import TableVersionRepositoryInterface
 from app.schemas.book import BookCreate, BookUpdate, Book as BookSchema
+from app.services.autocomplete_service import book_record
 
 
 class BookService:
@@ -11,14 +20,18 @@ class BookService:
         self,
         book_repo: BookRepositoryInterface,
         author_repo: AuthorRepositoryInterface,
-        loan_repo: LoanRepositoryInterface,
+        version_repo: TableVersionRepositoryInterface,
+        stats_repo: StatsRepositoryInterface,
+        autocomplete: PrefixIndex = book_index,
     ):
         """
         Initialize the BookService with the given repositories.
         """
         self.book_repo = book_repo
         self.author_repo = author_repo
-        self.loan_repo = loan_repo
+        self.version_repo = version_repo
+        self.stats_repo = stats_repo
+        self.autocomplete = autocomplete
 
     def create_book(self, book_data: BookCreate):
         """
@@ -36,79 +49,139 @@ class BookService:
         )
 
         created = self.book_repo.create_book(new_book)
-        return self._build_book_response(created)
+        self.version_repo.bump(BookModel.__tablename__)
+        self.book_repo.after_commit(
+            partial(self.autocomplete.upsert, *book_record(created))
+        )
+        return self._build_book_response(created, {author.id: author.name})
 
     def get_book_by_id(self, book_id: str):
         """
         Retrieve a book by its ID.
         """
-        book = self.book_repo.get_book_by_id(book_id)
-        if book is None:
+        row = self.book_repo.get_book_with_author_name(book_id)
+        if row is None:
             raise NotFoundException("Book not found")
 
-        return self._build_book_response(book)
+        book, author_name = row
+        return self._build_book_response(book, {book.author_id: author_name})
+
+    def get_catalog_version(self):
+        """
+        Retrieve the table versions the book listing is derived from. Book
+        responses carry author names, so author changes count too.
+        """
+        return self.version_repo.get_versions(
+            [BookModel.__tablename__, AuthorModel.__tablename__]
+        )
 
-    def get_books(self):
+    def get_books(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
         """
-        Retrieve all books.
+        Retrieve a page of books.
+        Args:
+            limit (int): The page size.
+            cursor (Optional[str]): The cursor returned with the previous page.
+        Returns:
+            dict: The books on the page and the cursor of the next page.
         """
-        all_books = self.book_repo.get_books()
+        rows = self.book_repo.get_books_with_author_names(limit, decode_cursor(cursor))
+        rows, next_cursor = split_page(
+            rows, limit, lambda row: (row[0].created_at, row[0].id)
+        )
+        author_names = {book.author_id: author_name for book, author_name in rows}
         result = []
-        for book in all_books:
-            result.append(self._build_book_response(book))
-        return result
+        for book, _ in rows:
+            result.append(self._build_book_response(book, author_names))
+        return {"items": result, "next_cursor": next_cursor}
+
+    def search_books(
+        self, q: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ):
+        """
+        Search books by title, ISBN or author name, best matches first.
+        Args:
+            q (str): The search text.
+            limit (int): The page size.
+            cursor (Optional[str]): The cursor returned with the previous page.
+        Returns:
+            dict: The matching books on the page and the cursor of the next page.
+        """
+        rows = self.book_repo.search_books_with_author_names(
+            q, limit, decode_cursor(cursor, float)
+        )
+        rows, next_cursor = split_page(rows, limit, lambda r: (r[2], r[0].id))
+
+        author_names = {book.author_id: author_name for book, author_name, _ in rows}
+        result = []
+        for book, _, _ in rows:
+            result.append(self._build_book_response(book, author_names))
+        return {"items": result, "next_cursor": next_cursor}
 
     def update_book(self, book_id: str, book_data: BookUpdate):
         """
         Update an existing book.
         """
-        book = self.book_repo.get_book_by_id(book_id)
-        if not book:
-            raise NotFoundException("Book not found")
-
+        values = {}
         if book_data.title:
-            book.title = book_data.title
+            values["title"] = book_data.title
         if book_data.isbn:
-            book.isbn = book_data.isbn
+            values["isbn"] = book_data.isbn
         if book_data.published_date:
-            book.published_date = book_data.published_date
+            values["published_date"] = book_data.published_date
         if book_data.author_id:
             exists = self.author_repo.get_author_by_id(book_data.author_id)
             if not exists:
                 raise NotFoundException("Author does not exist")
-            book.author_id = book_data.author_id
+            values["author_id"] = book_data.author_id
+
+        if values:
+            row = self.book_repo.update_book(book_id, values)
+        else:
+            row = self.book_repo.get_book_with_author_name(book_id)
+        if not row:
+            raise NotFoundException("Book not found")
 
-        updated = self.book_repo.update_book(book)
-        return self._build_book_response(updated)
+        updated, author_name = row
+        if values:
+            self.version_repo.bump(BookModel.__tablename__)
+            self.book_repo.after_commit(
+                partial(self.autocomplete.upsert, *book_record(updated))
+            )
+        return self._build_book_response(updated, {updated.author_id: author_name})
 
     def delete_book(self, book_id: str):
         """
         Delete a book by its ID.
         """
-        book = self.book_repo.get_book_by_id(book_id)
-        if book is None:
-            raise NotFoundException("Book not found")
-
-        has_active_loan = self.loan_repo.book_has_active_loan(book_id)
-        if has_active_loan:
+        # The database cascades the delete to the book's loans, so they are
+        # uncounted first. A refused delete raises, which rolls that back.
+        self.stats_repo.forget_loans_of(book_id=book_id)
+        if self.book_repo.delete_book(book_id) is None:
+            # Nothing was deleted: the book is either unknown or on loan.
+            if self.book_repo.get_book_by_id(book_id) is None:
+                raise NotFoundException("Book not found")
             raise ActiveLoanExistsException("Cannot delete book with active loans")
 
-        self.book_repo.delete_book(book_id)
+        self.version_repo.bump(BookModel.__tablename__)
+        self.book_repo.after_commit(partial(self.autocomplete.remove, book_id))
 
-    def _build_book_response(self, book: BookModel) -> BookSchema:
+    def _build_book_response(
+        self, book: BookModel, author_names: Dict[UUID, Optional[str]]
+    ) -> BookSchema:
         """
         Build a BookSchema response from a BookModel instance.
+        Args:
+            book (BookModel): The book to build the response for.
+            author_names (Dict[UUID, Optional[str]]): Preloaded author names keyed
+                by author ID, so no query is issued per book.
+        Returns:
+            BookSchema: The book response.
         """
-        author = self.author_repo.get_author_by_id(book.author_id)
-        author_name = author.name if author else None
-
-        res = {
-            "id": book.id,
-            "title": book.title,
-            "isbn": book.isbn,
-            "published_date": book.published_date,
-            "author_id": book.author_id,
-            "author_name": author_name,
-        }
-
-        return BookSchema.model_validate(res)
+        return BookSchema(
+            id=book.id,
+            title=book.title,
+            isbn=book.isbn,
+            published_date=book.published_date,
+            author_id=book.author_id,
+            author_name=author_names.get(book.author_id),
+        )
@@ -1,36 +1,50 @@
+from functools import partial
+from typing import Optional
+
+from app.core.autocomplete import PrefixIndex, borrower_index
 from app.core.exceptions import ActiveLoanExistsException, NotFoundException
+from app.core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, split_page
 from app.models.borrower import Borrower as BorrowerModel
 from app.repositories.borrower_repository import BorrowerRepositoryInterface
-from app.repositories.loan_repository import LoanRepositoryInterface
+from app.repositories.stats_repository import StatsRepositoryInterface
 from app.schemas.borrower import (
     BorrowerCreate,
+    BorrowerProfile,
     BorrowerUpdate,
     Borrower as BorrowerSchema,
 )
-from app.schemas.loan import Loan as LoanSchema
+from app.schemas.loan import LoanDetail, LoanStatus
+from app.services.autocomplete_service import borrower_record
 
 
 class BorrowerService:
     def __init__(
         self,
         borrower_repo: BorrowerRepositoryInterface,
-        loan_repo: LoanRepositoryInterface,
+        stats_repo: StatsRepositoryInterface,
+        autocomplete: PrefixIndex = borrower_index,
     ):
         """
         Initialize the BorrowerService with the given repositories.
         """
         self.borrower_repo = borrower_repo
-        self.loan_repo = loan_repo
+        self.stats_repo = stats_repo
+        self.autocomplete = autocomplete
 
-    def get_borrowers(self):
+    def get_borrowers(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ):
         """
-        Retrieve all borrowers.
+        Retrieve a page of borrowers.
         """
-        records = self.borrower_repo.get_borrowers()
+        records = self.borrower_repo.get_borrowers(limit, decode_cursor(cursor))
+        records, next_cursor = split_page(
+            records, limit, lambda r: (r.created_at, r.id)
+        )
         blist = []
         for r in records:
             blist.append(BorrowerSchema.model_validate(r))
-        return blist
+        return {"items": blist, "next_cursor": next_cursor}
 
     def get_borrower_by_id(self, bid: str):
         borrower = self.borrower_repo.get_borrower_by_id(bid)
@@ -45,40 +59,94 @@ class BorrowerService:
             phone=data.phone,
         )
         res = self.borrower_repo.create_borrower(obj)
+        self.borrower_repo.after_commit(
+            partial(self.autocomplete.upsert, *borrower_record(res))
+        )
         return BorrowerSchema.model_validate(res)
 
     def update_borrower(self, bid: str, data: BorrowerUpdate) -> BorrowerSchema:
-        borrower = self.borrower_repo.get_borrower_by_id(bid)
-        if borrower is None:
-            raise NotFoundException("Borrower not found")
-
+        values = {}
         if data.name is not None:
-            borrower.name = data.name
+            values["name"] = data.name
         if data.email is not None:
-            borrower.email = data.email
+            values["email"] = data.email
         if data.phone is not None:
-            borrower.phone = data.phone
-        updated = self.borrower_repo.update_borrower(borrower)
-        return BorrowerSchema.model_validate(updated)
+            values["phone"] = data.phone
 
-    def delete_borrower(self, bid: str):
-        borrower = self.borrower_repo.get_borrower_by_id(bid)
-        if not borrower:
+        if values:
+            updated = self.borrower_repo.update_borrower(bid, values)
+        else:
+            updated = self.borrower_repo.get_borrower_by_id(bid)
+        if updated is None:
             raise NotFoundException("Borrower not found")
+        self.borrower_repo.after_commit(
+            partial(self.autocomplete.upsert, *borrower_record(updated))
+        )
+        return BorrowerSchema.model_validate(updated)
 
-        active_loans = self.loan_repo.get_active_loans_by_borrower(bid)
-        if len(active_loans) > 0:
+    def delete_borrower(self, bid: str):
+        # The database cascades the delete to the borrower's loans, so they are
+        # uncounted first. A refused delete raises, which rolls that back.
+        self.stats_repo.forget_loans_of(borrower_id=bid)
+        if self.borrower_repo.delete_borrower(bid) is None:
+            # Nothing was deleted: the borrower is either unknown or has loans out.
+            if self.borrower_repo.get_borrower_by_id(bid) is None:
+                raise NotFoundException("Borrower not found")
             raise ActiveLoanExistsException("Cannot delete borrower with active loans")
 
-        self.borrower_repo.delete_borrower(bid)
+        self.borrower_repo.after_commit(partial(self.autocomplete.remove, bid))
         return True
 
-    def get_borrower_profile_with_loans(self, bid: str):
-        borrower_data = self.get_borrower_by_id(bid)
-        loans = self.loan_repo.get_loans_by_borrower_id(bid)
+    def get_profile_version(self, bid: str):
+        """
+        Retrieve the values the borrower's profile ETag is derived from, in
+        one query that does not read the loans.
+        """
+        return self.borrower_repo.get_profile_version(bid)
 
-        loan_list = []
-        for loan in loans:
-            loan_list.append(LoanSchema.model_validate(loan))
+    def get_borrower_profile_with_loans(
+        self,
+        bid: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        status: Optional[LoanStatus] = None,
+    ) -> BorrowerProfile:
+        """
+        Retrieve a borrower with one page of their loans, newest first, each
+        with its book's title and author name.
+        Args:
+            bid (str): The ID of the borrower.
+            limit (int): The page size.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            status (Optional[LoanStatus]): Only return active or returned loans.
+        Returns:
+            BorrowerProfile: The borrower, the loans on the page and the cursor
+            of the next page.
+        """
+        borrower, rows = self.borrower_repo.get_profile_with_loans(
+            bid, limit, decode_cursor(cursor), status.value if status else None
+        )
+        if borrower is None:
+            raise NotFoundException("Borrower not found")
 
-        return {"borrower": borrower_data, "loans": loan_list}
+        rows, next_cursor = split_page(
+            rows, limit, lambda r: (r[0].created_at, r[0].id)
+        )
+        loans = [
+            LoanDetail(
+                id=loan.id,
+                book_id=loan.book_id,
+                borrower_id=loan.borrower_id,
+                loan_date=loan.loan_date,
+                due_date=loan.due_date,
+                return_date=loan.return_date,
+                book_title=title,
+                author_name=author_name,
+            )
+            for loan, title, author_name in rows
+        ]
+        return BorrowerProfile(
+            borrower=BorrowerSchema.model_validate(borrower),
+            loans=loans,
+            next_cursor=next_cursor,
+        )
@@ -0,0 +1,89 @@
+import csv
+import io
+from typing import Iterable, Iterator, List, Optional
+from uuid import UUID
+
+from pydantic_core import to_json
+
+from app.repositories.book_repository import BookRepositoryInterface
+from app.repositories.loan_repository import LoanRepositoryInterface
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+ROWS_PER_CHUNK = 500
+
+LOAN_COLUMNS = [
+    "id",
+    "book_id",
+    "borrower_id",
+    "loan_date",
+    "due_date",
+    "return_date",
+]
+BOOK_COLUMNS = ["id", "title", "isbn", "published_date", "author_id", "author_name"]
+
+
+class ExportService:
+    def __init__(
+        self, loan_repo: LoanRepositoryInterface, book_repo: BookRepositoryInterface
+    ):
+        """
+        Initialize the ExportService with the given repositories.
+        """
+        self.loan_repo = loan_repo
+        self.book_repo = book_repo
+
+    def export_loans(
+        self,
+        fmt: str,
+        active_only: bool = False,
+        borrower_id: Optional[UUID] = None,
+    ) -> Iterator[bytes]:
+        """
+        Stream loans as NDJSON or CSV.
+        Args:
+            fmt (str): Either "ndjson" or "csv".
+            active_only (bool): Only include loans that have not been returned.
+            borrower_id (Optional[UUID]): Only include loans of this borrower.
+        Returns:
+            Iterator[bytes]: Encoded chunks of the document.
+        """
+        rows = self.loan_repo.iter_loans(active_only, borrower_id)
+        return self._encode(rows, LOAN_COLUMNS, fmt)
+
+    def export_books(self, fmt: str) -> Iterator[bytes]:
+        """
+        Stream the catalog, with author names, as NDJSON or CSV.
+        Args:
+            fmt (str): Either "ndjson" or "csv".
+        Returns:
+            Iterator[bytes]: Encoded chunks of the document.
+        """
+        rows = self.book_repo.iter_books_with_author_names()
+        return self._encode(rows, BOOK_COLUMNS, fmt)
+
+    def _encode(self, rows: Iterable, columns: List[str], fmt: str) -> Iterator[bytes]:
+        """
+        Encode rows in chunks of ROWS_PER_CHUNK so each write carries a useful
+        amount of data while memory stays bounded.
+        """
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for count, row in enumerate(rows, start=1):
+                writer.writerow(["" if value is None else value for value in row])
+                if count % ROWS_PER_CHUNK == 0:
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue().encode()
+            return
+
+        chunk = []
+        for row in rows:
+            chunk.append(to_json(dict(zip(columns, row))))
+            if len(chunk) == ROWS_PER_CHUNK:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
@@ -0,0 +1,195 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.bulk_io import chunked
+from app.models.author import Author
+from app.models.book import Book
+from app.repositories.author_repository import AuthorRepositoryInterface
+from app.repositories.book_repository import BookRepositoryInterface
+from app.repositories.borrower_repository import BorrowerRepositoryInterface
+from app.repositories.table_version_repository import TableVersionRepositoryInterface
+from app.schemas.author import AuthorCreate
+from app.schemas.book import BookCreate
+from app.schemas.borrower import BorrowerCreate
+
+IMPORT_ENTITIES = ("authors", "books", "borrowers")
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """
+    Running totals of an import. Only the first MAX_REPORTED_ERRORS row errors
+    are kept, so memory stays bounded however many rows fail.
+    """
+
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.processed = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def fail(self, line: int, error: str) -> None:
+        """
+        Record a row that could not be imported.
+        Args:
+            line (int): The line number of the row in the input.
+            error (str): Why the row was rejected.
+        """
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> Dict:
+        """
+        Return the report as a JSON-serializable dict.
+        """
+        return {
+            "entity": self.entity,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class BulkImportService:
+    def __init__(
+        self,
+        author_repo: AuthorRepositoryInterface,
+        book_repo: BookRepositoryInterface,
+        borrower_repo: BorrowerRepositoryInterface,
+        version_repo: TableVersionRepositoryInterface,
+    ):
+        """
+        Initialize the BulkImportService with the given repositories.
+        """
+        self.author_repo = author_repo
+        self.book_repo = book_repo
+        self.borrower_repo = borrower_repo
+        self.version_repo = version_repo
+
+    def import_rows(
+        self,
+        entity: str,
+        rows: Iterable[Tuple[int, object]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_chunk: Optional[Callable[[], None]] = None,
+    ) -> Dict:
+        """
+        Validate and insert a stream of rows chunk by chunk.
+        Args:
+            entity (str): One of "authors", "books" or "borrowers".
+            rows (Iterable[Tuple[int, object]]): Line numbers and raw rows, as
+                produced by read_rows.
+            chunk_size (int): The number of rows written per statement.
+            on_chunk (Optional[Callable[[], None]]): Called after each chunk is
+                written, e.g. to commit.
+        Returns:
+            Dict: The import report.
+        """
+        if entity not in IMPORT_ENTITIES:
+            raise ValueError(f"Unsupported entity: {entity}")
+
+        report = ImportReport(entity)
+        write = getattr(self, f"_write_{entity}")
+        versioned = {"authors": Author.__tablename__, "books": Book.__tablename__}
+        for chunk in chunked(rows, chunk_size):
+            report.processed += len(chunk)
+            inserted = report.inserted
+            write(self._validate(entity, chunk, report), report)
+            if entity in versioned and report.inserted > inserted:
+                self.version_repo.bump(versioned[entity])
+            if on_chunk is not None:
+                on_chunk()
+        return report.as_dict()
+
+    def _validate(self, entity: str, chunk: List, report: ImportReport) -> List:
+        """
+        Validate a chunk with the entity's create schema.
+        Returns:
+            List: Pairs of line numbers and validated schema objects.
+        """
+        schema = {
+            "authors": AuthorCreate,
+            "books": BookCreate,
+            "borrowers": BorrowerCreate,
+        }[entity]
+
+        valid = []
+        for line, raw in chunk:
+            if isinstance(raw, Exception):
+                report.fail(line, f"Malformed row: {raw}")
+                continue
+            try:
+                valid.append((line, schema.model_validate(raw)))
+            except ValidationError as exc:
+                report.fail(line, self._format_error(exc))
+        return valid
+
+    def _write_authors(self, valid: List, report: ImportReport) -> None:
+        """
+        Insert a chunk of validated authors.
+        """
+        self.author_repo.create_authors(
+            [{"name": item.name, "bio": item.bio} for _, item in valid]
+        )
+        report.inserted += len(valid)
+
+    def _write_books(self, valid: List, report: ImportReport) -> None:
+        """
+        Insert a chunk of validated books, resolving their authors in one query.
+        """
+        known = self.author_repo.get_existing_author_ids(
+            {item.author_id for _, item in valid}
+        )
+
+        rows = []
+        for line, item in valid:
+            if item.author_id not in known:
+                report.fail(line, "Author does not exist")
+                continue
+            rows.append(
+                {
+                    "title": item.title,
+                    "isbn": item.isbn,
+                    "published_date": item.published_date,
+                    "author_id": item.author_id,
+                }
+            )
+        self.book_repo.create_books(rows)
+        report.inserted += len(rows)
+
+    def _write_borrowers(self, valid: List, report: ImportReport) -> None:
+        """
+        Insert a chunk of validated borrowers, rejecting duplicate emails.
+        """
+        rows = {}
+        for line, item in valid:
+            if item.email in rows:
+                report.fail(line, "Email already exists")
+                continue
+            rows[item.email] = (
+                line,
+                {"name": item.name, "email": item.email, "phone": item.phone},
+            )
+
+        inserted = self.borrower_repo.create_borrowers(
+            [row for _, row in rows.values()]
+        )
+        for email, (line, _) in rows.items():
+            if email not in inserted:
+                report.fail(line, "Email already exists")
+        report.inserted += len(inserted)
+
+    def _format_error(self, exc: ValidationError) -> str:
+        """
+        Flatten a pydantic ValidationError into one line.
+        """
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+            for err in exc.errors()
+        )
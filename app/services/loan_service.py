@@ -1,26 +1,103 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional
 
+from app.core.availability import AvailabilityIndex, availability_index
 from app.core.exceptions import BookAlreadyBorrowedException, NotFoundException
+from app.core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, split_page
 from app.models.loan import Loan as LoanModel
 from app.repositories.loan_repository import LoanRepositoryInterface
-from app.schemas.loan import LoanCreate, Loan as LoanSchema
+from app.repositories.stats_repository import StatsRepositoryInterface
+from app.schemas.loan import (
+    LoanBatchCreate,
+    LoanBatchItemResult,
+    LoanBatchReturn,
+    LoanCreate,
+    Loan as LoanSchema,
+    OverdueLoan,
+)
+
+DEFAULT_LOAN_PERIOD = timedelta(days=14)
 
 
 class LoanService:
-    def __init__(self, repo: LoanRepositoryInterface):
+    def __init__(
+        self,
+        repo: LoanRepositoryInterface,
+        stats_repo: StatsRepositoryInterface,
+        availability: AvailabilityIndex = availability_index,
+        loan_period: timedelta = DEFAULT_LOAN_PERIOD,
+    ):
         """
-        Initialize the LoanService with the given repository.
+        Initialize the LoanService with the given repositories and the time
+        a book may be kept.
         """
         self.repo = repo
+        self.stats_repo = stats_repo
+        self.availability = availability
+        self.loan_period = loan_period
+
+    def resync_availability(self) -> int:
+        """
+        Reload the availability index from the active loans in the database.
+        Returns:
+            int: The number of books on loan.
+        """
+        self.availability.begin_resync()
+        self.availability.load(self.repo.iter_active_book_ids())
+        return len(self.availability)
 
-    def get_active_loans(self):
+    def get_active_loans(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ):
         """
-        Retrieve all active loans.
+        Retrieve a page of active loans.
+        Args:
+            limit (int): The page size.
+            cursor (Optional[str]): The cursor returned with the previous page.
         returns:
-            List[LoanSchema]: A list of active LoanSchema objects.
+            dict: The active LoanSchema objects on the page and the next cursor.
         """
-        active = self.repo.get_active_loans()
-        return [LoanSchema.model_validate(active_loan) for active_loan in active]
+        active = self.repo.get_active_loans(limit, decode_cursor(cursor))
+        active, next_cursor = split_page(active, limit, lambda r: (r.created_at, r.id))
+        return {
+            "items": [LoanSchema.model_validate(active_loan) for active_loan in active],
+            "next_cursor": next_cursor,
+        }
+
+    def get_overdue_loans(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ):
+        """
+        Retrieve a page of active loans past their due date, most overdue first.
+        Args:
+            limit (int): The page size.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            now (Optional[datetime]): The time to measure against; defaults to
+                the current UTC time.
+        Returns:
+            dict: The OverdueLoan objects on the page and the next cursor.
+        """
+        now = now or datetime.utcnow()
+        rows = self.repo.get_overdue_loans(now, limit, decode_cursor(cursor))
+        rows, next_cursor = split_page(rows, limit, lambda r: (r.due_date, r.id))
+        return {
+            "items": [
+                OverdueLoan(
+                    id=row.id,
+                    book_id=row.book_id,
+                    borrower_id=row.borrower_id,
+                    loan_date=row.loan_date,
+                    due_date=row.due_date,
+                    days_overdue=(now - row.due_date).days,
+                )
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+        }
 
     def get_borrower_loan_history(self, borrower_id: str):
         """
@@ -44,25 +121,20 @@ class LoanService:
         Returns:
             LoanSchema: The created LoanSchema object.
         """
-        if self.repo.book_has_active_loan(data.book_id):
+        created = self.repo.checkout(self._build_loan(data))
+        if created is None:
+            self.repo.after_commit(
+                partial(self.availability.mark_on_loan, [data.book_id])
+            )
             raise BookAlreadyBorrowedException(
                 "A book cannot be loaned if it currently has an active loan"
             )
-
-        ldate = self._parse_dt(data.loan_date)
-        if not ldate:
-            ldate = datetime.utcnow()
-
-        rdate = self._parse_dt(data.return_date) if data.return_date else None
-
-        loan_item = LoanModel(
-            book_id=data.book_id,
-            borrower_id=data.borrower_id,
-            loan_date=ldate,
-            return_date=rdate,
-        )
-
-        created = self.repo.create_loan(loan_item)
+        self.stats_repo.record_checkouts([created])
+        self.repo.bump_loans_versions([created.borrower_id])
+        if created.return_date is None:
+            self.repo.after_commit(
+                partial(self.availability.mark_on_loan, [created.book_id])
+            )
         return LoanSchema.model_validate(created)
 
     def return_loan(self, loan_id: str):
@@ -73,16 +145,152 @@ class LoanService:
         Returns:
             LoanSchema: The updated LoanSchema object with the return date set.
         """
-        loan = self.repo.get_loan_by_id(loan_id)
+        returned = self.repo.return_loan(loan_id)
+        if returned is not None:
+            self.stats_repo.record_returns([returned])
+            self.repo.bump_loans_versions([returned.borrower_id])
+            self.repo.after_commit(
+                partial(self.availability.mark_returned, [returned.book_id])
+            )
+            return LoanSchema.model_validate(returned)
 
+        # Nothing was updated: the loan is either unknown or already returned.
+        loan = self.repo.get_loan_by_id(loan_id)
         if loan is None:
             raise NotFoundException("Loan not found")
+        return LoanSchema.model_validate(loan)
 
-        if loan.return_date is not None:
-            return LoanSchema.model_validate(loan)
+    def create_loans(self, data: LoanBatchCreate):
+        """
+        Check out several books at once.
 
-        returned = self.repo.return_loan(loan_id)
-        return LoanSchema.model_validate(returned)
+        References are validated with one set-based query per table and all
+        valid items are inserted in a single statement.
+        Args:
+            data (LoanBatchCreate): The loans to create.
+        Returns:
+            List[LoanBatchItemResult]: The outcome of each item, in request order.
+        """
+        items = data.items
+        known_books = self.repo.get_existing_book_ids({i.book_id for i in items})
+        known_borrowers = self.repo.get_existing_borrower_ids(
+            {i.borrower_id for i in items}
+        )
+
+        results = [None] * len(items)
+        pending = {}
+        for index, item in enumerate(items):
+            if item.book_id not in known_books:
+                status, detail = "invalid", "Book not found"
+            elif item.borrower_id not in known_borrowers:
+                status, detail = "invalid", "Borrower not found"
+            elif item.book_id in pending:
+                status, detail = "conflict", "Book appears more than once in batch"
+            else:
+                pending[item.book_id] = index
+                continue
+            results[index] = LoanBatchItemResult(
+                index=index, status=status, book_id=item.book_id, detail=detail
+            )
+
+        created = self.repo.checkout_many(
+            [self._build_loan(items[index]) for index in pending.values()]
+        )
+        self.stats_repo.record_checkouts(created)
+        self.repo.bump_loans_versions(loan.borrower_id for loan in created)
+        created_by_book = {loan.book_id: loan for loan in created}
+        # Books that conflicted are on loan too, so the index learns that as well.
+        on_loan = [loan.book_id for loan in created if loan.return_date is None]
+        on_loan.extend(pending.keys() - created_by_book.keys())
+        self.repo.after_commit(partial(self.availability.mark_on_loan, on_loan))
+
+        for book_id, index in pending.items():
+            loan = created_by_book.get(book_id)
+            if loan is None:
+                results[index] = LoanBatchItemResult(
+                    index=index,
+                    status="conflict",
+                    book_id=book_id,
+                    detail="A book cannot be loaned if it currently has an active loan",
+                )
+            else:
+                results[index] = LoanBatchItemResult(
+                    index=index,
+                    status="created",
+                    book_id=book_id,
+                    loan_id=loan.id,
+                    loan=LoanSchema.model_validate(loan),
+                )
+        return results
+
+    def return_loans(self, data: LoanBatchReturn):
+        """
+        Return several loans at once with a single UPDATE.
+        Args:
+            data (LoanBatchReturn): The IDs of the loans to return.
+        Returns:
+            List[LoanBatchItemResult]: The outcome of each item, in request order.
+        """
+        loan_ids = data.loan_ids
+        returned = {loan.id: loan for loan in self.repo.return_loans(set(loan_ids))}
+        self.stats_repo.record_returns(returned.values())
+        self.repo.bump_loans_versions(loan.borrower_id for loan in returned.values())
+        self.repo.after_commit(
+            partial(
+                self.availability.mark_returned,
+                [loan.book_id for loan in returned.values()],
+            )
+        )
+
+        missing = set(loan_ids) - returned.keys()
+        already_returned = {}
+        if missing:
+            already_returned = {
+                loan.id: loan for loan in self.repo.get_loans_by_ids(missing)
+            }
+
+        results = []
+        for index, loan_id in enumerate(loan_ids):
+            if loan_id in returned:
+                status, loan, detail = "returned", returned[loan_id], None
+            elif loan_id in already_returned:
+                status, loan = "already_returned", already_returned[loan_id]
+                detail = "Loan was already returned"
+            else:
+                status, loan, detail = "not_found", None, "Loan not found"
+            results.append(
+                LoanBatchItemResult(
+                    index=index,
+                    status=status,
+                    loan_id=loan_id,
+                    book_id=loan.book_id if loan else None,
+                    detail=detail,
+                    loan=LoanSchema.model_validate(loan) if loan else None,
+                )
+            )
+        return results
+
+    def _build_loan(self, data: LoanCreate) -> LoanModel:
+        """
+        Build a transient Loan from the request data.
+        Args:
+            data (LoanCreate): The data for the new loan.
+        Returns:
+            LoanModel: The loan to insert.
+        """
+        ldate = self._parse_dt(data.loan_date)
+        if not ldate:
+            ldate = datetime.utcnow()
+
+        rdate = self._parse_dt(data.return_date) if data.return_date else None
+
+        return LoanModel(
+            book_id=data.book_id,
+            borrower_id=data.borrower_id,
+            loan_date=ldate,
+            due_date=ldate + self.loan_period,
+            return_date=rdate,
+        )
 
     def _parse_dt(self, s):
         """
@@ -0,0 +1,91 @@
+from datetime import date
+
+from app.core.exceptions import NotFoundException
+from app.repositories.stats_repository import StatsRepositoryInterface
+from app.schemas.stats import (
+    BookCirculation,
+    BorrowerCirculation,
+    DailyCirculation,
+)
+
+
+class StatsService:
+    def __init__(self, repo: StatsRepositoryInterface):
+        """
+        Initialize the StatsService with the given repository.
+        """
+        self.repo = repo
+
+    def get_most_borrowed_books(self, limit: int):
+        """
+        Retrieve the most borrowed books.
+        Args:
+            limit (int): The number of books to return.
+        Returns:
+            List[BookCirculation]: The books, most borrowed first.
+        """
+        return [
+            BookCirculation(
+                book_id=row.book_id,
+                title=row.title,
+                author_name=row.author_name,
+                checkouts=row.checkouts,
+            )
+            for row in self.repo.get_most_borrowed_books(limit)
+        ]
+
+    def get_busiest_borrowers(self, limit: int):
+        """
+        Retrieve the borrowers with the most books out.
+        Args:
+            limit (int): The number of borrowers to return.
+        Returns:
+            List[BorrowerCirculation]: The borrowers, busiest first.
+        """
+        return [
+            BorrowerCirculation(
+                borrower_id=row.borrower_id,
+                name=row.name,
+                active_loans=row.active_loans,
+                total_loans=row.total_loans,
+            )
+            for row in self.repo.get_busiest_borrowers(limit)
+        ]
+
+    def get_borrower_stats(self, borrower_id: str):
+        """
+        Retrieve a borrower's loan counts.
+        Args:
+            borrower_id (str): The ID of the borrower.
+        Returns:
+            BorrowerCirculation: The borrower's active and total loan counts.
+        """
+        row = self.repo.get_borrower_stats(borrower_id)
+        if row is None:
+            raise NotFoundException("Borrower not found")
+        return BorrowerCirculation(
+            borrower_id=row.borrower_id,
+            name=row.name,
+            active_loans=row.active_loans,
+            total_loans=row.total_loans,
+        )
+
+    def get_daily_counts(self, start: date, end: date):
+        """
+        Retrieve the checkouts and returns of each day in a range.
+        Args:
+            start (date): The first day of the range.
+            end (date): The last day of the range, inclusive.
+        Returns:
+            List[DailyCirculation]: One entry per day that had any, in order.
+        """
+        return [
+            DailyCirculation(day=row.day, checkouts=row.checkouts, returns=row.returns)
+            for row in self.repo.get_daily_counts(start, end)
+        ]
+
+    def rebuild(self) -> None:
+        """
+        Recompute every rollup from the loans. The caller commits.
+        """
+        self.repo.rebuild()
@@ -1,4 +1,3 @@
-from app.core.security import get_password_hash
 from app.models.user import User
 from app.repositories.user_repository import UserRepositoryInterface
 
@@ -20,14 +19,14 @@ class UserService:
         """
         return self.repo.get_by_username(username)
 
-    def create_user(self, username: str, password: str):
+    def create_user(self, username: str, password_hash: str):
         """
-        Create a new user with the given username and password.
+        Create a new user with the given username and password hash.
         Args:
             username (str): The username for the new user.
-            password (str): The password for the new user.
+            password_hash (str): The already hashed password for the new user.
         Returns:
             User: The newly created User object.
         """
-        new_user = User(username=username, password_hash=get_password_hash(password))
+        new_user = User(username=username, password_hash=password_hash)
         return self.repo.create(new_user)
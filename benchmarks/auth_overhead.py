@@ -0,0 +1,49 @@
+"""
+Measure the per-request cost of JWT authentication with and without the
+verified-token cache.
+
+Calls get_current_user in-process, the same way the dependency runs for
+every protected route, so the figures exclude HTTP and database time.
+
+    python -m benchmarks.auth_overhead --iterations 50000
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+# Sets the environment the app reads at import time, so it goes first.
+import benchmarks.offline_env
+from app.core.security import create_access_token, get_current_user, token_cache
+
+
+def time_calls(token: str, iterations: int, cached: bool) -> float:
+    """
+    Return the mean latency of get_current_user in microseconds.
+    """
+    token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            token_cache.clear()
+        get_current_user(token)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "kiosk"}, expires_delta=timedelta(hours=1))
+    uncached = time_calls(token, args.iterations, cached=False)
+    cached = time_calls(token, args.iterations, cached=True)
+
+    print(f"{'mode':<12}{'us/call':>10}")
+    print(f"{'no cache':<12}{uncached:>10.2f}")
+    print(f"{'cache':<12}{cached:>10.2f}")
+    print(f"speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
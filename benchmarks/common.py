@@ -0,0 +1,157 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the given percentile of a list of samples.
+    Args:
+        samples (List[float]): The measured values.
+        pct (float): The percentile, between 0 and 100.
+    Returns:
+        float: The percentile value, or 0.0 for an empty list.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name: str, latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """
+    Summarize request latencies as throughput and tail latency figures.
+    Args:
+        name (str): A label for the measured route or scenario.
+        latencies (List[float]): The request latencies in seconds.
+        elapsed (float): The wall-clock duration of the run in seconds.
+    Returns:
+        Dict[str, float]: RPS and p50/p95/p99 in milliseconds.
+    """
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_table(rows: List[Dict[str, float]]) -> None:
+    """
+    Print benchmark summaries as an aligned table.
+    """
+    print(
+        f"{'name':<32}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for row in rows:
+        print(
+            f"{row['name']:<32}{row['requests']:>10}{row['rps']:>10.1f}"
+            f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+        )
+
+
+def auth_headers(username: str = "benchmark") -> Dict[str, str]:
+    """
+    Build the API key and bearer token headers for protected routes.
+    Args:
+        username (str): The subject to put in the minted JWT.
+    Returns:
+        Dict[str, str]: The request headers.
+    """
+    from datetime import timedelta
+
+    from app.core.security import create_access_token
+
+    token = create_access_token({"sub": username}, expires_delta=timedelta(hours=1))
+    return {"X-API-KEY": os.getenv("API_KEY", ""), "Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def run_server(
+    port: int, env: Optional[Dict[str, str]] = None, workers: int = 1
+) -> Iterator[str]:
+    """
+    Start the application under uvicorn in a subprocess.
+    Args:
+        port (int): The port to listen on.
+        env (Optional[Dict[str, str]]): Extra environment variables for the server.
+        workers (int): The number of uvicorn worker processes.
+    Yields:
+        str: The base URL of the running server.
+    """
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, **(env or {})},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(base_url + "/", timeout=1)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+async def hammer(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    duration: float,
+    concurrency: int,
+    **kwargs,
+) -> List[float]:
+    """
+    Send the same request from several concurrent clients for a fixed time.
+    Args:
+        client (httpx.AsyncClient): The client to send requests with.
+        method (str): The HTTP method.
+        url (str): The request URL.
+        duration (float): How long to keep sending, in seconds.
+        concurrency (int): The number of concurrent senders.
+        **kwargs: Extra arguments for client.request.
+    Returns:
+        List[float]: The latency of every successful request in seconds.
+    """
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            if response.status_code < 500:
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
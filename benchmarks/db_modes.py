@@ -0,0 +1,48 @@
+"""
+Compare the sync and async database modes under concurrent load.
+
+Starts the app once with DB_ASYNC=false and once with DB_ASYNC=true against
+the database in DATABASE_URL and drives GET /books/ from many concurrent
+clients. The database should already be migrated and seeded.
+
+    python -m benchmarks.db_modes --concurrency 200 --duration 20
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import auth_headers, hammer, print_table, run_server, summarize
+
+
+async def measure(base_url: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=auth_headers(), limits=limits, timeout=60
+    ) as client:
+        start = time.perf_counter()
+        latencies = await hammer(client, "GET", "/books/", duration, concurrency)
+        return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    rows = []
+    for mode in ("false", "true"):
+        with run_server(args.port, env={"DB_ASYNC": mode}) as base_url:
+            latencies, elapsed = asyncio.run(
+                measure(base_url, args.concurrency, args.duration)
+            )
+        rows.append(summarize(f"DB_ASYNC={mode}", latencies, elapsed))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+"""
+Drive a realistic mix of traffic through the whole application and report
+throughput and tail latency per route.
+
+Seeds the database in --database-url with a synthetic library (SQLite by
+default, so nothing but this machine is needed; point it at a local
+PostgreSQL to measure the production setup), starts the app under uvicorn
+with a freshly minted API key and JWT secret, and lets --concurrency virtual
+users loop over a weighted mix of list, get, checkout and return requests.
+Every user sends its own bearer token. Checkouts take books that are known
+to be free and returns give them back, so the mix can run for any length
+of time.
+
+    python -m benchmarks.load_test --books 20000 --concurrency 50 --duration 30
+    python -m benchmarks.load_test --database-url postgresql+psycopg2://... \\
+        --workers 4 --mix list_books=50,get_book=30,checkout=10,return=10
+
+The database is seeded once and reused by later runs unless --reseed is
+given. On PostgreSQL the schema is created with alembic, on SQLite straight
+from the models. SQLite serializes writes, so its figures are mainly useful
+for comparing the application's own overhead between changes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import subprocess
+import sys
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.common import print_table, run_server, summarize
+
+DEFAULT_DATABASE_URL = "sqlite:///./loadtest.db"
+DEFAULT_MIX = (
+    "list_books=20,get_book=25,list_authors=5,get_author=10,list_borrowers=5,"
+    "get_borrower=10,list_active_loans=5,checkout=10,return=10"
+)
+SEED_CHUNK_SIZE = 5000
+ID_SAMPLE_SIZE = 100000
+
+
+def prepare_database(database_url: str, reseed: bool) -> None:
+    """
+    Create the schema if it is missing and, with reseed, empty every table.
+    Args:
+        database_url (str): The database to prepare.
+        reseed (bool): Whether to delete the existing rows.
+    """
+    from sqlalchemy import create_engine, text
+
+    from app.core.db import Base
+    from app.models import (
+        author,
+        book,
+        borrower,
+        circulation,
+        loan,
+        table_version,
+        user,
+    )
+
+    engine = create_engine(database_url)
+    if engine.dialect.name == "postgresql":
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            check=True,
+            env={**os.environ, "DATABASE_URL": database_url},
+        )
+    else:
+        Base.metadata.create_all(engine)
+
+    if reseed:
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(text(f'DELETE FROM "{table.name}"'))
+    engine.dispose()
+
+
+def seed(database_url: str, books: int, rng: random.Random) -> None:
+    """
+    Fill an empty database with a synthetic library: a tenth as many authors
+    and half as many borrowers as books, a quarter of the books on loan and
+    another quarter borrowed and returned.
+    Args:
+        database_url (str): The database to fill.
+        books (int): The number of books.
+        rng (random.Random): The source of choices.
+    """
+    from sqlalchemy import create_engine, func, insert, select
+
+    from app.models.author import Author
+    from app.models.book import Book
+    from app.models.borrower import Borrower
+    from app.models.loan import Loan
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        if conn.scalar(select(func.count()).select_from(Book)):
+            print("database already seeded; pass --reseed to start over")
+            engine.dispose()
+            return
+
+    started = time.perf_counter()
+    origin = datetime.utcnow() - timedelta(days=365)
+    clock = iter(range(10**9))
+
+    def stamp() -> datetime:
+        return origin + timedelta(seconds=next(clock))
+
+    def write(conn, model, rows: List[Dict]) -> None:
+        for i in range(0, len(rows), SEED_CHUNK_SIZE):
+            conn.execute(insert(model), rows[i : i + SEED_CHUNK_SIZE])
+
+    authors = [
+        {"id": uuid4(), "name": f"Author {i}", "bio": f"Bio {i}", "created_at": stamp()}
+        for i in range(max(1, books // 10))
+    ]
+    book_rows = [
+        {
+            "id": uuid4(),
+            "title": f"Book {i}",
+            "isbn": f"978{i:010d}",
+            "published_date": datetime(1950 + i % 70, 1 + i % 12, 1),
+            "author_id": rng.choice(authors)["id"],
+            "created_at": stamp(),
+        }
+        for i in range(books)
+    ]
+    borrowers = [
+        {
+            "id": uuid4(),
+            "name": f"Borrower {i}",
+            "email": f"borrower{i}@example.com",
+            "phone": f"+1555{i:07d}",
+            "created_at": stamp(),
+        }
+        for i in range(max(1, books // 2))
+    ]
+    loans = []
+    for i, book_row in enumerate(book_rows[: books // 2]):
+        at = stamp()
+        loans.append(
+            {
+                "id": uuid4(),
+                "book_id": book_row["id"],
+                "borrower_id": rng.choice(borrowers)["id"],
+                "loan_date": at,
+                "due_date": at + timedelta(days=14),
+                "return_date": at + timedelta(days=14) if i % 2 else None,
+                "created_at": at,
+            }
+        )
+
+    with engine.begin() as conn:
+        write(conn, Author, authors)
+        write(conn, Book, book_rows)
+        write(conn, Borrower, borrowers)
+        write(conn, Loan, loans)
+    engine.dispose()
+    print(f"seeded {books} books in {time.perf_counter() - started:.1f}s")
+
+
+class Pools:
+    """
+    The IDs virtual users pick from. Books move between the free queue and
+    the active loan queue as users check out and return, so concurrent users
+    rarely collide on the same book.
+    """
+
+    def __init__(self, database_url: str, rng: random.Random):
+        from sqlalchemy import create_engine, select
+
+        from app.models.author import Author
+        from app.models.book import Book
+        from app.models.borrower import Borrower
+        from app.models.loan import Loan
+
+        engine = create_engine(database_url)
+        with engine.connect() as conn:
+
+            def ids(column, *where) -> List[str]:
+                query = select(column).where(*where).limit(ID_SAMPLE_SIZE)
+                return [str(value) for value in conn.scalars(query)]
+
+            self.authors = ids(Author.id)
+            self.books = ids(Book.id)
+            self.borrowers = ids(Borrower.id)
+            active = ids(Loan.id, Loan.return_date.is_(None))
+            on_loan = set(ids(Loan.book_id, Loan.return_date.is_(None)))
+        engine.dispose()
+
+        free = [book_id for book_id in self.books if book_id not in on_loan]
+        rng.shuffle(free)
+        rng.shuffle(active)
+        self.free_books = deque(free)
+        self.active_loans = deque(active)
+
+
+# Each operation sends one request through send(method, url, label, **kwargs)
+# and returns the route label and the response.
+
+
+async def list_books(send: Callable, pools: Pools, rng: random.Random):
+    return await send("GET", "/books/", "GET /books/")
+
+
+async def get_book(send: Callable, pools: Pools, rng: random.Random):
+    return await send("GET", f"/books/{rng.choice(pools.books)}", "GET /books/{id}")
+
+
+async def list_authors(send: Callable, pools: Pools, rng: random.Random):
+    return await send("GET", "/authors/", "GET /authors/")
+
+
+async def get_author(send: Callable, pools: Pools, rng: random.Random):
+    url = f"/authors/{rng.choice(pools.authors)}"
+    return await send("GET", url, "GET /authors/{id}")
+
+
+async def list_borrowers(send: Callable, pools: Pools, rng: random.Random):
+    return await send("GET", "/borrowers/", "GET /borrowers/")
+
+
+async def get_borrower(send: Callable, pools: Pools, rng: random.Random):
+    url = f"/borrowers/{rng.choice(pools.borrowers)}"
+    return await send("GET", url, "GET /borrowers/{id}")
+
+
+async def list_active_loans(send: Callable, pools: Pools, rng: random.Random):
+    return await send("GET", "/loans/active", "GET /loans/active")
+
+
+async def checkout(send: Callable, pools: Pools, rng: random.Random):
+    if not pools.free_books:
+        return await return_loan(send, pools, rng)
+    book_id = pools.free_books.popleft()
+    body = {"book_id": book_id, "borrower_id": rng.choice(pools.borrowers)}
+    label, response = await send("POST", "/loans/", "POST /loans/", json=body)
+    if response.status_code == 200:
+        pools.active_loans.append(response.json()["id"])
+    return label, response
+
+
+async def return_loan(send: Callable, pools: Pools, rng: random.Random):
+    if not pools.active_loans:
+        return await checkout(send, pools, rng)
+    url = f"/loans/{pools.active_loans.popleft()}/return"
+    label, response = await send("PUT", url, "PUT /loans/{id}/return")
+    if response.status_code == 200:
+        pools.free_books.append(response.json()["book_id"])
+    return label, response
+
+
+OPERATIONS = {
+    "list_books": list_books,
+    "get_book": get_book,
+    "list_authors": list_authors,
+    "get_author": get_author,
+    "list_borrowers": list_borrowers,
+    "get_borrower": get_borrower,
+    "list_active_loans": list_active_loans,
+    "checkout": checkout,
+    "return": return_loan,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """
+    Parse a traffic mix such as "list_books=50,checkout=10" into weights.
+    Args:
+        spec (str): Comma-separated operation=weight pairs.
+    Returns:
+        Dict[str, int]: The weight of each operation.
+    Raises:
+        ValueError: If an operation is unknown or a weight is not positive.
+    """
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}, use {', '.join(OPERATIONS)}")
+        mix[name] = int(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"the weight of {name!r} must be positive")
+    return mix
+
+
+async def drive(
+    base_url: str,
+    pools: Pools,
+    mix: Dict[str, int],
+    headers: List[Dict[str, str]],
+    duration: float,
+    seed_value: int,
+):
+    """
+    Run one virtual user per set of headers for a fixed time.
+    Args:
+        base_url (str): The URL of the running server.
+        pools (Pools): The IDs to pick from.
+        mix (Dict[str, int]): The weight of each operation.
+        headers (List[Dict[str, str]]): The auth headers of each user.
+        duration (float): How long to keep sending, in seconds.
+        seed_value (int): Makes each user's sequence of choices repeatable.
+    Returns:
+        Tuple: The latencies of non-5xx responses and the status counts, both
+        keyed by route label, and the elapsed time in seconds.
+    """
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Counter] = {}
+    limits = httpx.Limits(max_connections=len(headers))
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user(index: int):
+            rng = random.Random(seed_value * 1_000_003 + index)
+
+            async def send(method, url, label, **kwargs):
+                return label, await client.request(
+                    method, url, headers=headers[index], **kwargs
+                )
+
+            while time.perf_counter() < deadline:
+                operation = OPERATIONS[rng.choices(names, weights)[0]]
+                start = time.perf_counter()
+                try:
+                    label, response = await operation(send, pools, rng)
+                except httpx.TransportError as exc:
+                    label, status = "transport", type(exc).__name__
+                else:
+                    status = response.status_code
+                    if status < 500:
+                        elapsed = time.perf_counter() - start
+                        latencies.setdefault(label, []).append(elapsed)
+                statuses.setdefault(label, Counter())[status] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(len(headers))))
+        return latencies, statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    # Mint the credentials before anything from app is imported, so the
+    # server and the tokens minted here agree on them.
+    api_key = secrets.token_urlsafe(24)
+    server_env = {
+        "DATABASE_URL": args.database_url,
+        "API_KEY": api_key,
+        "JWT_SECRET": secrets.token_urlsafe(32),
+        "JWT_ALGORITHM": "HS256",
+    }
+    os.environ.update(server_env)
+
+    from app.core.security import create_access_token
+
+    rng = random.Random(args.seed)
+    prepare_database(args.database_url, args.reseed)
+    seed(args.database_url, args.books, rng)
+    pools = Pools(args.database_url, rng)
+
+    headers = [
+        {
+            "X-API-KEY": api_key,
+            "Authorization": "Bearer "
+            + create_access_token(
+                {"sub": f"loadtest-{i}"}, expires_delta=timedelta(hours=2)
+            ),
+        }
+        for i in range(args.concurrency)
+    ]
+
+    with run_server(args.port, env=server_env, workers=args.workers) as base_url:
+        if args.warmup > 0:
+            asyncio.run(drive(base_url, pools, mix, headers, args.warmup, args.seed))
+        latencies, statuses, elapsed = asyncio.run(
+            drive(base_url, pools, mix, headers, args.duration, args.seed + 1)
+        )
+
+    rows = [summarize(label, latencies[label], elapsed) for label in sorted(latencies)]
+    everything = [value for values in latencies.values() for value in values]
+    rows.append(summarize("all routes", everything, elapsed))
+    print_table(rows)
+
+    print()
+    for label in sorted(statuses):
+        counts = ", ".join(
+            f"{s}: {n}" for s, n in sorted(statuses[label].items(), key=str)
+        )
+        print(f"{label:<32}{counts}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(
+                {
+                    "args": vars(args),
+                    "routes": rows,
+                    "statuses": {k: dict(v) for k, v in statuses.items()},
+                },
+                fh,
+                indent=2,
+                default=str,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure GET /books/ tail latency while a storm of logins hits the same worker.
+
+Starts a single-worker server, registers a benchmark user, then measures
+/books/ alone and again while --storm concurrent clients keep calling
+/login. With hashing off the event loop the p99 of /books/ should stay close
+to the quiet baseline; excess logins are shed with 503 once they wait longer
+than PASSWORD_HASH_QUEUE_TIMEOUT.
+
+    python -m benchmarks.login_storm --storm 50 --duration 15
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import auth_headers, hammer, print_table, run_server, summarize
+
+
+async def login_storm(
+    client: httpx.AsyncClient, username: str, duration: float, n: int
+):
+    form = {"username": username, "password": "benchmark-password"}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await client.post("/login", data=form)
+
+    await asyncio.gather(*(worker() for _ in range(n)))
+
+
+async def measure(base_url: str, args):
+    username = f"storm-{uuid.uuid4().hex[:8]}"
+    limits = httpx.Limits(max_connections=args.concurrency + args.storm)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        await client.post(
+            "/register", json={"username": username, "password": "benchmark-password"}
+        )
+        headers = auth_headers()
+
+        start = time.perf_counter()
+        quiet = await hammer(
+            client, "GET", "/books/", args.duration, args.concurrency, headers=headers
+        )
+        quiet_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stormy, _ = await asyncio.gather(
+            hammer(
+                client,
+                "GET",
+                "/books/",
+                args.duration,
+                args.concurrency,
+                headers=headers,
+            ),
+            login_storm(client, username, args.duration, args.storm),
+        )
+        stormy_elapsed = time.perf_counter() - start
+
+    return [
+        summarize("/books/ quiet", quiet, quiet_elapsed),
+        summarize("/books/ during login storm", stormy, stormy_elapsed),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--storm", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with run_server(args.port) as base_url:
+        rows = asyncio.run(measure(base_url, args))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,964 @@
+"""
+In-memory implementations of the repository interfaces, for running the
+services without a database.
+
+Rows are stored as plain dicts and turned into transient model objects on
+every read, the way a query hands back fresh objects, so callers can never
+mutate stored state by accident. Keyset pages are served from sorted
+(created_at, id) indexes and lookups by foreign key from secondary indexes,
+so the cost of a call does not grow with the size of the tables any more
+than the matching indexed query would.
+"""
+
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from sortedcontainers import SortedList
+
+from app.core.pagination import Cursor, RankCursor
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrower import Borrower
+from app.models.loan import Loan
+from app.repositories.author_repository import AuthorRepositoryInterface
+from app.repositories.book_repository import BookRepositoryInterface
+from app.repositories.borrower_repository import BorrowerRepositoryInterface
+from app.repositories.loan_repository import LoanRepositoryInterface
+from app.repositories.stats_repository import StatsRepositoryInterface
+from app.repositories.table_version_repository import TableVersionRepositoryInterface
+
+BookRow = namedtuple("BookRow", "id title isbn published_date author_id author_name")
+BorrowerRow = namedtuple("BorrowerRow", "id name email")
+LoanRow = namedtuple("LoanRow", "id book_id borrower_id loan_date due_date return_date")
+OverdueRow = namedtuple("OverdueRow", "id book_id borrower_id loan_date due_date")
+BookStatsRow = namedtuple("BookStatsRow", "book_id title author_name checkouts")
+BorrowerStatsRow = namedtuple(
+    "BorrowerStatsRow", "borrower_id name active_loans total_loans"
+)
+DailyStatsRow = namedtuple("DailyStatsRow", "day checkouts returns")
+
+
+def as_uuid(value) -> UUID:
+    """
+    Coerce an ID passed as a string, as the routes do, into a UUID.
+    """
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+class MemoryTable:
+    """
+    The rows of one table keyed by ID, plus their (created_at, id) order.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = [column.key for column in model.__table__.columns]
+        self.rows: Dict[UUID, Dict] = {}
+        self.order = SortedList()
+
+    def insert(self, values: Dict) -> Dict:
+        """
+        Store a row, filling in the column defaults the database would.
+        Args:
+            values (Dict): The column values of the row.
+        Returns:
+            Dict: The stored row.
+        """
+        now = datetime.utcnow()
+        row = {column: values.get(column) for column in self.columns}
+        row["id"] = row["id"] or uuid4()
+        for column in ("created_at", "updated_at", "loan_date"):
+            if column in row and row[column] is None:
+                row[column] = now
+        self.load([row])
+        return row
+
+    def load(self, rows: Iterable[Dict]) -> None:
+        """
+        Store complete rows as they are, e.g. when seeding.
+        Args:
+            rows (Iterable[Dict]): Rows with every column set.
+        """
+        keys = []
+        for row in rows:
+            self.rows[row["id"]] = row
+            keys.append((row["created_at"], row["id"]))
+        self.order.update(keys)
+
+    def get(self, row_id) -> Optional[Dict]:
+        """
+        Return the stored row with the given ID, if any.
+        """
+        return self.rows.get(as_uuid(row_id))
+
+    def update(self, row_id, values: Dict) -> Optional[Dict]:
+        """
+        Update a row in place and bump its updated_at.
+        Returns:
+            Optional[Dict]: The updated row, or None if it does not exist.
+        """
+        row = self.get(row_id)
+        if row is None:
+            return None
+        row.update(values)
+        row["updated_at"] = datetime.utcnow()
+        return row
+
+    def delete(self, row_id) -> Optional[Dict]:
+        """
+        Remove a row.
+        Returns:
+            Optional[Dict]: The removed row, or None if it did not exist.
+        """
+        row = self.rows.pop(as_uuid(row_id), None)
+        if row is not None:
+            self.order.discard((row["created_at"], row["id"]))
+        return row
+
+    def page(
+        self, limit: int, after: Optional[Cursor], order: Optional[SortedList] = None
+    ) -> List[Dict]:
+        """
+        Return up to limit + 1 rows that follow the given keyset position.
+        Args:
+            limit (int): The page size.
+            after (Optional[Cursor]): The position of the last row already seen.
+            order (Optional[SortedList]): A narrower (created_at, id) index to
+                walk instead of the whole table, like a partial index.
+        """
+        order = self.order if order is None else order
+        keys = order.irange(minimum=after, inclusive=(False, False))
+        rows = []
+        for _, row_id in keys:
+            rows.append(self.rows[row_id])
+            if len(rows) > limit:
+                break
+        return rows
+
+    def build(self, row: Dict):
+        """
+        Build a transient model object from a stored row.
+        """
+        return self.model(**row)
+
+
+class MemoryStore:
+    """
+    Every table, plus the secondary indexes the SQL schema relies on.
+    Deletes cascade the way the foreign keys do.
+    """
+
+    def __init__(self):
+        self.authors = MemoryTable(Author)
+        self.books = MemoryTable(Book)
+        self.borrowers = MemoryTable(Borrower)
+        self.loans = MemoryTable(Loan)
+        self.versions: Dict[str, int] = {}
+        # Dicts rather than sets, so rows come back in insertion order.
+        self.books_by_author: Dict[UUID, Dict[UUID, None]] = {}
+        self.loans_by_book: Dict[UUID, Dict[UUID, None]] = {}
+        self.loans_by_borrower: Dict[UUID, Dict[UUID, None]] = {}
+        self.active_by_book: Dict[UUID, UUID] = {}
+        self.active_order = SortedList()
+        self.active_due = SortedList()
+        # The circulation rollups, with (-count, id) indexes for the top-k reads.
+        self.book_checkouts: Dict[UUID, int] = {}
+        self.borrower_loans: Dict[UUID, List[int]] = {}
+        self.daily_counts: Dict[date, List[int]] = {}
+        self.checkouts_order = SortedList()
+        self.active_loans_order = SortedList()
+
+    def index_book(self, row: Dict) -> None:
+        """
+        Add a stored book to the author index.
+        """
+        self.books_by_author.setdefault(row["author_id"], {})[row["id"]] = None
+
+    def index_loan(self, row: Dict) -> None:
+        """
+        Add a stored loan to the book, borrower and active loan indexes.
+        """
+        self.loans_by_book.setdefault(row["book_id"], {})[row["id"]] = None
+        self.loans_by_borrower.setdefault(row["borrower_id"], {})[row["id"]] = None
+        if row["return_date"] is None:
+            self.active_by_book[row["book_id"]] = row["id"]
+            self.active_order.add((row["created_at"], row["id"]))
+            if row.get("due_date") is not None:
+                self.active_due.add((row["due_date"], row["id"]))
+
+    def close_loan(self, row: Dict, return_date: datetime) -> None:
+        """
+        Set the return date of an active loan and drop it from the active index.
+        """
+        self.loans.update(row["id"], {"return_date": return_date})
+        self.active_by_book.pop(row["book_id"], None)
+        self.active_order.discard((row["created_at"], row["id"]))
+        if row.get("due_date") is not None:
+            self.active_due.discard((row["due_date"], row["id"]))
+
+    def delete_loan(self, loan_id: UUID) -> None:
+        """
+        Delete a loan and drop it from every index.
+        """
+        row = self.loans.delete(loan_id)
+        if row is None:
+            return
+        self.loans_by_book.get(row["book_id"], {}).pop(row["id"], None)
+        self.loans_by_borrower.get(row["borrower_id"], {}).pop(row["id"], None)
+        if row["return_date"] is None:
+            self.active_by_book.pop(row["book_id"], None)
+            self.active_order.discard((row["created_at"], row["id"]))
+            if row.get("due_date") is not None:
+                self.active_due.discard((row["due_date"], row["id"]))
+
+    def delete_book(self, book_id: UUID) -> None:
+        """
+        Delete a book and its loans.
+        """
+        row = self.books.delete(book_id)
+        if row is None:
+            return
+        self.books_by_author.get(row["author_id"], {}).pop(row["id"], None)
+        for loan_id in list(self.loans_by_book.pop(row["id"], {})):
+            self.delete_loan(loan_id)
+        checkouts = self.book_checkouts.pop(row["id"], None)
+        if checkouts is not None:
+            self.checkouts_order.discard((-checkouts, row["id"]))
+
+
+class InMemoryAuthorRepository(AuthorRepositoryInterface):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get_authors(self, limit: int, after: Optional[Cursor] = None) -> List[Author]:
+        """
+        Retrieve a page of authors ordered by creation time.
+        """
+        table = self.store.authors
+        return [table.build(row) for row in table.page(limit, after)]
+
+    def get_author_by_id(self, author_id: str) -> Optional[Author]:
+        """
+        Retrieve an author by their ID.
+        """
+        row = self.store.authors.get(author_id)
+        return self.store.authors.build(row) if row else None
+
+    def create_author(self, author: Author) -> Author:
+        """
+        Create a new author in the repository.
+        """
+        return _store_object(self.store.authors, author)
+
+    def create_authors(self, rows: List[Dict]) -> None:
+        """
+        Insert several authors.
+        """
+        for row in rows:
+            self.store.authors.insert(row)
+
+    def get_existing_author_ids(self, author_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given author IDs exist.
+        """
+        return {aid for aid in author_ids if aid in self.store.authors.rows}
+
+    def update_author(self, author_id: UUID, values: Dict) -> Optional[Author]:
+        """
+        Update an author's columns and return the updated row.
+        """
+        row = self.store.authors.update(author_id, values)
+        return self.store.authors.build(row) if row else None
+
+    def delete_author(self, author_id: str) -> Optional[UUID]:
+        """
+        Delete an author and, through the cascade, their books.
+        """
+        row = self.store.authors.delete(author_id)
+        if row is None:
+            return None
+        for book_id in list(self.store.books_by_author.pop(row["id"], {})):
+            self.store.delete_book(book_id)
+        return row["id"]
+
+
+class InMemoryBookRepository(BookRepositoryInterface):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get_books(self, limit: int, after: Optional[Cursor] = None) -> List[Book]:
+        """
+        Retrieve a page of books ordered by creation time.
+        """
+        table = self.store.books
+        return [table.build(row) for row in table.page(limit, after)]
+
+    def get_books_with_author_names(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Tuple[Book, Optional[str]]]:
+        """
+        Retrieve a page of books with the name of each book's author.
+        """
+        table = self.store.books
+        return [
+            (table.build(row), self._author_name(row))
+            for row in table.page(limit, after)
+        ]
+
+    def search_books_with_author_names(
+        self, q: str, limit: int, after: Optional[RankCursor] = None
+    ) -> List[Tuple[Book, Optional[str], float]]:
+        """
+        Scan every book for the search text. Title matches rank above ISBN
+        and author name matches. There is no text index here, so this is
+        linear in the number of books.
+        """
+        needle = q.casefold()
+        hits = []
+        for row in self.store.books.rows.values():
+            author_name = self._author_name(row)
+            if needle in (row["title"] or "").casefold():
+                rank = 1.0
+            elif (
+                needle in (row["isbn"] or "")
+                or needle in (author_name or "").casefold()
+            ):
+                rank = 0.5
+            else:
+                continue
+            hits.append((-rank, row["id"], row, author_name))
+
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        if after is not None:
+            position = (-after[0], after[1])
+            hits = [hit for hit in hits if (hit[0], hit[1]) > position]
+        return [
+            (self.store.books.build(row), author_name, -rank)
+            for rank, _, row, author_name in hits[: limit + 1]
+        ]
+
+    def iter_books_with_author_names(self, batch_size: int = 1000) -> Iterator:
+        """
+        Stream every book with its author name.
+        """
+        for row in list(self.store.books.rows.values()):
+            yield BookRow(
+                row["id"],
+                row["title"],
+                row["isbn"],
+                row["published_date"],
+                row["author_id"],
+                self._author_name(row),
+            )
+
+    def get_book_by_id(self, book_id: str) -> Optional[Book]:
+        """
+        Retrieve a book by its ID.
+        """
+        row = self.store.books.get(book_id)
+        return self.store.books.build(row) if row else None
+
+    def get_book_with_author_name(
+        self, book_id: str
+    ) -> Optional[Tuple[Book, Optional[str]]]:
+        """
+        Retrieve a book by its ID together with its author's name.
+        """
+        row = self.store.books.get(book_id)
+        if row is None:
+            return None
+        return self.store.books.build(row), self._author_name(row)
+
+    def create_book(self, book: Book) -> Book:
+        """
+        Create a new book in the repository.
+        """
+        created = _store_object(self.store.books, book)
+        self.store.index_book(self.store.books.rows[created.id])
+        return created
+
+    def create_books(self, rows: List[Dict]) -> None:
+        """
+        Insert several books.
+        """
+        for row in rows:
+            self.store.index_book(self.store.books.insert(row))
+
+    def update_book(
+        self, book_id: UUID, values: Dict
+    ) -> Optional[Tuple[Book, Optional[str]]]:
+        """
+        Update a book's columns and return the updated row with its author's name.
+        """
+        row = self.store.books.get(book_id)
+        if row is None:
+            return None
+        if "author_id" in values:
+            self.store.books_by_author.get(row["author_id"], {}).pop(row["id"], None)
+        self.store.books.update(book_id, values)
+        self.store.index_book(row)
+        return self.store.books.build(row), self._author_name(row)
+
+    def delete_book(self, book_id: str) -> Optional[UUID]:
+        """
+        Delete a book by its ID unless it is on loan.
+        """
+        book_id = as_uuid(book_id)
+        if book_id not in self.store.books.rows or book_id in self.store.active_by_book:
+            return None
+        self.store.delete_book(book_id)
+        return book_id
+
+    def get_books_by_author_id(self, author_id: str) -> List[Book]:
+        """
+        Retrieve all books by a specific author.
+        """
+        table = self.store.books
+        book_ids = self.store.books_by_author.get(as_uuid(author_id), {})
+        return [table.build(table.rows[book_id]) for book_id in book_ids]
+
+    def _author_name(self, row: Dict) -> Optional[str]:
+        """
+        Look up the name of a book's author, as the join would.
+        """
+        author = self.store.authors.rows.get(row["author_id"])
+        return author["name"] if author else None
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback straight away: the store has no transactions.
+        """
+        callback()
+
+
+class InMemoryBorrowerRepository(BorrowerRepositoryInterface):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get_borrowers(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Borrower]:
+        """
+        Retrieve a page of borrowers ordered by creation time.
+        """
+        table = self.store.borrowers
+        return [table.build(row) for row in table.page(limit, after)]
+
+    def iter_borrowers(self, batch_size: int = 1000) -> Iterator:
+        """
+        Stream the id, name and email of every borrower.
+        """
+        for row in list(self.store.borrowers.rows.values()):
+            yield BorrowerRow(row["id"], row["name"], row["email"])
+
+    def get_borrower_by_id(self, borrower_id: str) -> Optional[Borrower]:
+        """
+        Retrieve a borrower by their ID.
+        """
+        row = self.store.borrowers.get(borrower_id)
+        return self.store.borrowers.build(row) if row else None
+
+    def create_borrower(self, borrower: Borrower) -> Borrower:
+        """
+        Create a new borrower in the repository.
+        """
+        return _store_object(self.store.borrowers, borrower)
+
+    def create_borrowers(self, rows: List[Dict]) -> Set[str]:
+        """
+        Insert several borrowers, skipping rows whose email is already taken.
+        """
+        taken = {row["email"] for row in self.store.borrowers.rows.values()}
+        inserted = set()
+        for row in rows:
+            if row["email"] in taken or row["email"] in inserted:
+                continue
+            self.store.borrowers.insert(row)
+            inserted.add(row["email"])
+        return inserted
+
+    def update_borrower(self, borrower_id: UUID, values: Dict) -> Optional[Borrower]:
+        """
+        Update a borrower's columns and return the updated row.
+        """
+        row = self.store.borrowers.update(borrower_id, values)
+        return self.store.borrowers.build(row) if row else None
+
+    def delete_borrower(self, borrower_id: str) -> Optional[UUID]:
+        """
+        Delete a borrower unless they have active loans and, through the
+        cascade, their past loans.
+        """
+        borrower_id = as_uuid(borrower_id)
+        loans = self.store.loans.rows
+        if any(
+            loans[loan_id]["return_date"] is None
+            for loan_id in self.store.loans_by_borrower.get(borrower_id, {})
+        ):
+            return None
+        row = self.store.borrowers.delete(borrower_id)
+        if row is None:
+            return None
+        for loan_id in list(self.store.loans_by_borrower.pop(row["id"], {})):
+            self.store.delete_loan(loan_id)
+        counts = self.store.borrower_loans.pop(row["id"], None)
+        if counts is not None:
+            self.store.active_loans_order.discard((-counts[0], row["id"]))
+        return row["id"]
+
+    def get_profile_version(self, borrower_id: str) -> Optional[Tuple]:
+        """
+        Retrieve the borrower's updated_at and loans_version and the Books and
+        Authors table versions.
+        """
+        row = self.store.borrowers.get(borrower_id)
+        if row is None:
+            return None
+        versions = self.store.versions
+        return (
+            row["updated_at"],
+            row.get("loans_version", 0),
+            versions.get(Book.__tablename__, 0),
+            versions.get(Author.__tablename__, 0),
+        )
+
+    def get_profile_with_loans(
+        self,
+        borrower_id: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[Optional[Borrower], List[Tuple]]:
+        """
+        Retrieve a borrower and a page of their loans, newest first, with the
+        title and author name of each loan's book.
+        """
+        row = self.store.borrowers.get(borrower_id)
+        if row is None:
+            return None, []
+
+        loans = self.store.loans
+        books = self.store.books.rows
+        authors = self.store.authors.rows
+        keys = sorted(
+            (
+                (loans.rows[loan_id]["created_at"], loan_id)
+                for loan_id in self.store.loans_by_borrower.get(row["id"], {})
+            ),
+            reverse=True,
+        )
+        page = []
+        for key in keys:
+            loan = loans.rows[key[1]]
+            if after is not None and key >= after:
+                continue
+            if status is not None and (loan["return_date"] is None) != (
+                status == "active"
+            ):
+                continue
+            book = books.get(loan["book_id"])
+            author = authors.get(book["author_id"]) if book else None
+            page.append(
+                (
+                    loans.build(loan),
+                    book["title"] if book else None,
+                    author["name"] if author else None,
+                )
+            )
+            if len(page) > limit:
+                break
+        return self.store.borrowers.build(row), page
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback straight away: the store has no transactions.
+        """
+        callback()
+
+
+class InMemoryLoanRepository(LoanRepositoryInterface):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get_active_loans(
+        self, limit: int, after: Optional[Cursor] = None
+    ) -> List[Loan]:
+        """
+        Retrieve a page of active loans ordered by creation time.
+        """
+        table = self.store.loans
+        rows = table.page(limit, after, order=self.store.active_order)
+        return [table.build(row) for row in rows]
+
+    def get_overdue_loans(
+        self, now: datetime, limit: int, after: Optional[Cursor] = None
+    ) -> List:
+        """
+        Retrieve a page of active loans due before the given time, ordered by
+        due date.
+        """
+        table = self.store.loans
+        rows = []
+        for due_date, loan_id in self.store.active_due.irange(
+            minimum=after, inclusive=(False, False)
+        ):
+            if due_date >= now or len(rows) > limit:
+                break
+            row = table.rows[loan_id]
+            rows.append(
+                OverdueRow(
+                    row["id"],
+                    row["book_id"],
+                    row["borrower_id"],
+                    row["loan_date"],
+                    row["due_date"],
+                )
+            )
+        return rows
+
+    def return_loan(self, loan_id: str) -> Optional[Loan]:
+        """
+        Set the return date of an active loan by its ID.
+        """
+        row = self.store.loans.get(loan_id)
+        if row is None or row["return_date"] is not None:
+            return None
+        self.store.close_loan(row, datetime.utcnow())
+        return self.store.loans.build(row)
+
+    def get_active_loans_by_borrower(self, borrower_id: str) -> List[Loan]:
+        """
+        Retrieve all active loans for a specific borrower.
+        """
+        return [
+            loan
+            for loan in self.get_loans_by_borrower_id(borrower_id)
+            if loan.return_date is None
+        ]
+
+    def get_loans(self) -> List[Loan]:
+        """
+        Retrieve all loans.
+        """
+        table = self.store.loans
+        return [table.build(row) for row in table.rows.values()]
+
+    def get_loan_by_id(self, loan_id: str) -> Optional[Loan]:
+        """
+        Retrieve a loan by its ID.
+        """
+        row = self.store.loans.get(loan_id)
+        return self.store.loans.build(row) if row else None
+
+    def create_loan(self, loan: Loan) -> Loan:
+        """
+        Create a new loan in the repository.
+        """
+        created = _store_object(self.store.loans, loan)
+        self.store.index_loan(self.store.loans.rows[created.id])
+        return created
+
+    def checkout(self, loan: Loan) -> Optional[Loan]:
+        """
+        Insert a loan unless its book already has an active loan.
+        """
+        if loan.return_date is None and loan.book_id in self.store.active_by_book:
+            return None
+        return self.create_loan(loan)
+
+    def checkout_many(self, loans: List[Loan]) -> List[Loan]:
+        """
+        Insert several loans, skipping books already on loan.
+        """
+        created = []
+        for loan in loans:
+            result = self.checkout(loan)
+            if result is not None:
+                created.append(result)
+        return created
+
+    def return_loans(self, loan_ids: Iterable[UUID]) -> List[Loan]:
+        """
+        Set the return date of several active loans.
+        """
+        now = datetime.utcnow()
+        returned = []
+        for loan_id in loan_ids:
+            row = self.store.loans.get(loan_id)
+            if row is None or row["return_date"] is not None:
+                continue
+            self.store.close_loan(row, now)
+            returned.append(self.store.loans.build(row))
+        return returned
+
+    def get_loans_by_ids(self, loan_ids: Iterable[UUID]) -> List[Loan]:
+        """
+        Retrieve several loans by their IDs.
+        """
+        table = self.store.loans
+        rows = (table.get(loan_id) for loan_id in loan_ids)
+        return [table.build(row) for row in rows if row is not None]
+
+    def iter_loans(
+        self,
+        active_only: bool = False,
+        borrower_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+    ) -> Iterator:
+        """
+        Stream loan rows, optionally only active ones or one borrower's.
+        """
+        if borrower_id is not None:
+            loans = self.store.loans.rows
+            ids = self.store.loans_by_borrower.get(as_uuid(borrower_id), {})
+            rows = [loans[loan_id] for loan_id in ids]
+        else:
+            rows = list(self.store.loans.rows.values())
+        for row in rows:
+            if active_only and row["return_date"] is not None:
+                continue
+            yield LoanRow(
+                row["id"],
+                row["book_id"],
+                row["borrower_id"],
+                row["loan_date"],
+                row.get("due_date"),
+                row["return_date"],
+            )
+
+    def get_existing_book_ids(self, book_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given book IDs exist.
+        """
+        return {bid for bid in book_ids if bid in self.store.books.rows}
+
+    def get_existing_borrower_ids(self, borrower_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Return which of the given borrower IDs exist.
+        """
+        return {bid for bid in borrower_ids if bid in self.store.borrowers.rows}
+
+    def bump_loans_versions(self, borrower_ids: Iterable[UUID]) -> None:
+        """
+        Increment the loans_version of borrowers whose loans changed.
+        """
+        for borrower_id in set(borrower_ids):
+            row = self.store.borrowers.get(borrower_id)
+            if row is not None:
+                row["loans_version"] = row.get("loans_version", 0) + 1
+
+    def update_loan(self, loan_id: UUID, values: Dict) -> Optional[Loan]:
+        """
+        Update a loan's columns and return the updated row.
+        """
+        row = self.store.loans.get(loan_id)
+        if row is None:
+            return None
+        if values.get("return_date") is not None and row["return_date"] is None:
+            self.store.close_loan(row, values["return_date"])
+        self.store.loans.update(loan_id, values)
+        return self.store.loans.build(row)
+
+    def iter_active_book_ids(self, batch_size: int = 10000) -> Iterator[UUID]:
+        """
+        Stream the IDs of every book that is currently on loan.
+        """
+        return iter(list(self.store.active_by_book))
+
+    def get_loans_by_borrower_id(self, borrower_id: str) -> List[Loan]:
+        """
+        Retrieve all loans for a specific borrower.
+        """
+        table = self.store.loans
+        loan_ids = self.store.loans_by_borrower.get(as_uuid(borrower_id), {})
+        return [table.build(table.rows[loan_id]) for loan_id in loan_ids]
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback straight away: the store has no transactions.
+        """
+        callback()
+
+
+class InMemoryTableVersionRepository(TableVersionRepositoryInterface):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get_versions(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Retrieve the current version of each named table.
+        """
+        return {name: self.store.versions.get(name, 0) for name in names}
+
+    def bump(self, *names: str) -> None:
+        """
+        Increment the version of each named table.
+        """
+        for name in names:
+            self.store.versions[name] = self.store.versions.get(name, 0) + 1
+
+
+class InMemoryStatsRepository(StatsRepositoryInterface):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def record_checkouts(self, loans: Iterable[Loan]) -> None:
+        """
+        Count newly created loans in the rollups.
+        """
+        for loan in loans:
+            self._add_checkouts(loan.book_id, 1)
+            active = 1 if loan.return_date is None else 0
+            self._add_loans(loan.borrower_id, active, 1)
+            self._add_day(loan.loan_date.date(), 1, 0)
+            if loan.return_date is not None:
+                self._add_day(loan.return_date.date(), 0, 1)
+
+    def record_returns(self, loans: Iterable[Loan]) -> None:
+        """
+        Count newly returned loans in the rollups.
+        """
+        for loan in loans:
+            self._add_loans(loan.borrower_id, -1, 0)
+            self._add_day(loan.return_date.date(), 0, 1)
+
+    def forget_loans_of(
+        self,
+        book_id: Optional[str] = None,
+        borrower_id: Optional[str] = None,
+        author_id: Optional[str] = None,
+    ) -> None:
+        """
+        Uncount the loans that deleting a book, borrower or author will cascade
+        to, leaving the rollups of the deleted entity itself alone. Nothing is
+        uncounted for a book or borrower with an active loan, which the delete
+        refuses.
+        """
+        store = self.store
+        if book_id is not None:
+            loan_ids = list(store.loans_by_book.get(as_uuid(book_id), {}))
+        elif borrower_id is not None:
+            loan_ids = list(store.loans_by_borrower.get(as_uuid(borrower_id), {}))
+        else:
+            loan_ids = [
+                loan_id
+                for bid in store.books_by_author.get(as_uuid(author_id), {})
+                for loan_id in store.loans_by_book.get(bid, {})
+            ]
+        loans = [store.loans.rows[loan_id] for loan_id in loan_ids]
+        if author_id is None and any(loan["return_date"] is None for loan in loans):
+            return
+
+        for loan in loans:
+            if borrower_id is not None:
+                self._add_checkouts(loan["book_id"], -1)
+            else:
+                active = 1 if loan["return_date"] is None else 0
+                self._add_loans(loan["borrower_id"], -active, -1)
+            if loan["loan_date"] is not None:
+                self._add_day(loan["loan_date"].date(), -1, 0)
+            if loan["return_date"] is not None:
+                self._add_day(loan["return_date"].date(), 0, -1)
+
+    def get_most_borrowed_books(self, limit: int) -> List[Tuple]:
+        """
+        Retrieve the most borrowed books from the checkout index.
+        """
+        rows = []
+        for checkouts, book_id in self.store.checkouts_order.islice(0, limit):
+            book = self.store.books.rows[book_id]
+            author = self.store.authors.get(book["author_id"])
+            rows.append(
+                BookStatsRow(
+                    book_id,
+                    book["title"],
+                    author["name"] if author else None,
+                    -checkouts,
+                )
+            )
+        return rows
+
+    def get_borrower_stats(self, borrower_id: str) -> Optional[Tuple]:
+        """
+        Retrieve a borrower's name and active and total loan counts.
+        """
+        row = self.store.borrowers.get(borrower_id)
+        if row is None:
+            return None
+        active, total = self.store.borrower_loans.get(row["id"], (0, 0))
+        return BorrowerStatsRow(row["id"], row["name"], active, total)
+
+    def get_busiest_borrowers(self, limit: int) -> List[Tuple]:
+        """
+        Retrieve the borrowers with the most active loans from their index.
+        """
+        rows = []
+        for active, borrower_id in self.store.active_loans_order:
+            if active >= 0 or len(rows) == limit:
+                break
+            rows.append(
+                BorrowerStatsRow(
+                    borrower_id,
+                    self.store.borrowers.rows[borrower_id]["name"],
+                    -active,
+                    self.store.borrower_loans[borrower_id][1],
+                )
+            )
+        return rows
+
+    def get_daily_counts(self, start: date, end: date) -> List[Tuple]:
+        """
+        Retrieve the checkouts and returns of each day in a range.
+        """
+        return [
+            DailyStatsRow(day, *self.store.daily_counts[day])
+            for day in sorted(self.store.daily_counts)
+            if start <= day <= end
+        ]
+
+    def rebuild(self) -> None:
+        """
+        Recompute every rollup from the stored loans.
+        """
+        store = self.store
+        store.book_checkouts.clear()
+        store.borrower_loans.clear()
+        store.daily_counts.clear()
+        store.checkouts_order.clear()
+        store.active_loans_order.clear()
+        self.record_checkouts(
+            store.loans.build(row) for row in store.loans.rows.values()
+        )
+
+    def _add_checkouts(self, book_id: UUID, amount: int) -> None:
+        store = self.store
+        current = store.book_checkouts.get(book_id, 0)
+        store.checkouts_order.discard((-current, book_id))
+        store.book_checkouts[book_id] = current + amount
+        store.checkouts_order.add((-current - amount, book_id))
+
+    def _add_loans(self, borrower_id: UUID, active: int, total: int) -> None:
+        store = self.store
+        counts = store.borrower_loans.setdefault(borrower_id, [0, 0])
+        store.active_loans_order.discard((-counts[0], borrower_id))
+        counts[0] += active
+        counts[1] += total
+        store.active_loans_order.add((-counts[0], borrower_id))
+
+    def _add_day(self, day: date, checkouts: int, returns: int) -> None:
+        counts = self.store.daily_counts.setdefault(day, [0, 0])
+        counts[0] += checkouts
+        counts[1] += returns
+
+
+def _store_object(table: MemoryTable, obj):
+    """
+    Store a new model object and copy the generated defaults back onto it,
+    as a flush would.
+    """
+    row = table.insert({column: getattr(obj, column) for column in table.columns})
+    for column in table.columns:
+        setattr(obj, column, row[column])
+    return obj
@@ -0,0 +1,11 @@
+"""
+Default settings for benchmarks that run the app in-process. Import this
+before any app module, which reads its configuration at import time.
+"""
+
+import os
+
+# The models need an engine URL to import; nothing here ever connects.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
@@ -0,0 +1,157 @@
+"""
+Measure what it costs to turn /books/ and /loans/active pages into JSON.
+
+Walks --rows books and --rows active loans through BookService.get_books and
+LoanService.get_active_loans in pages of MAX_PAGE_SIZE, over the in-memory
+repositories in benchmarks.memory_repos, then encodes every page two ways:
+
+- jsonable_encoder: what FastAPI does with a plain return value, walking
+  each page in Python before json.dumps;
+- dump_json: the routers' json_response, one pydantic-core call per page
+  through a cached TypeAdapter.
+
+Both encodings are checked to decode to the same JSON. Times are the best
+of --repeat runs and cover all the pages together.
+
+    python -m benchmarks.serialization --rows 100000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Sets the environment the app reads at import time, so it goes first.
+import benchmarks.offline_env
+from app.core.autocomplete import PrefixIndex
+from app.core.availability import AvailabilityIndex
+from app.core.pagination import MAX_PAGE_SIZE
+from app.core.responses import Page, json_response
+from app.schemas.book import Book
+from app.schemas.loan import Loan
+from app.services.book_service import BookService
+from app.services.loan_service import LoanService
+from benchmarks.memory_repos import (
+    InMemoryAuthorRepository,
+    InMemoryBookRepository,
+    InMemoryLoanRepository,
+    InMemoryStatsRepository,
+    InMemoryTableVersionRepository,
+    MemoryStore,
+)
+from benchmarks.service_layer import seed
+
+
+def best_of(repeat: int, call: Callable[[], Any]) -> Tuple[float, Any]:
+    """
+    Run a call several times.
+    Returns:
+        Tuple[float, Any]: The fastest run in seconds and the last result.
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def collect_pages(fetch: Callable, rows: int) -> List[Dict]:
+    """
+    Fetch pages until they hold the given number of rows.
+    Args:
+        fetch (Callable): Returns the page after a cursor, like get_books.
+        rows (int): The number of rows to collect.
+    Returns:
+        List[Dict]: The pages, as the service returned them.
+    """
+    pages, cursor, seen = [], None, 0
+    while seen < rows:
+        page = fetch(min(MAX_PAGE_SIZE, rows - seen), cursor)
+        pages.append(page)
+        seen += len(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    if seen < rows:
+        raise SystemExit(f"only {seen} rows available, {rows} requested")
+    return pages
+
+
+def run(name: str, fetch: Callable, tp: Any, rows: int, repeat: int) -> Dict:
+    """
+    Build the pages of one endpoint and time both encodings of them.
+    Returns:
+        Dict: The timings in milliseconds.
+    """
+    build, pages = best_of(repeat, lambda: collect_pages(fetch, rows))
+    legacy, legacy_bodies = best_of(
+        repeat, lambda: [JSONResponse(jsonable_encoder(p)).body for p in pages]
+    )
+    fast, fast_bodies = best_of(
+        repeat, lambda: [json_response(p, tp).body for p in pages]
+    )
+
+    for old, new in zip(legacy_bodies, fast_bodies):
+        if json.loads(old) != json.loads(new):
+            raise SystemExit(f"{name}: the two encodings differ")
+
+    return {
+        "name": name,
+        "rows": rows,
+        "build_ms": build * 1000,
+        "legacy_ms": legacy * 1000,
+        "fast_ms": fast * 1000,
+        "bytes": sum(len(body) for body in fast_bodies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Half of the seeded loans are active, so seed twice as many books.
+    store = MemoryStore()
+    seed(store, args.rows * 2, random.Random(args.seed))
+    books = BookService(
+        InMemoryBookRepository(store),
+        InMemoryAuthorRepository(store),
+        InMemoryTableVersionRepository(store),
+        InMemoryStatsRepository(store),
+        autocomplete=PrefixIndex(),
+    )
+    loans = LoanService(
+        InMemoryLoanRepository(store),
+        InMemoryStatsRepository(store),
+        AvailabilityIndex(),
+    )
+
+    results = [
+        run("/books/", books.get_books, Page[Book], args.rows, args.repeat),
+        run(
+            "/loans/active", loans.get_active_loans, Page[Loan], args.rows, args.repeat
+        ),
+    ]
+
+    print(
+        f"{'endpoint':<16}{'rows':>9}{'build ms':>11}{'jsonable ms':>13}"
+        f"{'dump_json ms':>14}{'speedup':>9}{'MiB':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['name']:<16}{r['rows']:>9}{r['build_ms']:>11.1f}"
+            f"{r['legacy_ms']:>13.1f}{r['fast_ms']:>14.1f}"
+            f"{r['legacy_ms'] / r['fast_ms']:>8.1f}x"
+            f"{r['bytes'] / 2**20:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
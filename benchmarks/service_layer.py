@@ -0,0 +1,492 @@
+"""
+Measure the cost of the service layer on its own.
+
+Runs AuthorService, BookService, BorrowerService and LoanService against the
+in-memory repositories in benchmarks.memory_repos, seeded with --rows books
+(plus a tenth as many authors, half as many borrowers and one loan per book,
+half of them still active). Whatever a call costs here is spent in the
+services, the schemas and the ORM objects, not in the database.
+
+Each scenario reports per-call latency percentiles and the peak memory a
+call allocates. Results are compared against the baseline stored for the
+same --rows in benchmarks/baselines, and the run exits with status 1 if any
+scenario regressed by more than the tolerance. Allocations are
+deterministic and get a tight tolerance; latency is noisy on shared machines
+and gets a loose one. Baselines are only comparable on the machine and
+Python version they were recorded with.
+
+    python -m benchmarks.service_layer --rows 10000
+    python -m benchmarks.service_layer --rows 1000000 --iterations 200
+    python -m benchmarks.service_layer --rows 10000 --save-baseline
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+from uuid import UUID
+
+# Sets the environment the app reads at import time, so it goes first.
+import benchmarks.offline_env
+from app.core.autocomplete import PrefixIndex
+from app.core.availability import AvailabilityIndex
+from app.core.pagination import encode_cursor
+from app.schemas.author import AuthorCreate, AuthorUpdate
+from app.schemas.book import BookCreate, BookUpdate
+from app.schemas.borrower import BorrowerCreate, BorrowerUpdate
+from app.schemas.loan import LoanBatchCreate, LoanBatchReturn, LoanCreate
+from app.services.author_service import AuthorService
+from app.services.autocomplete_service import AutocompleteService
+from app.services.book_service import BookService
+from app.services.borrower_service import BorrowerService
+from app.services.loan_service import LoanService
+from benchmarks.common import percentile
+from benchmarks.memory_repos import (
+    InMemoryAuthorRepository,
+    InMemoryBookRepository,
+    InMemoryBorrowerRepository,
+    InMemoryLoanRepository,
+    InMemoryStatsRepository,
+    InMemoryTableVersionRepository,
+    MemoryStore,
+)
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+BATCH_SIZE = 50
+SAMPLE_SIZE = 1000
+# Differences below these floors are treated as noise, whatever the ratio.
+MIN_LATENCY_DELTA_US = 5.0
+MIN_ALLOC_DELTA_KIB = 1.0
+
+
+def seed(store: MemoryStore, rows: int, rng: random.Random) -> None:
+    """
+    Fill the store with deterministic data.
+    Args:
+        store (MemoryStore): The store to fill.
+        rows (int): The number of books; the other tables are sized from it.
+        rng (random.Random): The source of IDs and choices.
+    """
+    clock = itertools.count()
+    start = datetime(2020, 1, 1)
+
+    def row_id() -> UUID:
+        return UUID(int=rng.getrandbits(128), version=4)
+
+    def stamp() -> datetime:
+        return start + timedelta(seconds=next(clock))
+
+    authors = []
+    for i in range(max(1, rows // 10)):
+        at = stamp()
+        authors.append(
+            {
+                "id": row_id(),
+                "name": f"Author {i}",
+                "bio": f"Biography of author {i}",
+                "created_at": at,
+                "updated_at": at,
+            }
+        )
+    store.authors.load(authors)
+
+    books = []
+    for i in range(rows):
+        at = stamp()
+        books.append(
+            {
+                "id": row_id(),
+                "title": f"Book title {i}",
+                "isbn": f"978{i:010d}",
+                "published_date": datetime(1950 + i % 70, 1 + i % 12, 1),
+                "author_id": authors[i % len(authors)]["id"],
+                "created_at": at,
+                "updated_at": at,
+            }
+        )
+    store.books.load(books)
+    for book in books:
+        store.index_book(book)
+
+    borrowers = []
+    for i in range(max(1, rows // 2)):
+        at = stamp()
+        borrowers.append(
+            {
+                "id": row_id(),
+                "name": f"Borrower {i}",
+                "email": f"borrower{i}@example.com",
+                "phone": f"+1555{i:07d}",
+                "created_at": at,
+                "updated_at": at,
+            }
+        )
+    store.borrowers.load(borrowers)
+
+    loans = []
+    for i, book in enumerate(books):
+        at = stamp()
+        loans.append(
+            {
+                "id": row_id(),
+                "book_id": book["id"],
+                "borrower_id": rng.choice(borrowers)["id"],
+                "loan_date": at,
+                "due_date": at + timedelta(days=14),
+                "return_date": at + timedelta(days=14) if i % 2 else None,
+                "created_at": at,
+                "updated_at": at,
+            }
+        )
+    store.loans.load(loans)
+    for loan in loans:
+        store.index_loan(loan)
+
+
+def build_scenarios(store: MemoryStore, rng: random.Random) -> Dict[str, Callable]:
+    """
+    Build the services and one zero-argument call per scenario. Arguments
+    are drawn round-robin from samples taken up front, so picking them costs
+    next to nothing. Write scenarios that would drain a pool, such as
+    checking out free books, undo their own changes within the call.
+    Returns:
+        Dict[str, Callable]: The scenario calls keyed by name.
+    """
+    authors = InMemoryAuthorRepository(store)
+    books = InMemoryBookRepository(store)
+    borrowers = InMemoryBorrowerRepository(store)
+    loans = InMemoryLoanRepository(store)
+    versions = InMemoryTableVersionRepository(store)
+    stats = InMemoryStatsRepository(store)
+    stats.rebuild()
+
+    book_index, borrower_index = PrefixIndex(), PrefixIndex()
+    AutocompleteService(borrowers, books, borrower_index, book_index).rebuild()
+
+    author_svc = AuthorService(authors, books, versions, stats)
+    book_svc = BookService(books, authors, versions, stats, book_index)
+    borrower_svc = BorrowerService(borrowers, stats, borrower_index)
+    loan_svc = LoanService(loans, stats, AvailabilityIndex())
+    loan_svc.resync_availability()
+
+    def pools(ids) -> Tuple[Iterator, Iterator]:
+        # Reads and writes draw from disjoint samples, so rows changed by the
+        # write scenarios, such as borrowers collecting loans, do not change
+        # what the read scenarios measure.
+        ids = rng.sample(list(ids), min(2 * SAMPLE_SIZE, len(ids)))
+        half = max(1, len(ids) // 2)
+        return itertools.cycle(ids[:half]), itertools.cycle(ids[half:] or ids)
+
+    author_ids, author_writes = pools(store.authors.rows)
+    book_ids, book_writes = pools(store.books.rows)
+    borrower_ids, borrower_writes = pools(store.borrowers.rows)
+    author_cursors = itertools.cycle(
+        [
+            encode_cursor(store.authors.rows[aid]["created_at"], aid)
+            for aid in rng.sample(
+                list(store.authors.rows), min(SAMPLE_SIZE, len(store.authors.rows))
+            )
+        ]
+    )
+    free_books = [bid for bid in store.books.rows if bid not in store.active_by_book]
+    free_book_ids = itertools.cycle(
+        rng.sample(free_books, min(SAMPLE_SIZE, len(free_books)))
+    )
+    batches = itertools.cycle(
+        [
+            rng.sample(free_books, min(BATCH_SIZE, len(free_books)))
+            for _ in range(SAMPLE_SIZE // 10)
+        ]
+    )
+    counter = itertools.count()
+
+    def create_author():
+        n = next(counter)
+        return author_svc.create_author(
+            AuthorCreate(name=f"New author {n}", bio="Benchmark")
+        )
+
+    def update_author():
+        n = next(counter)
+        return author_svc.update_author(
+            next(author_writes), AuthorUpdate(name=f"Renamed author {n}")
+        )
+
+    def create_book():
+        n = next(counter)
+        return book_svc.create_book(
+            BookCreate(
+                title=f"New book {n}",
+                isbn=f"979{n:010d}",
+                published_date=date(2001, 1, 1),
+                author_id=next(author_writes),
+            )
+        )
+
+    def update_book():
+        n = next(counter)
+        return book_svc.update_book(
+            next(book_writes), BookUpdate(title=f"Renamed book {n}")
+        )
+
+    def create_delete_borrower():
+        n = next(counter)
+        created = borrower_svc.create_borrower(
+            BorrowerCreate(
+                name=f"New borrower {n}",
+                email=f"new{n}@example.com",
+                phone="+15550000000",
+            )
+        )
+        return borrower_svc.delete_borrower(str(created.id))
+
+    def update_borrower():
+        n = next(counter)
+        return borrower_svc.update_borrower(
+            next(borrower_writes), BorrowerUpdate(name=f"Renamed borrower {n}")
+        )
+
+    def checkout_return():
+        loan = loan_svc.create_loan(
+            LoanCreate(book_id=next(free_book_ids), borrower_id=next(borrower_writes))
+        )
+        return loan_svc.return_loan(str(loan.id))
+
+    def batch_checkout_return():
+        borrower_id = next(borrower_writes)
+        created = loan_svc.create_loans(
+            LoanBatchCreate(
+                items=[
+                    LoanCreate(book_id=book_id, borrower_id=borrower_id)
+                    for book_id in next(batches)
+                ]
+            )
+        )
+        return loan_svc.return_loans(
+            LoanBatchReturn(loan_ids=[item.loan_id for item in created])
+        )
+
+    return {
+        "authors.get_author_by_id": lambda: author_svc.get_author_by_id(
+            next(author_ids)
+        ),
+        "authors.get_authors": lambda: author_svc.get_authors(),
+        "authors.get_authors_cursor": lambda: author_svc.get_authors(
+            cursor=next(author_cursors)
+        ),
+        "authors.create_author": create_author,
+        "authors.update_author": update_author,
+        "books.get_book_by_id": lambda: book_svc.get_book_by_id(next(book_ids)),
+        "books.get_books": lambda: book_svc.get_books(),
+        "books.create_book": create_book,
+        "books.update_book": update_book,
+        "borrowers.get_borrower_by_id": lambda: borrower_svc.get_borrower_by_id(
+            next(borrower_ids)
+        ),
+        "borrowers.get_borrowers": lambda: borrower_svc.get_borrowers(),
+        "borrowers.get_profile_with_loans": lambda: (
+            borrower_svc.get_borrower_profile_with_loans(next(borrower_ids))
+        ),
+        "borrowers.create_delete_borrower": create_delete_borrower,
+        "borrowers.update_borrower": update_borrower,
+        "loans.get_active_loans": lambda: loan_svc.get_active_loans(),
+        "loans.get_borrower_loan_history": lambda: (
+            loan_svc.get_borrower_loan_history(next(borrower_ids))
+        ),
+        "loans.checkout_return": checkout_return,
+        f"loans.batch_checkout_return_{BATCH_SIZE}": batch_checkout_return,
+    }
+
+
+def measure(
+    call: Callable, iterations: int, rounds: int, alloc_iterations: int
+) -> Dict:
+    """
+    Time a call and then trace the memory it allocates.
+
+    The timed calls are split into rounds and the figures of the round with
+    the lowest median are kept, which filters out most of the interference
+    from other processes. Tracing is a separate pass because tracemalloc
+    slows every allocation down and would distort the timings.
+    Args:
+        call (Callable): The scenario to run.
+        iterations (int): The number of timed calls per round.
+        rounds (int): The number of timed rounds.
+        alloc_iterations (int): The number of traced calls.
+    Returns:
+        Dict: Latency figures in microseconds and the mean peak KiB per call.
+    """
+    for _ in range(max(10, iterations // 10)):
+        call()
+
+    best = None
+    clock = time.perf_counter
+    for _ in range(rounds):
+        gc.collect()
+        latencies = []
+        for _ in range(iterations):
+            started = clock()
+            call()
+            latencies.append(clock() - started)
+        if best is None or percentile(latencies, 50) < percentile(best, 50):
+            best = latencies
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "mean_us": sum(best) / len(best) * 1_000_000,
+        "p50_us": percentile(best, 50) * 1_000_000,
+        "p95_us": percentile(best, 95) * 1_000_000,
+        "p99_us": percentile(best, 99) * 1_000_000,
+        "alloc_kib": sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+    }
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    tolerance: float,
+    alloc_tolerance: float,
+) -> Dict[str, List[str]]:
+    """
+    Find the scenarios whose median latency or allocations grew by more than
+    the tolerance compared with the baseline.
+    Args:
+        results (Dict[str, Dict]): The figures of this run.
+        baseline (Dict[str, Dict]): The stored figures.
+        tolerance (float): The allowed relative latency growth, e.g. 0.5 for 50%.
+        alloc_tolerance (float): The allowed relative allocation growth.
+    Returns:
+        Dict[str, List[str]]: A description of each regression, keyed by
+        scenario name.
+    """
+    regressions = {}
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        checks = (
+            ("p50_us", "us", tolerance, MIN_LATENCY_DELTA_US),
+            ("alloc_kib", "KiB", alloc_tolerance, MIN_ALLOC_DELTA_KIB),
+        )
+        for metric, unit, allowed, floor in checks:
+            limit = base[metric] * (1 + allowed)
+            if current[metric] > limit and current[metric] - base[metric] > floor:
+                regressions.setdefault(name, []).append(
+                    f"{metric} {current[metric]:.1f} {unit} "
+                    f"> baseline {base[metric]:.1f} {unit} (+{allowed:.0%})"
+                )
+    return regressions
+
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    """
+    Print the figures as an aligned table, with the change in median
+    latency against the baseline where there is one.
+    """
+    print(
+        f"{'scenario':<40}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}"
+        f"{'KiB/call':>10}{'vs base':>10}"
+    )
+    for name, row in results.items():
+        base = baseline.get(name)
+        change = f"{row['p50_us'] / base['p50_us']:.2f}x" if base else "-"
+        print(
+            f"{name:<40}{row['p50_us']:>10.1f}{row['p95_us']:>10.1f}"
+            f"{row['p99_us']:>10.1f}{row['alloc_kib']:>10.1f}{change:>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--alloc-iterations", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.1)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="Run only scenarios whose name contains this")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    store = MemoryStore()
+    started = time.perf_counter()
+    seed(store, args.rows, rng)
+    scenarios = build_scenarios(store, rng)
+    print(f"seeded {args.rows} books in {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    for name, call in scenarios.items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = measure(
+            call, args.iterations, args.rounds, args.alloc_iterations
+        )
+
+    path = BASELINE_DIR / f"service_layer_{args.rows}.json"
+    baseline = json.loads(path.read_text())["results"] if path.exists() else {}
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        record = {
+            "rows": args.rows,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        path.write_text(json.dumps(record, indent=2, sort_keys=True) + "\n")
+        print(f"baseline saved to {path}")
+        return
+
+    if not baseline:
+        print(f"no baseline at {path}; run with --save-baseline to record one")
+        return
+
+    # A slow run on a shared machine looks like a regression; only fail on
+    # scenarios that stay slow when measured again.
+    regressions = compare(results, baseline, args.tolerance, args.alloc_tolerance)
+    for _ in range(args.retries):
+        if not regressions:
+            break
+        print(f"re-measuring {len(regressions)} scenario(s) that look slower")
+        for name in regressions:
+            rerun = measure(
+                scenarios[name], args.iterations, args.rounds, args.alloc_iterations
+            )
+            results[name] = {k: min(v, rerun[k]) for k, v in results[name].items()}
+        regressions = compare(results, baseline, args.tolerance, args.alloc_tolerance)
+
+    for name, problems in regressions.items():
+        for problem in problems:
+            print(f"REGRESSION {name}: {problem}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
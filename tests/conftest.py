@@ -0,0 +1,70 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# The models need an engine URL to import; the tests bring their own engine.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.core.db import Base, _enable_sqlite_foreign_keys  # noqa: E402
+from app.models import (  # noqa: E402
+    author,
+    book,
+    borrower,
+    circulation,
+    loan,
+    table_version,
+    user,
+)
+
+
+@pytest.fixture
+def engine():
+    """
+    An in-memory SQLite database with every table, on one shared connection.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    """
+    A session configured like the application's, rolled back after the test.
+    """
+    db = sessionmaker(
+        bind=engine, autocommit=False, autoflush=False, expire_on_commit=False
+    )()
+    yield db
+    db.rollback()
+    db.close()
+
+
+@pytest.fixture
+def count_statements(engine):
+    """
+    Return a context manager that collects the SQL statements run on the
+    engine while it is open.
+    """
+
+    @contextmanager
+    def counting() -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counting
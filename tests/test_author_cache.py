@@ -0,0 +1,39 @@
+from app.core.cache import LRUTTLCache
+from app.models.author import Author
+from app.repositories.author_repository_cached import CachedAuthorRepository
+from app.repositories.author_repository_impl import SQLAuthorRepository
+
+
+def make_repo(session, cache):
+    return CachedAuthorRepository(SQLAuthorRepository(session), session, cache)
+
+
+def test_update_drops_entry_cached_before_commit(session):
+    author = Author(name="Old")
+    session.add(author)
+    session.commit()
+    key = str(author.id)
+
+    cache = LRUTTLCache(maxsize=10, ttl=60)
+    make_repo(session, cache).update_author(author.id, {"name": "New"})
+
+    # A read on another session before the commit caches the old row again.
+    cache.set(key, Author(id=author.id, name="Old"))
+    assert cache.get(key).name == "Old"
+
+    session.commit()
+    assert cache.get(key) is None
+
+
+def test_delete_drops_entry_cached_before_commit(session):
+    author = Author(name="Gone")
+    session.add(author)
+    session.commit()
+    key = str(author.id)
+
+    cache = LRUTTLCache(maxsize=10, ttl=60)
+    make_repo(session, cache).delete_author(str(author.id))
+    cache.set(key, Author(id=author.id, name="Gone"))
+
+    session.commit()
+    assert cache.get(key) is None
@@ -0,0 +1,40 @@
+from app.core.autocomplete import PrefixIndex
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.schemas.borrower import BorrowerCreate
+from app.services.borrower_service import BorrowerService
+
+
+def test_load_replays_changes_made_during_rebuild():
+    index = PrefixIndex()
+    index.load([(1, {"id": "1"}, ["Alice"]), (2, {"id": "2"}, ["Bob"])])
+
+    index.begin_resync()
+    # Made while the rebuild reads its snapshot, which predates them.
+    index.upsert(3, {"id": "3"}, ["Carol"])
+    index.upsert(1, {"id": "1", "renamed": True}, ["Alma"])
+    index.remove(2)
+    index.load([(1, {"id": "1"}, ["Alice"]), (2, {"id": "2"}, ["Bob"])])
+
+    assert index.search("car", 10) == [{"id": "3"}]
+    assert index.search("alm", 10) == [{"id": "1", "renamed": True}]
+    assert index.search("ali", 10) == []
+    assert index.search("bob", 10) == []
+
+    # Once installed, a later load is a plain replacement again.
+    index.load([(2, {"id": "2"}, ["Bob"])])
+    assert index.search("car", 10) == []
+
+
+def test_new_borrower_is_indexed_after_commit(session):
+    index = PrefixIndex()
+    svc = BorrowerService(
+        SQLBorrowerRepository(session), SQLStatsRepository(session), autocomplete=index
+    )
+
+    svc.create_borrower(
+        BorrowerCreate(name="Dana", email="dana@example.com", phone="+1234567")
+    )
+    assert index.search("dan", 10) == []
+    session.commit()
+    assert [item["name"] for item in index.search("dan", 10)] == ["Dana"]
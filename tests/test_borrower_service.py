@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from app.core.autocomplete import PrefixIndex
+from app.core.availability import AvailabilityIndex
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrower import Borrower
+from app.models.loan import Loan
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.repositories.loan_repository_impl import SQLLoanRepository
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.schemas.loan import LoanCreate
+from app.services.borrower_service import BorrowerService
+from app.services.loan_service import LoanService
+
+
+def test_profile_loans_carry_due_date(session):
+    author = Author(name="Ann")
+    borrower = Borrower(name="Bo", email="bo@example.com", phone="+1234567")
+    session.add_all([author, borrower])
+    session.flush()
+    book = Book(title="T", isbn="1", author_id=author.id)
+    session.add(book)
+    session.flush()
+    loan_date = datetime(2026, 1, 1)
+    session.add(
+        Loan(
+            book_id=book.id,
+            borrower_id=borrower.id,
+            loan_date=loan_date,
+            due_date=loan_date + timedelta(days=14),
+        )
+    )
+    session.flush()
+
+    svc = BorrowerService(
+        SQLBorrowerRepository(session),
+        SQLStatsRepository(session),
+        autocomplete=PrefixIndex(),
+    )
+    profile = svc.get_borrower_profile_with_loans(str(borrower.id))
+
+    [loan] = profile.loans
+    assert loan.due_date == datetime(2026, 1, 15)
+    assert (loan.book_title, loan.author_name) == ("T", "Ann")
+
+
+def test_profile_version_is_one_lookup_and_follows_loans(session, count_statements):
+    author = Author(name="Ann")
+    borrower = Borrower(name="Bo", email="bo@example.com", phone="+1234567")
+    session.add_all([author, borrower])
+    session.flush()
+    book = Book(title="T", isbn="1", author_id=author.id)
+    session.add(book)
+    session.flush()
+
+    svc = BorrowerService(
+        SQLBorrowerRepository(session),
+        SQLStatsRepository(session),
+        autocomplete=PrefixIndex(),
+    )
+    loans = LoanService(
+        SQLLoanRepository(session), SQLStatsRepository(session), AvailabilityIndex()
+    )
+    bid = str(borrower.id)
+
+    with count_statements() as statements:
+        initial = svc.get_profile_version(bid)
+    assert len(statements) == 1
+    assert '"Loans"' not in statements[0]
+
+    loan = loans.create_loan(LoanCreate(book_id=book.id, borrower_id=borrower.id))
+    checked_out = svc.get_profile_version(bid)
+    loans.return_loan(str(loan.id))
+    returned = svc.get_profile_version(bid)
+    assert len({initial, checked_out, returned}) == 3
+    assert returned[0] == initial[0]
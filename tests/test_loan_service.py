@@ -0,0 +1,47 @@
+from app.core.availability import AvailabilityIndex
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrower import Borrower
+from app.repositories.loan_repository_impl import SQLLoanRepository
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.schemas.loan import LoanBatchReturn, LoanCreate
+from app.services.loan_service import LoanService
+
+
+def setup_library(session):
+    author = Author(name="Ann")
+    borrower = Borrower(name="Bo", email="bo@example.com", phone="+1234567")
+    session.add_all([author, borrower])
+    session.flush()
+    book = Book(title="T", isbn="1", author_id=author.id)
+    session.add(book)
+    session.commit()
+
+    availability = AvailabilityIndex()
+    svc = LoanService(
+        SQLLoanRepository(session), SQLStatsRepository(session), availability
+    )
+    return svc, availability, book, borrower
+
+
+def test_availability_changes_only_after_commit(session):
+    svc, availability, book, borrower = setup_library(session)
+
+    loan = svc.create_loan(LoanCreate(book_id=book.id, borrower_id=borrower.id))
+    assert availability.on_loan([book.id]) == set()
+    session.commit()
+    assert availability.on_loan([book.id]) == {book.id}
+
+    svc.return_loans(LoanBatchReturn(loan_ids=[loan.id]))
+    assert availability.on_loan([book.id]) == {book.id}
+    session.commit()
+    assert availability.on_loan([book.id]) == set()
+
+
+def test_availability_ignores_rolled_back_checkouts(session):
+    svc, availability, book, borrower = setup_library(session)
+
+    svc.create_loan(LoanCreate(book_id=book.id, borrower_id=borrower.id))
+    session.rollback()
+    session.commit()
+    assert availability.on_loan([book.id]) == set()
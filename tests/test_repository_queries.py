@@ -0,0 +1,236 @@
+"""
+Every repository write is a single statement: no flush-then-refresh SELECT
+and no lookup before an UPDATE.
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrower import Borrower
+from app.models.loan import Loan
+from app.models.user import User
+from app.repositories.author_repository_impl import SQLAuthorRepository
+from app.repositories.book_repository_impl import SQLBookRepository
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.repositories.loan_repository_impl import SQLLoanRepository
+from app.repositories.user_repository_impl import SQLUserRepository
+
+
+@pytest.fixture
+def author_row(session):
+    row = SQLAuthorRepository(session).create_author(Author(name="Ann", bio="b"))
+    session.flush()
+    return row
+
+
+@pytest.fixture
+def book_row(session, author_row):
+    return SQLBookRepository(session).create_book(
+        Book(
+            title="T",
+            isbn="1",
+            published_date=datetime(2020, 1, 1),
+            author_id=author_row.id,
+        )
+    )
+
+
+@pytest.fixture
+def borrower_row(session):
+    return SQLBorrowerRepository(session).create_borrower(
+        Borrower(name="Bo", email="bo@example.com", phone="+1234567")
+    )
+
+
+@pytest.fixture
+def loan_row(session, book_row, borrower_row):
+    now = datetime.utcnow()
+    return SQLLoanRepository(session).checkout(
+        Loan(
+            book_id=book_row.id,
+            borrower_id=borrower_row.id,
+            loan_date=now,
+            due_date=now + timedelta(days=14),
+        )
+    )
+
+
+def test_create_author_is_one_statement(session, count_statements):
+    with count_statements() as statements:
+        created = SQLAuthorRepository(session).create_author(Author(name="A"))
+    assert len(statements) == 1
+    assert created.id is not None and created.created_at is not None
+
+
+def test_create_authors_is_one_statement(session, count_statements):
+    rows = [{"id": uuid4(), "name": f"A{i}"} for i in range(3)]
+    with count_statements() as statements:
+        SQLAuthorRepository(session).create_authors(rows)
+    assert len(statements) == 1
+
+
+def test_update_author_is_one_statement(session, author_row, count_statements):
+    with count_statements() as statements:
+        updated = SQLAuthorRepository(session).update_author(
+            author_row.id, {"name": "Bea"}
+        )
+    assert len(statements) == 1
+    assert updated.name == "Bea"
+
+
+def test_update_missing_author_returns_none(session, count_statements):
+    with count_statements() as statements:
+        assert (
+            SQLAuthorRepository(session).update_author(uuid4(), {"name": "X"}) is None
+        )
+    assert len(statements) == 1
+
+
+def test_create_book_is_one_statement(session, author_row, count_statements):
+    with count_statements() as statements:
+        created = SQLBookRepository(session).create_book(
+            Book(
+                title="T",
+                isbn="2",
+                published_date=datetime(2020, 1, 1),
+                author_id=author_row.id,
+            )
+        )
+    assert len(statements) == 1
+    assert created.id is not None
+
+
+def test_create_books_is_one_statement(session, author_row, count_statements):
+    rows = [
+        {"id": uuid4(), "title": f"T{i}", "isbn": f"i{i}", "author_id": author_row.id}
+        for i in range(3)
+    ]
+    with count_statements() as statements:
+        SQLBookRepository(session).create_books(rows)
+    assert len(statements) == 1
+
+
+def test_update_book_is_one_statement(session, book_row, count_statements):
+    with count_statements() as statements:
+        updated, author_name = SQLBookRepository(session).update_book(
+            book_row.id, {"title": "New"}
+        )
+    assert len(statements) == 1
+    assert (updated.title, author_name) == ("New", "Ann")
+
+
+def test_create_borrower_is_one_statement(session, count_statements):
+    with count_statements() as statements:
+        created = SQLBorrowerRepository(session).create_borrower(
+            Borrower(name="C", email="c@example.com")
+        )
+    assert len(statements) == 1
+    assert created.id is not None
+
+
+def test_create_borrowers_is_one_statement(session, borrower_row, count_statements):
+    rows = [
+        {"id": uuid4(), "name": "D", "email": "d@example.com"},
+        {"id": uuid4(), "name": "Dup", "email": borrower_row.email},
+    ]
+    with count_statements() as statements:
+        inserted = SQLBorrowerRepository(session).create_borrowers(rows)
+    assert len(statements) == 1
+    assert inserted == {"d@example.com"}
+
+
+def test_update_borrower_is_one_statement(session, borrower_row, count_statements):
+    with count_statements() as statements:
+        updated = SQLBorrowerRepository(session).update_borrower(
+            borrower_row.id, {"phone": "+7654321"}
+        )
+    assert len(statements) == 1
+    assert updated.phone == "+7654321"
+
+
+def test_create_loan_is_one_statement(
+    session, book_row, borrower_row, count_statements
+):
+    with count_statements() as statements:
+        created = SQLLoanRepository(session).create_loan(
+            Loan(book_id=book_row.id, borrower_id=borrower_row.id)
+        )
+    assert len(statements) == 1
+    assert created.id is not None
+
+
+def test_checkout_is_one_statement(session, book_row, borrower_row, count_statements):
+    repo = SQLLoanRepository(session)
+    loan = Loan(
+        book_id=book_row.id, borrower_id=borrower_row.id, loan_date=datetime.utcnow()
+    )
+    with count_statements() as statements:
+        created = repo.checkout(loan)
+    assert len(statements) == 1
+    assert created.id is not None
+
+    again = Loan(
+        book_id=book_row.id, borrower_id=borrower_row.id, loan_date=datetime.utcnow()
+    )
+    with count_statements() as statements:
+        assert repo.checkout(again) is None
+    assert len(statements) == 1
+
+
+def test_checkout_many_is_one_statement(
+    session, author_row, borrower_row, count_statements
+):
+    books = [
+        SQLBookRepository(session).create_book(
+            Book(title=f"T{i}", isbn=f"m{i}", author_id=author_row.id)
+        )
+        for i in range(3)
+    ]
+    loans = [
+        Loan(book_id=b.id, borrower_id=borrower_row.id, loan_date=datetime.utcnow())
+        for b in books
+    ]
+    with count_statements() as statements:
+        created = SQLLoanRepository(session).checkout_many(loans)
+    assert len(statements) == 1
+    assert len(created) == 3
+
+
+def test_update_loan_is_one_statement(session, loan_row, count_statements):
+    due = datetime(2030, 1, 1)
+    with count_statements() as statements:
+        updated = SQLLoanRepository(session).update_loan(loan_row.id, {"due_date": due})
+    assert len(statements) == 1
+    assert updated.due_date == due
+
+
+def test_return_loan_is_one_statement(session, loan_row, count_statements):
+    repo = SQLLoanRepository(session)
+    with count_statements() as statements:
+        returned = repo.return_loan(loan_row.id)
+    assert len(statements) == 1
+    assert returned.return_date is not None
+
+    with count_statements() as statements:
+        assert repo.return_loan(loan_row.id) is None
+    assert len(statements) == 1
+
+
+def test_return_loans_is_one_statement(session, loan_row, count_statements):
+    with count_statements() as statements:
+        returned = SQLLoanRepository(session).return_loans([loan_row.id, uuid4()])
+    assert len(statements) == 1
+    assert [loan.id for loan in returned] == [loan_row.id]
+
+
+def test_create_user_is_one_statement(session, count_statements):
+    with count_statements() as statements:
+        created = SQLUserRepository(session).create(
+            User(username="u", password_hash="h")
+        )
+    assert len(statements) == 1
+    assert created.id is not None
@@ -0,0 +1,164 @@
+"""
+The rollups LoanService and the delete paths maintain incrementally match
+what rebuild() recomputes from the loans.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.autocomplete import PrefixIndex
+from app.core.availability import AvailabilityIndex
+from app.core.exceptions import ActiveLoanExistsException
+from app.models.author import Author
+from app.models.book import Book
+from app.models.borrower import Borrower
+from app.models.loan import Loan
+from app.models.circulation import (
+    BookCirculationStats,
+    BorrowerCirculationStats,
+    DailyCirculationStats,
+)
+from app.repositories.author_repository_impl import SQLAuthorRepository
+from app.repositories.book_repository_impl import SQLBookRepository
+from app.repositories.borrower_repository_impl import SQLBorrowerRepository
+from app.repositories.loan_repository_impl import SQLLoanRepository
+from app.repositories.stats_repository_impl import SQLStatsRepository
+from app.repositories.table_version_repository_impl import SQLTableVersionRepository
+from app.schemas.loan import LoanCreate
+from app.services.author_service import AuthorService
+from app.services.book_service import BookService
+from app.services.borrower_service import BorrowerService
+from app.services.loan_service import LoanService
+
+
+def snapshot(session):
+    """
+    Read every rollup, summing the shards of each day and leaving out the
+    days whose counts cancelled out.
+    """
+    day = DailyCirculationStats
+    daily = session.execute(
+        select(day.day, func.sum(day.checkouts), func.sum(day.returns))
+        .group_by(day.day)
+        .having((func.sum(day.checkouts) != 0) | (func.sum(day.returns) != 0))
+        .order_by(day.day)
+    ).all()
+    books = session.execute(
+        select(BookCirculationStats.book_id, BookCirculationStats.checkouts)
+        .where(BookCirculationStats.checkouts != 0)
+        .order_by(BookCirculationStats.book_id)
+    ).all()
+    borrowers = session.execute(
+        select(
+            BorrowerCirculationStats.borrower_id,
+            BorrowerCirculationStats.active_loans,
+            BorrowerCirculationStats.total_loans,
+        )
+        .where(BorrowerCirculationStats.total_loans != 0)
+        .order_by(BorrowerCirculationStats.borrower_id)
+    ).all()
+    return books, borrowers, daily
+
+
+@pytest.fixture
+def library(session):
+    stats = SQLStatsRepository(session)
+    versions = SQLTableVersionRepository(session)
+    services = {
+        "authors": AuthorService(
+            SQLAuthorRepository(session), SQLBookRepository(session), versions, stats
+        ),
+        "books": BookService(
+            SQLBookRepository(session),
+            SQLAuthorRepository(session),
+            versions,
+            stats,
+            autocomplete=PrefixIndex(),
+        ),
+        "borrowers": BorrowerService(
+            SQLBorrowerRepository(session),
+            stats,
+            autocomplete=PrefixIndex(),
+        ),
+        "loans": LoanService(SQLLoanRepository(session), stats, AvailabilityIndex()),
+    }
+
+    authors = [Author(name="A"), Author(name="B")]
+    borrowers = [
+        Borrower(name=f"P{i}", email=f"p{i}@example.com", phone="+1234567")
+        for i in range(2)
+    ]
+    session.add_all(authors + borrowers)
+    session.flush()
+    books = [
+        Book(title=f"T{i}", isbn=str(i), author_id=authors[i % 2].id) for i in range(4)
+    ]
+    session.add_all(books)
+    session.flush()
+
+    loans = services["loans"]
+    for i, (book, borrower, day) in enumerate(
+        [(0, 0, 1), (1, 1, 2), (2, 0, 3), (3, 1, 3), (0, 1, 4)]
+    ):
+        created = loans.create_loan(
+            LoanCreate(
+                book_id=books[book].id,
+                borrower_id=borrowers[borrower].id,
+                loan_date=datetime(2026, 3, day).isoformat(),
+            )
+        )
+        # Leave the last two loans out.
+        if i not in (3, 4):
+            loans.return_loan(str(created.id))
+    return services, authors, books, borrowers
+
+
+def assert_matches_rebuild(session):
+    incremental = snapshot(session)
+    SQLStatsRepository(session).rebuild()
+    assert incremental == snapshot(session)
+
+
+def test_checkouts_and_returns_match_rebuild(session, library):
+    assert_matches_rebuild(session)
+
+
+def test_book_delete_uncounts_its_loans(session, library):
+    services, _, books, _ = library
+    services["books"].delete_book(str(books[2].id))
+    assert_matches_rebuild(session)
+
+
+def test_borrower_delete_uncounts_their_loans(session, library):
+    services, _, _, borrowers = library
+    active = select(Loan.id).where(
+        Loan.borrower_id == borrowers[1].id, Loan.return_date.is_(None)
+    )
+    for loan_id in session.scalars(active).all():
+        services["loans"].return_loan(str(loan_id))
+    services["borrowers"].delete_borrower(str(borrowers[1].id))
+    assert_matches_rebuild(session)
+
+
+def test_author_delete_uncounts_active_and_returned_loans(session, library):
+    services, authors, _, _ = library
+    services["authors"].delete_author(str(authors[1].id))
+    assert_matches_rebuild(session)
+
+
+def test_book_delete_uncounts_without_reading_loans(session, library, count_statements):
+    services, _, books, _ = library
+    with count_statements() as statements:
+        services["books"].delete_book(str(books[2].id))
+    assert not [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert_matches_rebuild(session)
+
+
+def test_refused_book_delete_keeps_counts(session, library):
+    services, _, books, _ = library
+    before = snapshot(session)
+    with pytest.raises(ActiveLoanExistsException):
+        services["books"].delete_book(str(books[3].id))
+    assert snapshot(session) == before
@@ -0,0 +1,31 @@
+from app.models.table_version import TableVersion
+from app.repositories.table_version_repository_impl import SQLTableVersionRepository
+
+
+def test_bump_runs_after_commit(session, count_statements):
+    repo = SQLTableVersionRepository(session)
+
+    with count_statements() as statements:
+        repo.bump("Books", "Authors")
+        session.flush()
+    assert not any(TableVersion.__tablename__ in s for s in statements)
+
+    session.commit()
+    assert repo.get_versions(["Books", "Authors", "Loans"]) == {
+        "Books": 1,
+        "Authors": 1,
+        "Loans": 0,
+    }
+
+    repo.bump("Books")
+    session.commit()
+    assert repo.get_versions(["Books"]) == {"Books": 2}
+
+
+def test_rolled_back_bump_is_dropped(session):
+    repo = SQLTableVersionRepository(session)
+
+    repo.bump("Books")
+    session.rollback()
+    session.commit()
+    assert repo.get_versions(["Books"]) == {"Books": 0}